@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'job_portal.settings')
+# Serve the read-heavy pages from their async views (see jobs/urls.py)
+os.environ.setdefault('ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
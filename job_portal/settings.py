@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from .database import database_config, replica_configs
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -42,6 +45,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'jobs.instrumentation.RequestMetricsMiddleware',
+    'jobs.routers.ReplicaPinningMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -55,7 +60,7 @@ ROOT_URLCONF = 'job_portal.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'jobs.instrumentation.InstrumentedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -70,17 +75,66 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'job_portal.wsgi.application'
 
+# The home, job list, job detail and dashboard pages, and the job API's read
+# actions, run as async views when this is on. job_portal/asgi.py turns it
+# on; WSGI deployments keep the sync views, which avoid the async views'
+# thread hops.
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', '0') == '1'
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+# Configured from DATABASE_URL and the DB_* variables; see job_portal/database.py.
+# SQLite (the default) runs in WAL mode with a busy timeout; PostgreSQL uses
+# a psycopg connection pool per process.
 
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    'default': database_config(os.environ, BASE_DIR / 'db.sqlite3'),
+    **replica_configs(os.environ),
 }
 
+# Listing, detail and analytics reads go to DATABASE_REPLICAS (see
+# jobs/routers.py); a client that wrote reads from the primary for
+# REPLICA_PIN_SECONDS afterwards.
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['jobs.routers.ReplicaRouter']
+REPLICA_PIN_SECONDS = int(os.environ.get('DB_REPLICA_PIN_SECONDS', '10'))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# REDIS_URL is required in production: cache versions, refresh locks, template
+# fragment invalidation and the /metrics/ counters must be shared by every
+# worker. locmem only suits a single process (startup logs a warning when
+# METRICS_TOKEN is set without it).
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_URL'],
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+
+# Metrics
+# /metrics/ serves Prometheus text to staff users, or to scrapers that send
+# "Authorization: Bearer <METRICS_TOKEN>" when the variable is set.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+
+# Job lifecycle
+# New jobs expire this many days after posting unless given an expires_at
+# (0 disables the default); run "manage.py expire_jobs" from a scheduler.
+# Jobs inactive for JOB_ARCHIVE_AFTER_DAYS are moved to the archive tables.
+JOB_EXPIRY_DAYS = int(os.environ.get('JOB_EXPIRY_DAYS', '60'))
+JOB_ARCHIVE_AFTER_DAYS = int(os.environ.get('JOB_ARCHIVE_AFTER_DAYS', '180'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -115,6 +169,9 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploads are streamed to disk and hashed for resume deduplication
+FILE_UPLOAD_HANDLERS = ['jobs.resumes.HashingUploadHandler']
+
 # Login URLs
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'job_list'
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Job, Application, UserProfile
+from .models import Job, Application, UserProfile, OutboundEmail, ArchivedJob, ArchivedApplication
 
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
@@ -9,7 +9,7 @@ class UserProfileAdmin(admin.ModelAdmin):
 
 @admin.register(Job)
 class JobAdmin(admin.ModelAdmin):
-    list_display = ['title', 'company_name', 'location', 'job_type', 'posted_by', 'created_at', 'is_active']
+    list_display = ['title', 'company_name', 'location', 'job_type', 'posted_by', 'created_at', 'expires_at', 'is_active']
     list_filter = ['job_type', 'is_active', 'created_at']
     search_fields = ['title', 'company_name', 'location']
     date_hierarchy = 'created_at'
@@ -19,4 +19,44 @@ class ApplicationAdmin(admin.ModelAdmin):
     list_display = ['applicant', 'job', 'status', 'submitted_at']
     list_filter = ['status', 'submitted_at']
     search_fields = ['applicant__username', 'job__title']
-    date_hierarchy = 'submitted_at'
\ No newline at end of file
+    date_hierarchy = 'submitted_at'
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    list_filter = ['status']
+    search_fields = ['subject']
+    readonly_fields = ['created_at', 'sent_at']
+
+class ReadOnlyAdminMixin:
+    # Archived rows are written only by the expire_jobs command
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+class ArchivedApplicationInline(ReadOnlyAdminMixin, admin.TabularInline):
+    model = ArchivedApplication
+    fields = ['applicant', 'status', 'submitted_at', 'resume']
+    extra = 0
+
+@admin.register(ArchivedJob)
+class ArchivedJobAdmin(ReadOnlyAdminMixin, admin.ModelAdmin):
+    list_display = ['title', 'company_name', 'location', 'job_type', 'posted_by', 'created_at', 'applications_count', 'archived_at']
+    list_filter = ['job_type', 'archived_at']
+    search_fields = ['title', 'company_name', 'location', 'external_id']
+    date_hierarchy = 'archived_at'
+    list_select_related = ['posted_by']
+    inlines = [ArchivedApplicationInline]
+
+@admin.register(ArchivedApplication)
+class ArchivedApplicationAdmin(ReadOnlyAdminMixin, admin.ModelAdmin):
+    list_display = ['applicant', 'job', 'status', 'submitted_at']
+    list_filter = ['status', 'submitted_at']
+    search_fields = ['applicant__username', 'job__title']
+    date_hierarchy = 'submitted_at'
+    list_select_related = ['applicant', 'job']
@@ -1,9 +1,29 @@
+import functools
+from asgiref.sync import sync_to_async
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ParseError, ValidationError
 from rest_framework.response import Response
-from django.db.models import Count
-from .models import Job, Application
-from .serializers import JobSerializer, ApplicationSerializer
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Sum
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404
+from django.db.models.functions import Coalesce
+from .models import Job, Application, JobTypeDailyStat
+from .serializers import (
+    JobSerializer, ApplicationSerializer, BulkStatusSerializer, CompactJobRows, RecommendedJobSerializer,
+    parse_compact_fields,
+)
+from .pagination import KeysetCursorPagination
+from .conditional import (
+    adetail_validators, alist_validators, anot_modified, detail_validators, list_validators, not_modified,
+    set_validators,
+)
+from .routers import read_from_replicas, replica_reads
+from .facets import InvalidFilter, afacet_counts, facet_counts, filter_jobs, sort_jobs
+from .search import search_jobs
+from . import bulk, geo, recommendations
 
 class IsEmployerOrReadOnly(permissions.BasePermission):
     def has_permission(self, request, view):
@@ -13,45 +33,328 @@ class IsEmployerOrReadOnly(permissions.BasePermission):
                 hasattr(request.user, 'profile') and 
                 request.user.profile.is_employer)
 
-class JobViewSet(viewsets.ModelViewSet):
-    queryset = Job.objects.filter(is_active=True).annotate(
-        application_count=Count('applications')
-    )
+class IsEmployerOrStaff(permissions.BasePermission):
+    def has_permission(self, request, view):
+        user = request.user
+        return user.is_authenticated and (
+            user.is_staff or (hasattr(user, 'profile') and user.profile.is_employer)
+        )
+
+class ConditionalJobMixin:
+    """Answer list and retrieve with 304 before any serialization."""
+    
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        validators = list_validators(
+            queryset, request.query_params.urlencode(), request.accepted_renderer.format
+        )
+        response = not_modified(request, *validators)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+        return set_validators(response, *validators)
+    
+    def retrieve(self, request, *args, **kwargs):
+        validators = detail_validators(
+            self.get_queryset(), kwargs[self.lookup_field], request.accepted_renderer.format
+        )
+        response = not_modified(request, *validators)
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+        return set_validators(response, *validators)
+    
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        validators = await alist_validators(
+            queryset, request.query_params.urlencode(), request.accepted_renderer.format
+        )
+        response = await anot_modified(request, *validators)
+        if response is None:
+            response = await super().alist(request, *args, **kwargs)
+        return set_validators(response, *validators)
+    
+    async def aretrieve(self, request, *args, **kwargs):
+        validators = await adetail_validators(
+            self.get_queryset(), kwargs[self.lookup_field], request.accepted_renderer.format
+        )
+        response = await anot_modified(request, *validators)
+        if response is None:
+            response = await super().aretrieve(request, *args, **kwargs)
+        return set_validators(response, *validators)
+
+class CompactListMixin:
+    """``?fields=a,b`` lists plain ``.values()`` rows instead of serializing models."""
+    compact_fields_param = 'fields'
+    # Compact rows are cheap enough to allow much larger pages
+    compact_max_page_size = 1000
+    
+    def list(self, request, *args, **kwargs):
+        if self.compact_fields_param not in request.query_params:
+            return super().list(request, *args, **kwargs)
+        fields = parse_compact_fields(request.query_params[self.compact_fields_param])
+        rows = CompactJobRows(self.filter_queryset(self.get_queryset()), fields)
+        self.paginator.max_page_size = self.compact_max_page_size
+        page = self.paginate_queryset(rows.queryset)
+        return self.get_paginated_response(rows.render(page))
+    
+    async def alist(self, request, *args, **kwargs):
+        if self.compact_fields_param not in request.query_params:
+            return await super().alist(request, *args, **kwargs)
+        fields = parse_compact_fields(request.query_params[self.compact_fields_param])
+        rows = CompactJobRows(self.filter_queryset(self.get_queryset()), fields)
+        self.paginator.max_page_size = self.compact_max_page_size
+        page = await self.apaginate_queryset(rows.queryset)
+        return await self.aget_paginated_response(rows.render(page))
+
+class AsyncReadMixin:
+    """Run the ``async_actions`` as coroutines when ``settings.ASYNC_VIEWS`` is on.
+    
+    Requests keep APIView's lifecycle: initial() (authentication,
+    permissions, throttles, negotiation) and exception handling run in a
+    worker thread, as they may query, and only the ``a<action>`` handler
+    runs on the event loop with the async ORM. Other actions of the same
+    route go through the regular dispatch() in a worker thread.
+    """
+    async_actions = ()
+    # Set per view by as_view()
+    async_dispatch = False
+    
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        if not settings.ASYNC_VIEWS or not set(actions.values()) & set(cls.async_actions):
+            return super().as_view(actions, **initkwargs)
+        view = super().as_view(actions, async_dispatch=True, **initkwargs)
+        
+        # The view returns dispatch()'s coroutine; Django awaits coroutine functions only
+        @functools.wraps(view)
+        async def async_view(request, *args, **kwargs):
+            return await view(request, *args, **kwargs)
+        return async_view
+    
+    def dispatch(self, request, *args, **kwargs):
+        if self.async_dispatch:
+            return self.adispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+    
+    async def adispatch(self, request, *args, **kwargs):
+        action = self.action_map.get(request.method.lower())
+        if action not in self.async_actions:
+            return await sync_to_async(super().dispatch)(request, *args, **kwargs)
+        # As APIView.dispatch(), awaiting the handler
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            response = await getattr(self, f'a{action}')(request, *args, **kwargs)
+        except Exception as exc:
+            response = await sync_to_async(self.handle_exception)(exc)
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+    
+    async def alist(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            return await self.aget_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer([obj async for obj in queryset], many=True).data)
+    
+    async def aretrieve(self, request, *args, **kwargs):
+        return Response(self.get_serializer(await self.aget_object()).data)
+    
+    async def aget_object(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            obj = await aget_object_or_404(queryset, **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except (TypeError, ValueError, DjangoValidationError):
+            raise Http404
+        await sync_to_async(self.check_object_permissions)(self.request, obj)
+        return obj
+    
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        return await self.paginator.apaginate_queryset(queryset, self.request, view=self)
+    
+    async def aget_paginated_response(self, data):
+        return self.get_paginated_response(data)
+
+class JobViewSet(ConditionalJobMixin, CompactListMixin, AsyncReadMixin, viewsets.ModelViewSet):
+    queryset = Job.objects.active().for_api()
     serializer_class = JobSerializer
     permission_classes = [IsEmployerOrReadOnly]
+    pagination_class = KeysetCursorPagination
+    # Read-only actions whose queries may be served by a replica
+    replica_actions = {'list', 'retrieve', 'analytics', 'recommended', 'nearby'}
+    # Served on the event loop under ASGI (settings.ASYNC_VIEWS)
+    async_actions = ('list', 'retrieve', 'analytics', 'nearby')
+    
+    def dispatch(self, request, *args, **kwargs):
+        if self.action_map.get(request.method.lower()) not in self.replica_actions:
+            return super().dispatch(request, *args, **kwargs)
+        if self.async_dispatch:
+            return replica_reads(self.adispatch)(request, *args, **kwargs)
+        with read_from_replicas():
+            return super().dispatch(request, *args, **kwargs)
+    
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action != 'list':
+            return queryset
+        params = self.request.query_params
+        search_query = params.get('search', '')
+        if search_query:
+            queryset = search_jobs(queryset, search_query)
+        try:
+            queryset = filter_jobs(queryset, params)
+        except InvalidFilter as exc:
+            raise ValidationError({exc.param: [exc.message]})
+        return sort_jobs(queryset, params)
+    
+    def wants_facets(self):
+        return self.request.query_params.get('facets', '').lower() in ('1', 'true')
+    
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.wants_facets():
+            response.data['facets'] = facet_counts(self.filter_queryset(self.get_queryset()))
+        return response
+    
+    async def aget_paginated_response(self, data):
+        response = self.paginator.get_paginated_response(data)
+        if self.wants_facets():
+            response.data['facets'] = await afacet_counts(self.filter_queryset(self.get_queryset()))
+        return response
     
     def perform_create(self, serializer):
         serializer.save(posted_by=self.request.user)
     
-    @action(detail=False, methods=['get'])
-    def analytics(self, request):
-        total_jobs = Job.objects.filter(is_active=True).count()
-        total_applications = Application.objects.count()
-        
-        top_jobs = Job.objects.annotate(
-            app_count=Count('applications')
-        ).order_by('-app_count')[:5]
-        
-        job_types = Job.objects.values('job_type').annotate(
-            count=Count('id')
+    @action(detail=False, methods=['post'], url_path='import')
+    def bulk_import(self, request):
+        # Rows are read line by line; the upload is never loaded as a whole
+        upload = request.FILES.get('file') if request.content_type.startswith('multipart/') else None
+        if upload is not None:
+            lines, is_csv = upload, upload.name.lower().endswith('.csv')
+        else:
+            lines, is_csv = request.stream or [], 'csv' in request.content_type
+        rows = bulk.iter_csv(lines) if is_csv else bulk.iter_jsonl(lines)
+        result = bulk.import_jobs(rows, request.user)
+        written = result.created + result.updated
+        return Response(
+            result.as_dict(),
+            status=status.HTTP_400_BAD_REQUEST if result.errors and not written else status.HTTP_200_OK,
         )
-        
+    
+    # Streams every active job, external ids included: not for anonymous scraping
+    @action(detail=False, methods=['get'], permission_classes=[IsEmployerOrStaff])
+    def export(self, request):
+        output = request.query_params.get('output', 'jsonl')
+        if output not in ('csv', 'jsonl'):
+            return Response({'detail': 'output must be csv or jsonl.'}, status=status.HTTP_400_BAD_REQUEST)
+        jobs = Job.objects.active().order_by('id')
+        if output == 'csv':
+            response = StreamingHttpResponse(bulk.export_csv(jobs), content_type='text/csv')
+        else:
+            response = StreamingHttpResponse(bulk.export_jsonl(jobs), content_type='application/x-ndjson')
+        response['Content-Disposition'] = f'attachment; filename="jobs.{output}"'
+        return response
+    
+    # Served from the rollup table and the stored per-job counters
+    ANALYTICS_TOTALS = {
+        'total_jobs': Coalesce(Sum('active_jobs'), 0),
+        'total_applications': Coalesce(Sum('applications'), 0),
+    }
+    
+    def analytics_querysets(self):
+        top_jobs = Job.objects.for_api().order_by('-applications_count')[:5]
+        job_types = JobTypeDailyStat.objects.values('job_type').annotate(
+            count=Sum('jobs')
+        ).filter(count__gt=0).order_by('job_type')
+        return top_jobs, job_types
+    
+    def analytics_response(self, totals, top_jobs, job_types):
         return Response({
-            'total_jobs': total_jobs,
-            'total_applications': total_applications,
+            'total_jobs': totals['total_jobs'],
+            'total_applications': totals['total_applications'],
             'top_jobs': JobSerializer(top_jobs, many=True).data,
-            'job_types': list(job_types),
+            'job_types': job_types,
         })
+    
+    @action(detail=False, methods=['get'])
+    def analytics(self, request):
+        top_jobs, job_types = self.analytics_querysets()
+        return self.analytics_response(
+            JobTypeDailyStat.objects.aggregate(**self.ANALYTICS_TOTALS), list(top_jobs), list(job_types)
+        )
+    
+    async def aanalytics(self, request):
+        top_jobs, job_types = self.analytics_querysets()
+        return self.analytics_response(
+            await JobTypeDailyStat.objects.aaggregate(**self.ANALYTICS_TOTALS),
+            [job async for job in top_jobs],
+            [row async for row in job_types],
+        )
+    
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    def recommended(self, request):
+        if not recommendations.available():
+            return Response(
+                {'detail': 'Recommendations need NumPy and SciPy installed.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        try:
+            limit = int(request.query_params.get('limit', recommendations.DEFAULT_LIMIT))
+        except ValueError:
+            return Response({'detail': 'limit must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, recommendations.MAX_LIMIT))
+        jobs = recommendations.recommend_jobs(request.user, limit, queryset=Job.objects.active().for_api())
+        return Response({'results': RecommendedJobSerializer(jobs, many=True).data})
+    
+    def nearby_params(self, request):
+        # The ?limit= closest jobs to ?near= (a place or "lat,lon"), at any distance
+        point = geo.parse_point(request.query_params.get('near', ''))
+        if point is None:
+            raise ParseError('near must be a known place or "lat,lon".')
+        try:
+            limit = int(request.query_params.get('limit', geo.DEFAULT_NEAREST))
+        except ValueError:
+            raise ParseError('limit must be an integer.')
+        return point, max(1, min(limit, geo.MAX_NEAREST))
+    
+    @action(detail=False, methods=['get'])
+    def nearby(self, request):
+        point, limit = self.nearby_params(request)
+        jobs = geo.nearest_jobs(Job.objects.active().for_api(), *point, limit)
+        return Response({'results': JobSerializer(jobs, many=True).data})
+    
+    async def anearby(self, request):
+        point, limit = self.nearby_params(request)
+        jobs = await geo.anearest_jobs(Job.objects.active().for_api(), *point, limit)
+        return Response({'results': JobSerializer(jobs, many=True).data})
 
 class ApplicationViewSet(viewsets.ModelViewSet):
     serializer_class = ApplicationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetCursorPagination
     
     def get_queryset(self):
         user = self.request.user
         if hasattr(user, 'profile') and user.profile.is_employer:
-            return Application.objects.filter(job__posted_by=user)
-        return Application.objects.filter(applicant=user)
+            return Application.objects.for_api().filter(job__posted_by=user)
+        return Application.objects.for_api().filter(applicant=user)
     
     def perform_create(self, serializer):
-        serializer.save(applicant=self.request.user)
\ No newline at end of file
+        serializer.save(applicant=self.request.user)
+    
+    @action(detail=False, methods=['post'], url_path='bulk-status')
+    def bulk_status(self, request):
+        serializer = BulkStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        updated = bulk.update_application_statuses(
+            request.user,
+            serializer.validated_data['application_ids'],
+            serializer.validated_data['status'],
+        )
+        return Response({'updated': updated})
\ No newline at end of file
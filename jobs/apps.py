@@ -1,6 +1,34 @@
+import logging
+
 from django.apps import AppConfig
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def warn_if_cache_not_shared():
+    """Warn when /metrics/ is scraped but counters live in per-process locmem."""
+    backend = settings.CACHES['default']['BACKEND']
+    if settings.METRICS_TOKEN and backend.endswith('LocMemCache'):
+        logger.warning(
+            'METRICS_TOKEN is set but the cache is %s: with more than one worker, '
+            '/metrics/ reports a single process and fragment invalidation does not '
+            'reach other workers. Set REDIS_URL.', backend,
+        )
 
 
 class JobsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'jobs'
+
+    def ready(self):
+        from django.db import connections
+        from django.db.backends.signals import connection_created
+
+        from . import signals  # noqa: F401
+        from .instrumentation import install_query_hook
+
+        connection_created.connect(install_query_hook, dispatch_uid='jobs.install_query_hook')
+        for connection in connections.all(initialized_only=True):
+            install_query_hook(connection=connection)
+        warn_if_cache_not_shared()
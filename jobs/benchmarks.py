@@ -0,0 +1,436 @@
+import asyncio
+import bisect
+import datetime
+import importlib
+import io
+import itertools
+import math
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, reverse
+from django.utils import timezone
+
+from . import rollups
+from .cache import bump_version
+from .models import Application, Job, UserProfile
+from .profiling import view_requests
+from .recommendations import rebuild_vectors
+from .search import rebuild_index
+
+BATCH_SIZE = 2000
+
+ROLES = [
+    'Software Engineer', 'Backend Developer', 'Frontend Developer', 'Data Scientist',
+    'Data Engineer', 'Product Manager', 'Designer', 'DevOps Engineer', 'QA Engineer',
+    'Sales Representative', 'Account Manager', 'Marketing Specialist', 'Support Agent',
+    'Accountant', 'Recruiter', 'Nurse', 'Teacher', 'Warehouse Associate', 'Driver', 'Chef',
+]
+SENIORITY = ['Junior', '', '', 'Senior', 'Senior', 'Lead', 'Staff', 'Principal']
+# Roughly by job-board volume; weights follow a Zipf curve over this order
+LOCATIONS = [
+    'Remote', 'New York, NY', 'San Francisco, CA', 'London, UK', 'Berlin, Germany',
+    'Austin, TX', 'Seattle, WA', 'Chicago, IL', 'Toronto, Canada', 'Boston, MA',
+    'Bangalore, India', 'Paris, France', 'Amsterdam, Netherlands', 'Denver, CO',
+    'Los Angeles, CA', 'Sydney, Australia', 'Singapore', 'Dublin, Ireland',
+    'Atlanta, GA', 'Madrid, Spain', 'Stockholm, Sweden', 'Warsaw, Poland',
+    'Lisbon, Portugal', 'Miami, FL', 'Portland, OR', 'Zurich, Switzerland',
+    'Tokyo, Japan', 'Mexico City, Mexico', 'Sao Paulo, Brazil', 'Cape Town, South Africa',
+]
+JOB_TYPE_WEIGHTS = [('FT', 70), ('CT', 15), ('PT', 10), ('IN', 5)]
+SALARIES = ['', '', '$40k - $60k', '$60k - $80k', '$80k - $100k', '$100k - $130k', '$130k - $180k', '€50,000 - €70,000']
+WORDS = (
+    'build ship maintain design scale services customers team product data platform '
+    'reliable secure growth remote collaborate mentor review deliver analytics cloud '
+    'python django postgres api frontend backend mobile testing support operations '
+    'experience communication ownership impact roadmap quality performance benefits'
+).split()
+
+
+def zipf_cum_weights(n, exponent=1.1):
+    total = 0.0
+    weights = []
+    for rank in range(1, n + 1):
+        total += 1 / rank ** exponent
+        weights.append(total)
+    return weights
+
+
+def _pick(rng, values, cum_weights):
+    return values[bisect.bisect(cum_weights, rng.random() * cum_weights[-1])]
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+def _create_users(prefix, count, employer, batch_size):
+    # The id watermark keeps usernames unique when data is generated twice
+    first = User.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+    users = (
+        User(username=f'{prefix}-{first}-{i}', email=f'{prefix}-{i}@example.com', password='!')
+        for i in range(count)
+    )
+    for batch in _batched(users, batch_size):
+        with transaction.atomic():
+            User.objects.bulk_create(batch, batch_size=batch_size)
+    ids = list(User.objects.filter(pk__gt=first, username__startswith=prefix).values_list('pk', flat=True))
+    for batch in _batched(ids, batch_size):
+        with transaction.atomic():
+            UserProfile.objects.bulk_create(
+                [UserProfile(user_id=pk, is_employer=employer, is_candidate=not employer) for pk in batch],
+                batch_size=batch_size,
+            )
+    return ids
+
+
+def generate_dataset(jobs, applications, employers=None, candidates=None, companies=None,
+                     seed=0, batch_size=BATCH_SIZE, stdout=None):
+    """Bulk-load a synthetic, skewed data set and rebuild the derived tables.
+
+    Companies and locations follow Zipf curves and applications per job a
+    Pareto curve, so a few hot jobs and cities dominate as in production.
+    The same arguments and seed always produce the same rows. Each batch
+    commits on its own, so a large load never holds one long transaction;
+    an interrupted run leaves the batches it finished.
+    """
+    rng = random.Random(seed)
+    employers = employers or max(1, jobs // 50)
+    candidates = candidates or max(1, applications // 20)
+    companies = companies or max(1, jobs // 20)
+    log = stdout.write if stdout else (lambda message: None)
+
+    employer_ids = _create_users('bench-employer', employers, True, batch_size)
+    candidate_ids = _create_users('bench-candidate', candidates, False, batch_size)
+    log(f'Created {len(employer_ids)} employers and {len(candidate_ids)} candidates.')
+
+    company_names = [f'{rng.choice(WORDS).title()} {rng.choice(WORDS).title()} {i}' for i in range(companies)]
+    company_weights = zipf_cum_weights(companies)
+    location_weights = zipf_cum_weights(len(LOCATIONS))
+    job_types, type_weights = zip(*JOB_TYPE_WEIGHTS)
+    type_weights = list(itertools.accumulate(type_weights))
+    # Each company posts through one employer account
+    company_employers = [rng.choice(employer_ids) for _ in range(companies)]
+
+    def make_job(i):
+        company = bisect.bisect(company_weights, rng.random() * company_weights[-1])
+        title = f'{rng.choice(SENIORITY)} {rng.choice(ROLES)}'.strip()
+        job = Job(
+            title=title,
+            description=' '.join(rng.choices(WORDS, k=rng.randint(80, 300))),
+            company_name=company_names[company],
+            location=_pick(rng, LOCATIONS, location_weights),
+            job_type=_pick(rng, job_types, type_weights),
+            salary_range=rng.choice(SALARIES),
+            is_active=rng.random() < 0.85,
+            posted_by_id=company_employers[company],
+        )
+        job.parse_salary()
+        job.geocode_location()
+        return job
+
+    first_job = Job.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+    for done, batch in enumerate(_batched(map(make_job, range(jobs)), batch_size), start=1):
+        with transaction.atomic():
+            Job.objects.bulk_create(batch, batch_size=batch_size)
+        log(f'Created {min(done * batch_size, jobs)} jobs...')
+
+    # Spread creation times over the last year so day-based rollups and
+    # ordering see realistic data; one UPDATE per day bucket
+    job_ids = list(Job.objects.filter(pk__gt=first_job).order_by('pk').values_list('pk', flat=True))
+    now = timezone.now()
+    for day, chunk in enumerate(_batched(job_ids, max(1, math.ceil(len(job_ids) / 365)))):
+        stamp = now - datetime.timedelta(days=365 - day, seconds=rng.randint(0, 86399))
+        Job.objects.filter(pk__range=(chunk[0], chunk[-1])).update(created_at=stamp, updated_at=stamp)
+
+    # Applications per job follow a Pareto curve; applicants of one job are
+    # a run of consecutive candidates, which keeps (job, applicant) unique
+    popularity = [rng.paretovariate(1.2) for _ in job_ids]
+    scale = applications / sum(popularity) if popularity else 0
+
+    def make_applications():
+        for job_id, weight in zip(job_ids, popularity):
+            count = min(len(candidate_ids), round(weight * scale))
+            start = rng.randrange(len(candidate_ids))
+            for offset in range(count):
+                yield Application(
+                    job_id=job_id,
+                    applicant_id=candidate_ids[(start + offset) % len(candidate_ids)],
+                    resume='resumes/benchmark.pdf',
+                    message='Benchmark application',
+                    status=rng.choice('PPPPRRAD'),
+                )
+
+    created = 0
+    for batch in _batched(make_applications(), batch_size):
+        with transaction.atomic():
+            Application.objects.bulk_create(batch, batch_size=batch_size)
+        created += len(batch)
+        log(f'Created {created} applications...')
+
+    # Bulk inserts skip the signals that maintain derived tables
+    rebuild_index(batch_size=batch_size)
+    rebuild_vectors(batch_size=batch_size)
+    rollups.rebuild(batch_size=batch_size)
+    bump_version('jobs')
+    return {'employers': len(employer_ids), 'candidates': len(candidate_ids), 'jobs': len(job_ids), 'applications': created}
+
+
+def percentile(samples, pct):
+    # Nearest-rank percentile; samples must be non-empty
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def _get(client, path):
+    response = client.get(path)
+    if response.streaming:
+        for _ in response.streaming_content:
+            pass
+    return response
+
+
+def benchmark_view(client, path, repeat, warmup):
+    for _ in range(warmup):
+        _get(client, path)
+    timings, queries = [], []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response = _get(client, path)
+            timings.append((time.perf_counter() - start) * 1000)
+        queries.append(len(captured.captured_queries))
+    # Memory is traced in a separate pass so tracing does not skew timings
+    tracemalloc.start()
+    try:
+        _get(client, path)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'status': response.status_code,
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'mean_ms': round(sum(timings) / len(timings), 3),
+        'queries': max(queries),
+        'peak_memory_kib': round(peak / 1024, 1),
+    }
+
+
+def default_users():
+    """Anonymous, the employer of the hottest job and the latest applicant."""
+    users = [None]
+    employer_id = Job.objects.order_by('-applications_count').values_list('posted_by', flat=True).first()
+    candidate_id = Application.objects.order_by('-submitted_at').values_list('applicant', flat=True).first()
+    users.extend(User.objects.filter(pk__in=[pk for pk in (employer_id, candidate_id) if pk]))
+    return users
+
+
+def run_benchmarks(users, repeat=20, warmup=2, skip=()):
+    results = []
+    requests = [(name, path) for name, path in view_requests() if name not in skip]
+    for user in users:
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+        for name, path in requests:
+            results.append({
+                'user': user.username if user else 'anonymous',
+                'view': name,
+                'path': path,
+                **benchmark_view(client, path, repeat, warmup),
+            })
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': timezone.now().isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'jobs': Job.objects.count(),
+        'applications': Application.objects.count(),
+    }
+
+
+def compare(baseline, current, metric='p50_ms'):
+    """Yield ``(user, view, before, after, ratio)`` for results present in both runs."""
+    before = {(row['user'], row['view']): row[metric] for row in baseline['results']}
+    for row in current['results']:
+        key = (row['user'], row['view'])
+        if key in before:
+            ratio = row[metric] / before[key] if before[key] else None
+            yield row['user'], row['view'], before[key], row[metric], ratio
+
+
+# Load tests. Both handlers are driven in-process, the way a threaded WSGI
+# server and an ASGI server would call them, so the comparison measures
+# Django and the database rather than a particular server or the network.
+
+LOAD_TEST_HOST = 'testserver'
+
+
+@contextmanager
+def page_views(async_views):
+    """Route the read-heavy pages to their async or sync views, as ASYNC_VIEWS would."""
+    from . import urls
+
+    def reload():
+        # The root URLconf's include() caches the app's patterns, so reload both
+        importlib.reload(urls)
+        importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+        clear_url_caches()
+
+    try:
+        with override_settings(ASYNC_VIEWS=async_views):
+            reload()
+            yield
+    finally:
+        reload()
+
+
+def load_test_paths():
+    """Anonymous reads of the read-heavy endpoints, pages and API."""
+    paths = [reverse('home'), reverse('job_list'), reverse('api-job-list')]
+    job_id = Job.objects.active().order_by('-applications_count').values_list('pk', flat=True).first()
+    if job_id is not None:
+        paths += [reverse('job_detail', kwargs={'pk': job_id}), reverse('api-job-detail', kwargs={'pk': job_id})]
+    return paths
+
+
+def _load_summary(results, seconds, concurrency):
+    timings = [elapsed * 1000 for elapsed, status in results]
+    return {
+        'requests': len(results),
+        'concurrency': concurrency,
+        'errors': sum(status >= 500 for elapsed, status in results),
+        'seconds': round(seconds, 3),
+        'requests_per_second': round(len(results) / seconds, 1) if seconds else None,
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+    }
+
+
+def _wsgi_environ(path):
+    path, _, query = path.partition('?')
+    return {
+        'REQUEST_METHOD': 'GET',
+        'SCRIPT_NAME': '',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SERVER_NAME': LOAD_TEST_HOST,
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': LOAD_TEST_HOST,
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+
+
+def load_test_wsgi(paths, requests, concurrency):
+    """Send ``requests`` GETs through the WSGI handler from ``concurrency`` threads."""
+    handler = WSGIHandler()
+
+    def fetch(path):
+        statuses = []
+        start = time.perf_counter()
+        body = handler(_wsgi_environ(path), lambda status, headers, exc_info=None: statuses.append(status))
+        try:
+            for _ in body:
+                pass
+        finally:
+            body.close()
+        return time.perf_counter() - start, int(statuses[0].split()[0])
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        start = time.perf_counter()
+        results = list(pool.map(fetch, itertools.islice(itertools.cycle(paths), requests)))
+        seconds = time.perf_counter() - start
+    return _load_summary(results, seconds, concurrency)
+
+
+async def _asgi_request(application, path):
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [(b'host', LOAD_TEST_HOST.encode())],
+        'client': ('127.0.0.1', 0),
+        'server': (LOAD_TEST_HOST, 80),
+    }
+    received = False
+
+    async def receive():
+        nonlocal received
+        if not received:
+            received = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # The client never disconnects; Django cancels this wait when done
+        await asyncio.Event().wait()
+
+    statuses = []
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+
+    start = time.perf_counter()
+    await application(scope, receive, send)
+    return time.perf_counter() - start, statuses[0]
+
+
+def load_test_asgi(paths, requests, concurrency):
+    """Send ``requests`` GETs through the ASGI handler, at most ``concurrency`` at a time."""
+    application = ASGIHandler()
+
+    async def run():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(path):
+            async with semaphore:
+                return await _asgi_request(application, path)
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*map(fetch, itertools.islice(itertools.cycle(paths), requests)))
+        return results, time.perf_counter() - start
+
+    results, seconds = asyncio.run(run())
+    return _load_summary(results, seconds, concurrency)
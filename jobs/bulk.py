@@ -0,0 +1,196 @@
+import csv
+import json
+from dataclasses import dataclass, field
+
+from django.core.exceptions import PermissionDenied
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import rollups
+from .cache import bump_version
+from .dashboard import invalidate_dashboard
+from .models import Application, Job
+from .notifications import notify_status_changes
+from .recommendations import save_job_vectors
+from .search import index_jobs
+from .serializers import JobImportSerializer
+
+BATCH_SIZE = 500
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FIELDS = [
+    'id', 'external_id', 'title', 'description', 'company_name', 'location',
+    'job_type', 'salary_range', 'expires_at', 'created_at', 'updated_at',
+]
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    updated: int = 0
+    errors: list = field(default_factory=list)
+
+    def as_dict(self):
+        return {'created': self.created, 'updated': self.updated, 'errors': self.errors}
+
+
+def _text_lines(lines):
+    for line in lines:
+        yield line.decode('utf-8') if isinstance(line, bytes) else line
+
+
+def iter_jsonl(lines):
+    """Yield ``(row_number, row_or_None, error_or_None)`` for each JSON line."""
+    for number, line in enumerate(_text_lines(lines), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield number, None, {'non_field_errors': [f'Invalid JSON: {exc}']}
+            continue
+        if not isinstance(row, dict):
+            yield number, None, {'non_field_errors': ['Each line must be a JSON object.']}
+            continue
+        yield number, row, None
+
+
+def iter_csv(lines):
+    reader = csv.DictReader(_text_lines(lines))
+    for number, row in enumerate(reader, start=1):
+        yield number, {key: value for key, value in row.items() if key}, None
+
+
+def import_jobs(rows, posted_by, batch_size=BATCH_SIZE):
+    """Upsert jobs keyed on ``external_id`` in batches of bulk queries.
+
+    Invalid rows are reported in the result and skipped; valid rows of the
+    same batch are still written.
+    """
+    result = ImportResult()
+    batch = []
+    for number, row, error in rows:
+        if error is not None:
+            result.errors.append({'row': number, 'errors': error})
+            continue
+        serializer = JobImportSerializer(data=row)
+        if not serializer.is_valid():
+            result.errors.append({'row': number, 'errors': serializer.errors})
+            continue
+        batch.append((number, serializer.validated_data))
+        if len(batch) >= batch_size:
+            _import_batch(batch, posted_by, result)
+            batch = []
+    if batch:
+        _import_batch(batch, posted_by, result)
+    return result
+
+
+def _import_batch(batch, posted_by, result):
+    # The last occurrence of a repeated external_id wins
+    rows = {data['external_id']: (number, data) for number, data in batch}
+    existing = {
+        job.external_id: job
+        for job in Job.objects.filter(external_id__in=list(rows))
+    }
+    to_create, to_update, changes = [], [], []
+    update_fields = set()
+    now = timezone.now()
+    for external_id, (number, data) in rows.items():
+        job = existing.get(external_id)
+        if job is None:
+            job = Job(posted_by=posted_by, **data)
+            job.set_default_expiry()
+            job.parse_salary()
+            job.geocode_location()
+            to_create.append(job)
+            continue
+        if job.posted_by_id != posted_by.pk:
+            result.errors.append({
+                'row': number,
+                'errors': {'external_id': ['Belongs to a job posted by another employer.']},
+            })
+            continue
+        before = rollups.job_state(job)
+        for name, value in data.items():
+            setattr(job, name, value)
+        job.updated_at = now
+        update_fields.update(data)
+        if 'salary_range' in data:
+            job.parse_salary()
+            update_fields.update(Job.SALARY_FIELDS)
+        if 'location' in data:
+            job.geocode_location()
+            update_fields.update(Job.GEO_FIELDS)
+        to_update.append(job)
+        changes.append((before, rollups.job_state(job)))
+
+    try:
+        with transaction.atomic():
+            Job.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+            if to_update:
+                Job.objects.bulk_update(to_update, sorted(update_fields | {'updated_at'}), batch_size=BATCH_SIZE)
+            # bulk queries skip model signals, so refresh derived data here
+            created = list(Job.objects.filter(external_id__in=[job.external_id for job in to_create]))
+            changes.extend((None, rollups.job_state(job)) for job in created)
+            rollups.apply_job_states(changes)
+            index_jobs(created + to_update)
+            save_job_vectors(created + to_update)
+            transaction.on_commit(lambda: bump_version('jobs'))
+            transaction.on_commit(lambda: invalidate_dashboard(posted_by.pk))
+    except IntegrityError as exc:
+        for number, _ in rows.values():
+            result.errors.append({'row': number, 'errors': {'non_field_errors': [str(exc)]}})
+        return
+    result.created += len(created)
+    result.updated += len(to_update)
+
+
+def _export_rows(queryset):
+    for row in queryset.values_list(*EXPORT_FIELDS).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield [value.isoformat() if hasattr(value, 'isoformat') else value for value in row]
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def export_jsonl(queryset):
+    for row in _export_rows(queryset):
+        yield json.dumps(dict(zip(EXPORT_FIELDS, row))) + '\n'
+
+
+def export_csv(queryset):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in _export_rows(queryset):
+        yield writer.writerow(row)
+
+
+def update_application_statuses(employer, application_ids, status, job_id=None):
+    """Set ``status`` on the given applications with a single UPDATE.
+
+    Every id must belong to a job posted by ``employer`` (and to ``job_id``
+    when given), otherwise nothing is changed and PermissionDenied is raised.
+    Returns the number of applications whose status changed.
+    """
+    ids = set(application_ids)
+    owned = Application.objects.filter(pk__in=ids, job__posted_by=employer)
+    if job_id is not None:
+        owned = owned.filter(job_id=job_id)
+    rows = list(owned.order_by().values(
+        'pk', 'status', 'applicant_id', 'applicant__username', 'applicant__email', 'job__title',
+    ))
+    if len(rows) != len(ids):
+        raise PermissionDenied('Some applications do not belong to your jobs.')
+    changed = [row for row in rows if row['status'] != status]
+    if not changed:
+        return 0
+
+    with transaction.atomic():
+        # update() skips post_save, so notifications and dashboards are handled here
+        Application.objects.filter(pk__in=[row['pk'] for row in changed]).update(status=status)
+        notify_status_changes(changed, status)
+        applicant_ids = [row['applicant_id'] for row in changed]
+        transaction.on_commit(lambda: invalidate_dashboard(*applicant_ids))
+    return len(changed)
@@ -0,0 +1,123 @@
+import time
+
+from django.core.cache import cache
+
+from . import metrics
+from .concurrency import gather_queries
+from .models import Job
+from .routers import read_from_primary
+
+LOCK_TIMEOUT = 30
+STALE_FACTOR = 10
+
+HOME_STATS_KEY = 'jobs:home_stats'
+HOME_STATS_TIMEOUT = 300
+
+
+def _version_key(namespace):
+    return f'{namespace}:version'
+
+
+def get_version(namespace):
+    # Seed with a timestamp so an evicted counter never repeats an old version
+    return cache.get_or_set(_version_key(namespace), time.time_ns(), None)
+
+
+def bump_version(namespace):
+    try:
+        cache.incr(_version_key(namespace))
+    except ValueError:
+        cache.set(_version_key(namespace), time.time_ns(), None)
+
+
+async def aget_version(namespace):
+    return await cache.aget_or_set(_version_key(namespace), time.time_ns(), None)
+
+
+def get_or_refresh(key, compute, timeout, namespace=None):
+    """Return a cached value, recomputing it in at most one worker at a time.
+
+    Entries are invalidated by bumping the namespace version. While one
+    worker holds the refresh lock, others keep serving the previous value.
+    ``compute`` always reads the primary: a replica lagging behind the
+    version bump would otherwise be cached as fresh for the whole timeout.
+    """
+    version = get_version(namespace) if namespace else None
+    envelope = cache.get(key)
+    cache_name = key.split(':', 1)[0]
+    if envelope is not None and envelope['version'] == version and envelope['fresh_until'] > time.time():
+        metrics.record_cache(cache_name, True)
+        return envelope['value']
+
+    lock_key = f'{key}:lock'
+    locked = cache.add(lock_key, 1, LOCK_TIMEOUT)
+    if not locked and envelope is not None:
+        metrics.record_cache(cache_name, True)
+        return envelope['value']
+    metrics.record_cache(cache_name, False)
+    try:
+        with read_from_primary():
+            value = compute()
+        cache.set(key, {
+            'version': version,
+            'fresh_until': time.time() + timeout,
+            'value': value,
+        }, timeout * STALE_FACTOR)
+    finally:
+        if locked:
+            cache.delete(lock_key)
+    return value
+
+
+async def aget_or_refresh(key, acompute, timeout, namespace=None):
+    # Async twin of get_or_refresh(); ``acompute`` is a coroutine function
+    version = await aget_version(namespace) if namespace else None
+    envelope = await cache.aget(key)
+    cache_name = key.split(':', 1)[0]
+    if envelope is not None and envelope['version'] == version and envelope['fresh_until'] > time.time():
+        metrics.record_cache(cache_name, True)
+        return envelope['value']
+
+    lock_key = f'{key}:lock'
+    locked = await cache.aadd(lock_key, 1, LOCK_TIMEOUT)
+    if not locked and envelope is not None:
+        metrics.record_cache(cache_name, True)
+        return envelope['value']
+    metrics.record_cache(cache_name, False)
+    try:
+        with read_from_primary():
+            value = await acompute()
+        await cache.aset(key, {
+            'version': version,
+            'fresh_until': time.time() + timeout,
+            'value': value,
+        }, timeout * STALE_FACTOR)
+    finally:
+        if locked:
+            await cache.adelete(lock_key)
+    return value
+
+
+def compute_home_stats():
+    return {
+        'recent_jobs': list(Job.objects.for_listing()[:6]),
+        'total_jobs': Job.objects.active().count(),
+        'total_companies': Job.objects.values('company_name').distinct().count(),
+    }
+
+
+def get_home_stats():
+    return get_or_refresh(HOME_STATS_KEY, compute_home_stats, HOME_STATS_TIMEOUT, namespace='jobs')
+
+
+async def acompute_home_stats():
+    recent_jobs, total_jobs, total_companies = await gather_queries(
+        lambda: list(Job.objects.for_listing()[:6]),
+        Job.objects.active().count,
+        Job.objects.values('company_name').distinct().count,
+    )
+    return {'recent_jobs': recent_jobs, 'total_jobs': total_jobs, 'total_companies': total_companies}
+
+
+async def aget_home_stats():
+    return await aget_or_refresh(HOME_STATS_KEY, acompute_home_stats, HOME_STATS_TIMEOUT, namespace='jobs')
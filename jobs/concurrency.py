@@ -0,0 +1,50 @@
+import asyncio
+import functools
+
+from asgiref.sync import sync_to_async
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+
+
+def _in_transaction():
+    return any(conn.in_atomic_block for conn in connections.all(initialized_only=True))
+
+
+def _connections_reused():
+    # Without persistent or pooled connections, every worker thread would
+    # open a fresh connection per callable, costing more than the overlap saves
+    settings_dict = connections[DEFAULT_DB_ALIAS].settings_dict
+    return bool(settings_dict['CONN_MAX_AGE'] or settings_dict['OPTIONS'].get('pool'))
+
+
+def _run_all(funcs):
+    return [func() for func in funcs]
+
+
+def _own_connection(func):
+    # Runs in a pooled worker thread, which holds its own connections; they
+    # are recycled under the usual CONN_MAX_AGE / health-check rules.
+    @functools.wraps(func)
+    def wrapper():
+        close_old_connections()
+        try:
+            return func()
+        finally:
+            close_old_connections()
+    return wrapper
+
+
+async def gather_queries(*funcs):
+    """Run independent synchronous ORM callables concurrently.
+
+    Django's async ORM serializes queries on the request's thread, so
+    ``asyncio.gather()`` over ``acount()`` calls alone does not overlap
+    them. Each callable here runs on its own thread and connection instead.
+    Inside a transaction the callables run one after another on the
+    request's connection, since other connections would not see its writes;
+    so do they, in a single thread hop, when connections are not reused.
+    """
+    if not _connections_reused() or await sync_to_async(_in_transaction)():
+        return await sync_to_async(_run_all)(funcs)
+    return await asyncio.gather(*(
+        sync_to_async(_own_connection(func), thread_sensitive=False)() for func in funcs
+    ))
@@ -0,0 +1,125 @@
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.contrib.messages import get_messages
+from django.core.exceptions import EmptyResultSet
+from django.db.models import Count, Max, Sum
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .cache import aget_or_refresh, get_or_refresh
+
+
+def _etag(*parts):
+    return '"%s"' % hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+LIST_STATE = {
+    'last_modified': Max('updated_at'),
+    'jobs': Count('id'),
+    'applications': Sum('applications_count'),
+}
+LIST_STATE_TIMEOUT = 60
+
+
+def _list_validators(state, vary_on):
+    return _etag(state['last_modified'], state['jobs'], state['applications'], *vary_on), state['last_modified']
+
+
+def _list_state_key(queryset):
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        # Nothing can match, so there is nothing worth caching
+        return None
+    return 'validators:' + hashlib.md5(repr((sql, params)).encode()).hexdigest()
+
+
+def list_validators(queryset, *vary_on):
+    """Return ``(etag, last_modified)`` for a filtered set of jobs.
+
+    One aggregate query, cached per filter until any job changes, so plain
+    page views do not pay for it; the count catches jobs leaving the set,
+    which does not move the newest ``updated_at``, and the counter sum
+    catches new applications shown on the cards within LIST_STATE_TIMEOUT.
+    """
+    queryset = queryset.order_by()
+    key = _list_state_key(queryset)
+    if key is None:
+        return _list_validators(queryset.aggregate(**LIST_STATE), vary_on)
+    state = get_or_refresh(key, lambda: queryset.aggregate(**LIST_STATE), LIST_STATE_TIMEOUT, namespace='jobs')
+    return _list_validators(state, vary_on)
+
+
+async def alist_validators(queryset, *vary_on):
+    queryset = queryset.order_by()
+    key = _list_state_key(queryset)
+    if key is None:
+        return _list_validators(await queryset.aaggregate(**LIST_STATE), vary_on)
+
+    async def compute():
+        return await queryset.aaggregate(**LIST_STATE)
+
+    state = await aget_or_refresh(key, compute, LIST_STATE_TIMEOUT, namespace='jobs')
+    return _list_validators(state, vary_on)
+
+
+def _detail_queryset(queryset, pk):
+    return queryset.order_by().filter(pk=pk).values_list('updated_at', 'applications_count')
+
+
+def _detail_validators(row, pk, vary_on):
+    if row is None:
+        return None, None
+    return _etag(pk, *row, *vary_on), row[0]
+
+
+def detail_validators(queryset, pk, *vary_on):
+    try:
+        row = _detail_queryset(queryset, pk).first()
+    except (TypeError, ValueError):
+        # Malformed ids are left to the view's own 404 handling
+        return None, None
+    return _detail_validators(row, pk, vary_on)
+
+
+async def adetail_validators(queryset, pk, *vary_on):
+    try:
+        row = await _detail_queryset(queryset, pk).afirst()
+    except (TypeError, ValueError):
+        return None, None
+    return _detail_validators(row, pk, vary_on)
+
+
+def page_validators(user, validators):
+    # HTML pages differ per user: only the ETag carries that, so
+    # Last-Modified is sent to anonymous visitors alone
+    etag, last_modified = validators
+    return etag, last_modified if not user.is_authenticated else None
+
+
+def not_modified(request, etag, last_modified):
+    """Return a 304 response when the client's copy is current, else None."""
+    if etag is None or request.method not in ('GET', 'HEAD'):
+        return None
+    # A 304 would swallow messages queued for this page
+    if len(get_messages(request)):
+        return None
+    return get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+
+
+# Reading the messages may load the session
+anot_modified = sync_to_async(not_modified)
+
+
+def set_validators(response, etag, last_modified):
+    if etag is None or response.status_code not in (200, 304):
+        return response
+    response.headers['ETag'] = etag
+    if last_modified is not None:
+        response.headers['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
@@ -0,0 +1,101 @@
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+
+from .cache import aget_or_refresh, bump_version, get_or_refresh
+from .concurrency import gather_queries
+from .models import Application, Job
+from .recommendations import recommend_jobs
+
+DASHBOARD_TIMEOUT = 300
+RECOMMENDED_JOBS = 5
+
+
+def _namespace(user_id):
+    return f'dashboard:{user_id}'
+
+
+def invalidate_dashboard(*user_ids):
+    for user_id in set(user_ids):
+        if user_id is not None:
+            bump_version(_namespace(user_id))
+
+
+def _employer_queries(user):
+    jobs = Job.objects.filter(posted_by=user)
+
+    def totals():
+        return jobs.aggregate(
+            total_jobs=Count('id'),
+            active_jobs=Count('id', filter=Q(is_active=True)),
+            total_applications=Coalesce(Sum('applications_count'), 0),
+        )
+
+    def top_jobs():
+        return list(jobs.order_by('-applications_count')[:5])
+
+    return totals, top_jobs
+
+
+def _employer_context(totals, top_jobs):
+    return {**totals, 'top_jobs': top_jobs, 'is_employer': True}
+
+
+def _candidate_queries(user):
+    def totals():
+        return Application.objects.filter(applicant=user).aggregate(
+            total_applications=Count('id'),
+            pending=Count('id', filter=Q(status='P')),
+            reviewed=Count('id', filter=Q(status='R')),
+            accepted=Count('id', filter=Q(status='A')),
+        )
+
+    def recent():
+        return list(Application.objects.for_candidate(user)[:5])
+
+    def recommended():
+        return recommend_jobs(user, RECOMMENDED_JOBS)
+
+    return totals, recent, recommended
+
+
+def _candidate_context(totals, recent_applications, recommended_jobs):
+    return {
+        **totals,
+        'recent_applications': recent_applications,
+        'recommended_jobs': recommended_jobs,
+        'is_employer': False,
+    }
+
+
+def get_employer_dashboard(user):
+    def compute():
+        return _employer_context(*(query() for query in _employer_queries(user)))
+
+    namespace = _namespace(user.pk)
+    return get_or_refresh(f'{namespace}:employer', compute, DASHBOARD_TIMEOUT, namespace=namespace)
+
+
+def get_candidate_dashboard(user):
+    def compute():
+        return _candidate_context(*(query() for query in _candidate_queries(user)))
+
+    namespace = _namespace(user.pk)
+    return get_or_refresh(f'{namespace}:candidate', compute, DASHBOARD_TIMEOUT, namespace=namespace)
+
+
+# The async variants run the totals and the list queries concurrently
+
+async def aget_employer_dashboard(user):
+    async def compute():
+        return _employer_context(*await gather_queries(*_employer_queries(user)))
+
+    namespace = _namespace(user.pk)
+    return await aget_or_refresh(f'{namespace}:employer', compute, DASHBOARD_TIMEOUT, namespace=namespace)
+
+
+async def aget_candidate_dashboard(user):
+    async def compute():
+        return _candidate_context(*await gather_queries(*_candidate_queries(user)))
+
+    namespace = _namespace(user.pk)
+    return await aget_or_refresh(f'{namespace}:candidate', compute, DASHBOARD_TIMEOUT, namespace=namespace)
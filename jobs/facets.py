@@ -0,0 +1,248 @@
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+from django.db.models import Case, CharField, F, Value, When
+from django.db.models.functions import Concat
+
+from .cache import aget_or_refresh, get_or_refresh
+from .geo import DEFAULT_RADIUS_KM, MAX_RADIUS_KM, parse_point, within_radius
+from .models import Job
+from .salary import BANDS, CURRENCIES, band_label, band_value, parse_band
+
+
+class InvalidFilter(ValueError):
+    def __init__(self, param, message):
+        super().__init__(f'{param}: {message}')
+        self.param = param
+        self.message = message
+
+
+def salary_band():
+    # "USD:50000" for an annual minimum between 50,000 and the next band
+    whens = [
+        When(salary_min__gte=low, then=Concat(F('salary_currency'), Value(band_value('', low))))
+        for low in reversed(BANDS)
+    ]
+    return Case(*whens, default=Value(''), output_field=CharField())
+
+
+# Query parameter -> Job field or expression
+FACETS = {
+    'job_type': 'job_type',
+    'location': 'location',
+    'company': 'company_name',
+    'salary': salary_band(),
+}
+FACET_LABELS = {
+    'job_type': 'Job Types',
+    'location': 'Locations',
+    'company': 'Companies',
+    'salary': 'Salaries',
+}
+FACET_LIMIT = 10
+FACET_TIMEOUT = 60
+
+# ?sort= value -> keyset ordering; both are served by partial indexes led
+# by salary_currency, since amounts only compare within one currency
+SALARY_SORTS = {
+    'salary': ('salary_min', 'id'),
+    '-salary': ('-salary_max', '-id'),
+}
+# Salary ranges and sorts without ?currency= compare amounts in this one
+DEFAULT_SALARY_CURRENCY = 'USD'
+
+
+def _amount(params, name):
+    value = params.get(name, '').strip()
+    if not value:
+        return None
+    if not value.isdecimal():
+        raise InvalidFilter(name, 'Enter a whole, non-negative amount.')
+    return int(value)
+
+
+def salary_currency(params):
+    """Return the currency a salary range or sort compares amounts in, or None without one."""
+    currency = params.get('currency', '').strip().upper() or DEFAULT_SALARY_CURRENCY
+    if currency not in CURRENCIES:
+        raise InvalidFilter('currency', 'Unknown currency.')
+    if params.get('salary_min', '').strip() or params.get('salary_max', '').strip():
+        return currency
+    if params.get('sort', '') in SALARY_SORTS:
+        return currency
+    return None
+
+
+def _radius(params):
+    value = params.get('radius', '').strip()
+    if not value:
+        return DEFAULT_RADIUS_KM
+    try:
+        radius = float(value)
+    except ValueError:
+        radius = None
+    if radius is None or not 0 < radius <= MAX_RADIUS_KM:
+        raise InvalidFilter('radius', f'Enter a distance in km, up to {MAX_RADIUS_KM:,}.')
+    return radius
+
+
+def filter_jobs(queryset, params):
+    """Narrow ``queryset`` by the facet values and salary range in ``params``.
+
+    ``salary_min``/``salary_max`` keep jobs whose annual range overlaps the
+    requested one. They and the salary sorts only consider jobs paid in
+    ``currency``, by default DEFAULT_SALARY_CURRENCY. ``near`` (a place or
+    "lat,lon") keeps jobs within ``radius`` km and annotates ``distance_km``.
+    Raises InvalidFilter for malformed values.
+    """
+    for name, field in FACETS.items():
+        value = params.get(name, '')
+        if not value:
+            continue
+        if name == 'salary':
+            try:
+                currency, low, high = parse_band(value)
+            except ValueError:
+                raise InvalidFilter(name, 'Unknown salary band.')
+            queryset = queryset.filter(salary_currency=currency, salary_min__gte=low)
+            if high is not None:
+                queryset = queryset.filter(salary_min__lt=high)
+        else:
+            queryset = queryset.filter(**{field: value})
+    minimum, maximum = _amount(params, 'salary_min'), _amount(params, 'salary_max')
+    currency = salary_currency(params)
+    if currency is not None:
+        queryset = queryset.filter(salary_currency=currency)
+    if minimum is not None:
+        queryset = queryset.filter(salary_max__gte=minimum)
+    if maximum is not None:
+        queryset = queryset.filter(salary_min__lte=maximum)
+    near = params.get('near', '').strip()
+    if near:
+        point = parse_point(near)
+        if point is None:
+            raise InvalidFilter('near', 'Unknown location.')
+        queryset = within_radius(queryset, *point, _radius(params))
+    return queryset
+
+
+def sort_jobs(queryset, params):
+    """Apply ``?sort=salary`` (lowest first) or ``-salary`` (highest first).
+
+    Expects ``queryset`` to come from filter_jobs(), which keeps one
+    currency. Jobs without a parsed salary are left out, keeping the keyset total.
+    ``near`` queries are ordered nearest first unless another sort is given.
+    """
+    sort = params.get('sort', '')
+    if sort in ('', 'distance') and 'distance_km' in queryset.query.annotations:
+        return queryset.order_by('distance_km', 'id')
+    ordering = SALARY_SORTS.get(sort)
+    if ordering is None:
+        return queryset
+    field = ordering[0].lstrip('-')
+    return queryset.filter(**{f'{field}__isnull': False}).order_by(*ordering)
+
+
+def _materialized(connection):
+    if connection.vendor == 'postgresql':
+        return 'MATERIALIZED '
+    if connection.vendor == 'sqlite' and connection.Database.sqlite_version_info >= (3, 35, 0):
+        return 'MATERIALIZED '
+    return ''
+
+
+def facet_sql(queryset, limit=FACET_LIMIT):
+    """Return ``(alias, sql, params)`` counting every facet of ``queryset`` in one statement.
+
+    The matching rows are selected once into a CTE; each facet then groups
+    that small result instead of filtering the jobs table again.
+    """
+    rows = queryset.order_by().values(**{
+        f'facet_{name}': F(source) if isinstance(source, str) else source
+        for name, source in FACETS.items()
+    })
+    alias = rows.db
+    connection = connections[alias]
+    sql, params = rows.query.get_compiler(using=alias).as_sql()
+    quote = connection.ops.quote_name
+    columns = [quote(f'facet_{name}') for name in FACETS]
+    branches = [
+        f'SELECT * FROM (SELECT {index} AS facet, {column} AS value, COUNT(*) AS hits '
+        f'FROM matched WHERE {column} <> %s GROUP BY {column} '
+        f'ORDER BY hits DESC, value LIMIT {int(limit)}) AS facet_{index}'
+        for index, column in enumerate(columns)
+    ]
+    sql = (
+        f'WITH matched ({", ".join(columns)}) AS {_materialized(connection)}({sql}) '
+        + ' UNION ALL '.join(branches)
+    )
+    return alias, sql, (*params, *[''] * len(branches))
+
+
+def facet_label(name, value):
+    if name == 'job_type':
+        return dict(Job.JOB_TYPES).get(value, value)
+    if name == 'salary':
+        try:
+            return band_label(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _run(alias, sql, params):
+    names = list(FACETS)
+    counts = {name: [] for name in names}
+    with connections[alias].cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    for index, value, hits in sorted(rows, key=lambda row: (row[0], -row[2], row[1])):
+        name = names[index]
+        counts[name].append({
+            'value': value,
+            'label': facet_label(name, value),
+            'count': hits,
+        })
+    return counts
+
+
+def _cache_key(sql, params):
+    # Without the alias, so the primary and every replica share one entry
+    return 'facets:' + hashlib.md5(repr((sql, params)).encode()).hexdigest()
+
+
+def facet_counts(queryset, limit=FACET_LIMIT):
+    """Return ``{facet: [{'value', 'label', 'count'}]}`` for the jobs in ``queryset``.
+
+    Cached per query until any job changes.
+    """
+    if queryset.query.is_empty():
+        return {name: [] for name in FACETS}
+    _, sql, params = facet_sql(queryset, limit)
+    # Resolved again inside the refresh, which reads the primary
+    return get_or_refresh(
+        _cache_key(sql, params), lambda: _run(queryset.db, sql, params), FACET_TIMEOUT, namespace='jobs',
+    )
+
+
+async def afacet_counts(queryset, limit=FACET_LIMIT):
+    if queryset.query.is_empty():
+        return {name: [] for name in FACETS}
+    _, sql, params = facet_sql(queryset, limit)
+
+    async def compute():
+        return await sync_to_async(_run)(queryset.db, sql, params)
+
+    return await aget_or_refresh(_cache_key(sql, params), compute, FACET_TIMEOUT, namespace='jobs')
+
+
+def facet_choices(counts, params):
+    """Facets for the filter form, keeping a selected value listed even past the limit."""
+    choices = []
+    for name, values in counts.items():
+        selected = params.get(name, '')
+        if selected and all(entry['value'] != selected for entry in values):
+            values = [{'value': selected, 'label': facet_label(name, selected), 'count': None}, *values]
+        choices.append({'name': name, 'label': FACET_LABELS[name], 'selected': selected, 'values': values})
+    return choices
@@ -3,6 +3,8 @@ from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
 from .models import Job, Application, UserProfile
 from django.core.exceptions import ValidationError
+from django.utils import timezone
+from .resumes import MAX_RESUME_SIZE, RESUME_TOO_LARGE
 
 class UserRegistrationForm(UserCreationForm):
     email = forms.EmailField(required=True)
@@ -25,13 +27,14 @@ class JobForm(forms.ModelForm):
     class Meta:
         model = Job
         fields = ['title', 'description', 'company_name', 'location', 
-                  'job_type', 'salary_range']
+                  'job_type', 'salary_range', 'expires_at']
         widgets = {
             'description': forms.Textarea(attrs={'rows': 5}),
             'title': forms.TextInput(attrs={'placeholder': 'e.g., Senior Python Developer'}),
             'company_name': forms.TextInput(attrs={'placeholder': 'Your Company Name'}),
             'location': forms.TextInput(attrs={'placeholder': 'e.g., Mumbai, India'}),
             'salary_range': forms.TextInput(attrs={'placeholder': 'e.g., ₹8-12 LPA'}),
+            'expires_at': forms.DateTimeInput(attrs={'type': 'datetime-local'}, format='%Y-%m-%dT%H:%M'),
         }
     
     def clean_title(self):
@@ -39,6 +42,12 @@ class JobForm(forms.ModelForm):
         if len(title) < 5:
             raise ValidationError("Job title must be at least 5 characters long.")
         return title
+    
+    def clean_expires_at(self):
+        expires_at = self.cleaned_data.get('expires_at')
+        if expires_at and 'expires_at' in self.changed_data and expires_at <= timezone.now():
+            raise ValidationError("The expiry date must be in the future.")
+        return expires_at
 
 class ApplicationForm(forms.ModelForm):
     class Meta:
@@ -51,11 +60,17 @@ class ApplicationForm(forms.ModelForm):
             }),
         }
     
+    def __init__(self, *args, oversized=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        # An oversized upload was dropped while streaming and arrives as no file
+        if 'resume' in oversized:
+            self.fields['resume'].error_messages['required'] = RESUME_TOO_LARGE
+    
     def clean_resume(self):
         resume = self.cleaned_data.get('resume')
         if resume:
-            if resume.size > 5 * 1024 * 1024:  # 5MB limit
-                raise ValidationError("Resume file size must be under 5MB.")
+            if resume.size > MAX_RESUME_SIZE:
+                raise ValidationError(RESUME_TOO_LARGE)
             ext = resume.name.split('.')[-1].lower()
             if ext not in ['pdf', 'doc', 'docx']:
                 raise ValidationError("Only PDF, DOC, and DOCX files are allowed.")
@@ -0,0 +1,35 @@
+import hashlib
+
+from django.core.cache import cache
+
+from . import metrics
+
+FRAGMENTS = ('card', 'description')
+FRAGMENT_TIMEOUT = 60 * 60
+
+
+def fragment_key(name, job_id):
+    # One slot per job and fragment; a new stamp overwrites the old HTML
+    return f'fragment:{name}:{job_id}'
+
+
+def fragment_stamp(job, vary_on):
+    parts = [job.updated_at.isoformat(), *(str(value) for value in vary_on)]
+    return hashlib.md5(':'.join(parts).encode()).hexdigest()
+
+
+def get_or_render(name, job, vary_on, render):
+    key = fragment_key(name, job.pk)
+    stamp = fragment_stamp(job, vary_on)
+    cached = cache.get(key)
+    if cached is not None and cached['stamp'] == stamp:
+        metrics.record_cache('fragment', True)
+        return cached['html']
+    metrics.record_cache('fragment', False)
+    html = render()
+    cache.set(key, {'stamp': stamp, 'html': html}, FRAGMENT_TIMEOUT)
+    return html
+
+
+def invalidate_fragments(*job_ids):
+    cache.delete_many([fragment_key(name, job_id) for job_id in job_ids for name in FRAGMENTS])
@@ -0,0 +1,193 @@
+"""Geocode ``Job.location`` against the bundled gazetteer and query by distance.
+
+Locations are resolved offline from ``data/gazetteer.csv`` (city, country,
+coordinates, aliases). Each geocoded job also stores a geohash, and radius
+queries scan only the few geohash cells around the circle, using the
+``job_geohash_idx`` index, before computing exact distances.
+"""
+import csv
+import functools
+import math
+import operator
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.db.models import F, Q, Value
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+GAZETTEER_PATH = Path(__file__).resolve().parent / 'data' / 'gazetteer.csv'
+EARTH_RADIUS_KM = 6371.0088
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+# About 1.2km x 0.6km: finer than the city-level gazetteer needs
+GEOHASH_PRECISION = 6
+
+DEFAULT_RADIUS_KM = 50
+MAX_RADIUS_KM = 20_000
+# Radii tried in turn by nearest_jobs before scanning every geocoded job
+NEAREST_RADII_KM = (10, 50, 250, 1000, 5000)
+DEFAULT_NEAREST = 10
+MAX_NEAREST = 50
+
+SEPARATORS_RE = re.compile(r'[,;/|()]| - ')
+WORD_RE = re.compile(r'\w+')
+COORDINATES_RE = re.compile(r'^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$')
+
+
+@dataclass(frozen=True)
+class Place:
+    name: str
+    country: str
+    latitude: float
+    longitude: float
+
+
+def _normalize(text):
+    return ' '.join(WORD_RE.findall(text.casefold()))
+
+
+@functools.lru_cache(maxsize=1)
+def gazetteer():
+    """Return ``{normalized name or alias: Place}``, read once per process."""
+    places = {}
+    with open(GAZETTEER_PATH, newline='', encoding='utf-8') as handle:
+        for row in csv.DictReader(handle):
+            place = Place(row['name'], row['country'], float(row['latitude']), float(row['longitude']))
+            for name in [row['name'], *filter(None, row['aliases'].split('|'))]:
+                places.setdefault(_normalize(name), place)
+    return places
+
+
+@functools.lru_cache(maxsize=4096)
+def geocode(location):
+    """Return the :class:`Place` for a free-text location, or None.
+
+    Tries the whole string, then each comma/slash/parenthesis separated part,
+    so "Mumbai, Maharashtra" and "Hybrid (London)" both resolve.
+    """
+    places = gazetteer()
+    for candidate in [location, *SEPARATORS_RE.split(location or '')]:
+        place = places.get(_normalize(candidate))
+        if place is not None:
+            return place
+    return None
+
+
+def parse_point(text):
+    """Return ``(latitude, longitude)`` for "lat,lon" or a known place name, else None."""
+    match = COORDINATES_RE.match(text or '')
+    if match:
+        latitude, longitude = float(match[1]), float(match[2])
+        if -90 <= latitude <= 90 and -180 <= longitude <= 180:
+            return latitude, longitude
+        return None
+    place = geocode(text)
+    return None if place is None else (place.latitude, place.longitude)
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    south, north, west, east = -90.0, 90.0, -180.0, 180.0
+    chars = []
+    bits = value = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            middle = (west + east) / 2
+            value = value << 1 | (longitude >= middle)
+            west, east = (middle, east) if longitude >= middle else (west, middle)
+        else:
+            middle = (south + north) / 2
+            value = value << 1 | (latitude >= middle)
+            south, north = (middle, north) if latitude >= middle else (south, middle)
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits = value = 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """Return ``(height, width)`` in degrees of a geohash cell."""
+    bits = 5 * precision
+    return 180.0 / 2 ** (bits // 2), 360.0 / 2 ** ((bits + 1) // 2)
+
+
+def covering_cells(latitude, longitude, radius_km):
+    """Return geohash prefixes whose cells contain the circle, or None to scan everything.
+
+    Uses the finest precision whose cells are at least as large as the
+    circle's bounding box, so the centre cell and its eight neighbours
+    always cover it.
+    """
+    half_height = math.degrees(radius_km / EARTH_RADIUS_KM)
+    # The circle is widest, in degrees of longitude, at its poleward edge
+    poleward = abs(latitude) + half_height
+    if poleward >= 90:
+        return None
+    half_width = half_height / math.cos(math.radians(poleward))
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = cell_size(precision)
+        if height >= half_height and width >= half_width:
+            break
+    else:
+        return None
+    cells = set()
+    for dy in (-height, 0, height):
+        for dx in (-width, 0, width):
+            y = latitude + dy
+            if -90 <= y < 90:
+                x = (longitude + dx + 180) % 360 - 180
+                cells.add(encode_geohash(y, x, precision))
+    return sorted(cells)
+
+
+def distance_expression(latitude, longitude):
+    """Haversine distance in km from a point to each job's coordinates."""
+    lat, lon = math.radians(latitude), math.radians(longitude)
+    half_chord = (
+        Power(Sin((Radians(F('latitude')) - Value(lat)) / 2), 2)
+        + Value(math.cos(lat)) * Cos(Radians(F('latitude')))
+        * Power(Sin((Radians(F('longitude')) - Value(lon)) / 2), 2)
+    )
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Sqrt(half_chord))
+
+
+def within_radius(queryset, latitude, longitude, radius_km):
+    """Keep geocoded jobs within ``radius_km``, annotated with ``distance_km``."""
+    cells = covering_cells(latitude, longitude, radius_km)
+    if cells is None:
+        queryset = queryset.filter(latitude__isnull=False)
+    else:
+        # Range scans rather than LIKE so the geohash index is used on every backend
+        queryset = queryset.filter(functools.reduce(operator.or_, (
+            Q(geohash__gte=cell, geohash__lt=cell + '~') for cell in cells
+        )))
+    queryset = queryset.annotate(distance_km=distance_expression(latitude, longitude))
+    if radius_km < MAX_RADIUS_KM:
+        queryset = queryset.filter(distance_km__lte=radius_km)
+    return queryset
+
+
+def nearest_jobs(queryset, latitude, longitude, limit=DEFAULT_NEAREST):
+    """Return the ``limit`` geocoded jobs closest to a point, nearest first.
+
+    Searches growing radii, so a dense area never computes distances for
+    far-away jobs: once a radius holds ``limit`` jobs, nothing outside it can
+    be nearer.
+    """
+    for radius_km in NEAREST_RADII_KM:
+        jobs = list(within_radius(queryset, latitude, longitude, radius_km).order_by('distance_km', 'id')[:limit])
+        if len(jobs) == limit:
+            return jobs
+    return list(within_radius(queryset, latitude, longitude, MAX_RADIUS_KM).order_by('distance_km', 'id')[:limit])
+
+
+async def anearest_jobs(queryset, latitude, longitude, limit=DEFAULT_NEAREST):
+    for radius_km in NEAREST_RADII_KM:
+        nearest = within_radius(queryset, latitude, longitude, radius_km).order_by('distance_km', 'id')[:limit]
+        jobs = [job async for job in nearest]
+        if len(jobs) == limit:
+            return jobs
+    nearest = within_radius(queryset, latitude, longitude, MAX_RADIUS_KM).order_by('distance_km', 'id')[:limit]
+    return [job async for job in nearest]
@@ -0,0 +1,96 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.template.backends.django import DjangoTemplates, Template
+
+from . import metrics
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper installed on every connection; counts toward the current request."""
+    stats = metrics.current_request.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats.execute(execute, sql, params, many, context)
+
+
+def install_query_hook(sender=None, connection=None, **kwargs):
+    # connection_created receiver. Connections belong to threads, and under
+    # ASGI the ORM runs in worker threads, so a wrapper entered around the
+    # request would miss them; the context variable follows the request.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class RequestMetricsMiddleware:
+    """Record latency, SQL, cache and template time per URL name.
+
+    Samples go to the buffered registry in jobs.metrics; nothing is written
+    to the database, so the middleware can stay on in production.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        stats = metrics.RequestStats()
+        token = metrics.current_request.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.current_request.reset(token)
+        self.record(request, response, time.perf_counter() - start, stats)
+        return response
+
+    async def __acall__(self, request):
+        stats = metrics.RequestStats()
+        token = metrics.current_request.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.current_request.reset(token)
+        # Recording is buffered; only every FLUSH_EVERY-th sample touches the cache
+        self.record(request, response, time.perf_counter() - start, stats)
+        return response
+
+    def record(self, request, response, seconds, stats):
+        match = request.resolver_match
+        metrics.record_request(
+            match.view_name if match else 'unmatched',
+            request.method,
+            response.status_code,
+            seconds,
+            stats,
+        )
+
+
+class InstrumentedTemplate(Template):
+    def render(self, context=None, request=None):
+        stats = metrics.current_request.get()
+        if stats is None:
+            return super().render(context, request)
+        start = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.template_seconds += time.perf_counter() - start
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, timing every top-level render."""
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return InstrumentedTemplate(template.template, self)
@@ -0,0 +1,108 @@
+"""Expire jobs past their ``expires_at`` and archive long-inactive ones.
+
+Both run in short batches, one transaction each, so neither holds locks
+for long. They write with bulk queries and skip model signals, so they
+update the derived data themselves.
+"""
+import datetime
+import functools
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import rollups
+from .cache import bump_version
+from .dashboard import invalidate_dashboard
+from .models import (
+    Application, ArchivedApplication, ArchivedJob, Job, JobVector, SearchIndexEntry,
+)
+
+EXPIRE_BATCH_SIZE = 1000
+ARCHIVE_BATCH_SIZE = 200
+
+# Archived rows keep the live rows' ids and column values
+ARCHIVED_JOB_FIELDS = [
+    field.attname for field in ArchivedJob._meta.concrete_fields if field.name != 'archived_at'
+]
+ARCHIVED_APPLICATION_FIELDS = [field.attname for field in ArchivedApplication._meta.concrete_fields]
+
+
+def expire_jobs(now=None, batch_size=EXPIRE_BATCH_SIZE):
+    """Deactivate active jobs whose ``expires_at`` has passed; return how many.
+
+    Rows locked by another writer are skipped and caught by the next run.
+    """
+    now = now or timezone.now()
+    expired = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                Job.objects.select_for_update(skip_locked=True)
+                .filter(is_active=True, expires_at__lte=now)
+                .order_by('expires_at', 'id')
+                .values_list('pk', 'created_at', 'job_type', 'posted_by_id')[:batch_size]
+            )
+            if not rows:
+                break
+            job_ids = [row[0] for row in rows]
+            Job.objects.filter(pk__in=job_ids).update(is_active=False, updated_at=now)
+            changes = []
+            for _, created_at, job_type, _ in rows:
+                day = timezone.localdate(created_at)
+                changes.append(((day, job_type, True), (day, job_type, False)))
+            rollups.apply_job_states(changes)
+            # The recommender drops re-read vectors whose job is inactive
+            JobVector.objects.filter(job_id__in=job_ids).update(updated_at=now)
+            transaction.on_commit(lambda: bump_version('jobs'))
+            transaction.on_commit(functools.partial(invalidate_dashboard, *{row[3] for row in rows}))
+        expired += len(rows)
+    return expired
+
+
+def archive_jobs(before=None, batch_size=ARCHIVE_BATCH_SIZE):
+    """Move jobs inactive since before ``before``, with their applications, to the archive.
+
+    Returns ``(jobs, applications)`` archived. Rollup counters keep counting
+    archived history, and each archived application takes over its live
+    row's resume blob reference, so no refcount changes.
+    """
+    if before is None:
+        before = timezone.now() - datetime.timedelta(days=settings.JOB_ARCHIVE_AFTER_DAYS)
+    archived_jobs = archived_applications = 0
+    while True:
+        with transaction.atomic():
+            jobs = list(
+                Job.objects.select_for_update(skip_locked=True)
+                .filter(is_active=False, updated_at__lt=before)
+                .order_by('updated_at', 'id')
+                .values(*ARCHIVED_JOB_FIELDS)[:batch_size]
+            )
+            if not jobs:
+                break
+            job_ids = [job['id'] for job in jobs]
+            applications = list(
+                Application.objects.select_for_update()
+                .filter(job_id__in=job_ids).order_by()
+                .values(*ARCHIVED_APPLICATION_FIELDS)
+            )
+            ArchivedJob.objects.bulk_create([ArchivedJob(**job) for job in jobs])
+            ArchivedApplication.objects.bulk_create([
+                ArchivedApplication(**application) for application in applications
+            ])
+            # Raw deletes, children first: the collector would fire per-row
+            # signals that release resume blobs and decrement rollups
+            for queryset in (
+                SearchIndexEntry.objects.filter(job_id__in=job_ids),
+                JobVector.objects.filter(job_id__in=job_ids),
+                Application.objects.filter(job_id__in=job_ids),
+                Job.objects.filter(pk__in=job_ids),
+            ):
+                queryset._raw_delete(queryset.db)
+            user_ids = {job['posted_by_id'] for job in jobs}
+            user_ids.update(application['applicant_id'] for application in applications)
+            transaction.on_commit(lambda: bump_version('jobs'))
+            transaction.on_commit(functools.partial(invalidate_dashboard, *user_ids))
+        archived_jobs += len(jobs)
+        archived_applications += len(applications)
+    return archived_jobs, archived_applications
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from jobs.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-day, per-job_type analytics rollups from historical data.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rows = rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Wrote {rows} rollup rows.'))
@@ -0,0 +1,82 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client, override_settings
+
+from jobs.models import Job
+from jobs.pagination import KeysetCursorPagination
+from jobs.serializers import COMPACT_JOB_FIELDS
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare /api/jobs/ list latency with the full JobSerializer and with '
+        'compact ?fields= rows at several page sizes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[10, 100, 1000])
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument(
+            '--fields', default=','.join(COMPACT_JOB_FIELDS),
+            help='Compact field list; defaults to every compact field for a like-for-like payload.',
+        )
+
+    def handle(self, *args, **options):
+        sizes, repeat = options['rows'], options['repeat']
+        # Synthetic rows and the page size override are both undone afterwards
+        original_max = KeysetCursorPagination.max_page_size
+        KeysetCursorPagination.max_page_size = max(original_max, *sizes)
+        try:
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                with transaction.atomic():
+                    self.ensure_jobs(max(sizes))
+                    self.run(sizes, repeat, options['fields'])
+                    transaction.set_rollback(True)
+        finally:
+            KeysetCursorPagination.max_page_size = original_max
+
+    def ensure_jobs(self, count):
+        missing = count - Job.objects.active().count()
+        if missing <= 0:
+            return
+        employer, _ = User.objects.get_or_create(username='benchmark-employer')
+        description = 'Build and operate services for a growing platform. ' * 30
+        Job.objects.bulk_create(
+            [
+                Job(
+                    title=f'Benchmark Job {i}',
+                    description=description,
+                    company_name=f'Company {i % 50}',
+                    location='Remote',
+                    salary_range='$100k - $120k',
+                    posted_by=employer,
+                )
+                for i in range(missing)
+            ],
+            batch_size=500,
+        )
+
+    def measure(self, client, path, repeat):
+        client.get(path)  # warm caches and connections
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            response = client.get(path)
+            timings.append(time.perf_counter() - start)
+        return statistics.median(timings), len(response.json()['results'])
+
+    def run(self, sizes, repeat, fields):
+        client = Client()
+        self.stdout.write(f"{'rows':>6} {'full ms':>10} {'compact ms':>11} {'full rows/s':>12} {'compact rows/s':>15} {'speedup':>8}")
+        for size in sizes:
+            full, rows = self.measure(client, f'/api/jobs/?page_size={size}', repeat)
+            compact, _ = self.measure(client, f'/api/jobs/?page_size={size}&fields={fields}', repeat)
+            self.stdout.write(
+                f'{rows:>6} {full * 1000:>10.2f} {compact * 1000:>11.2f} '
+                f'{rows / full:>12.0f} {rows / compact:>15.0f} {full / compact:>7.1f}x'
+            )
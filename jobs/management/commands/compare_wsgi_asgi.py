@@ -0,0 +1,49 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from jobs.benchmarks import (
+    LOAD_TEST_HOST, environment, load_test_asgi, load_test_paths, load_test_wsgi, page_views,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-test the read-heavy endpoints through the sync WSGI handler (a thread '
+        'per request, sync views) and the ASGI handler (async page views and API '
+        'reads, as with ASYNC_VIEWS on) at the same concurrency.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=64)
+        parser.add_argument(
+            '--path', action='append', default=[],
+            help='Path to request (repeatable). Default: home, job list and job detail, pages and API.',
+        )
+        parser.add_argument('--output', help='Write the JSON report here as well.')
+
+    def handle(self, *args, **options):
+        paths = options['path'] or load_test_paths()
+        requests, concurrency = options['requests'], options['concurrency']
+        report = {'environment': environment(), 'paths': paths, 'results': {}}
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, LOAD_TEST_HOST]):
+            for mode, load_test, async_views in (('wsgi', load_test_wsgi, False), ('asgi', load_test_asgi, True)):
+                with page_views(async_views):
+                    # One pass over every path first, so both modes start with warm caches
+                    load_test(paths, len(paths), 1)
+                    report['results'][mode] = result = load_test(paths, requests, concurrency)
+                self.stdout.write(
+                    f"{mode}: {result['requests_per_second']} req/s, "
+                    f"p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms, "
+                    f"p99 {result['p99_ms']} ms, {result['errors']} errors"
+                )
+
+        wsgi, asgi = report['results']['wsgi'], report['results']['asgi']
+        if wsgi['requests_per_second']:
+            self.stdout.write(f"ASGI/WSGI throughput: {asgi['requests_per_second'] / wsgi['requests_per_second']:.2f}x")
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(json.dumps(report, indent=2) + '\n')
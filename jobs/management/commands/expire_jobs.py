@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from jobs.lifecycle import ARCHIVE_BATCH_SIZE, EXPIRE_BATCH_SIZE, archive_jobs, expire_jobs
+
+
+class Command(BaseCommand):
+    help = 'Deactivate expired jobs, then move long-inactive jobs to the archive. Run it from a scheduler.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=EXPIRE_BATCH_SIZE)
+        parser.add_argument('--archive-batch-size', type=int, default=ARCHIVE_BATCH_SIZE)
+        parser.add_argument('--no-archive', action='store_true', help='Only deactivate expired jobs.')
+
+    def handle(self, *args, **options):
+        expired = expire_jobs(batch_size=options['batch_size'])
+        self.stdout.write(f'Deactivated {expired} expired jobs.')
+        if not options['no_archive']:
+            jobs, applications = archive_jobs(batch_size=options['archive_batch_size'])
+            self.stdout.write(f'Archived {jobs} jobs and {applications} applications.')
+        self.stdout.write(self.style.SUCCESS('Done.'))
@@ -0,0 +1,100 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from jobs.profiling import view_requests
+
+
+def explain(sql):
+    vendor = connection.vendor
+    with connection.cursor() as cursor:
+        if vendor == 'sqlite':
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            plan = [row[-1] for row in cursor.fetchall()]
+            # "SCAN t USING [COVERING] INDEX i" walks an index, plain "SCAN t" does not
+            scans = [line for line in plan if line.startswith('SCAN ') and ' USING ' not in line]
+        elif vendor == 'postgresql':
+            cursor.execute('EXPLAIN ' + sql)
+            plan = [row[0] for row in cursor.fetchall()]
+            scans = [line.strip() for line in plan if 'Seq Scan' in line]
+        elif vendor == 'mysql':
+            cursor.execute('EXPLAIN ' + sql)
+            columns = [col[0] for col in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            plan = [f"{row['table']}: {row['type']} {row.get('key') or ''}" for row in rows]
+            scans = [f"{row['table']}: full scan" for row in rows if row['type'] == 'ALL']
+        else:
+            raise CommandError(f'EXPLAIN is not supported for {vendor}.')
+    return plan, scans
+
+
+class Command(BaseCommand):
+    help = (
+        'Request every GET view in jobs.urls, EXPLAIN the SELECTs each one '
+        'issues and flag full table scans.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', action='append', default=[],
+            help='Username to request views as (repeatable). Anonymous is always included.',
+        )
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan.')
+        parser.add_argument('--fail-on-scan', action='store_true', help='Exit non-zero if any scan is found.')
+
+    def handle(self, *args, **options):
+        users = [None]
+        for username in options['user']:
+            try:
+                users.append(User.objects.get(username=username))
+            except User.DoesNotExist:
+                raise CommandError(f'Unknown user {username!r}.')
+
+        # Everything the requests write (sessions, logins) is rolled back
+        flagged = 0
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            with transaction.atomic():
+                for user in users:
+                    flagged += self.profile_as(user, options['verbose_plans'])
+                transaction.set_rollback(True)
+
+        if flagged:
+            message = f'{flagged} queries do a full table scan.'
+            if options['fail_on_scan']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS('No full table scans found.'))
+
+    def profile_as(self, user, verbose):
+        client = Client()
+        if user is not None:
+            client.force_login(user)
+        label = user.username if user else 'anonymous'
+        flagged = 0
+        for name, path in view_requests():
+            with CaptureQueriesContext(connection) as captured:
+                response = client.get(path)
+            selects = list(dict.fromkeys(
+                query['sql'] for query in captured.captured_queries
+                if query['sql'].lstrip().upper().startswith('SELECT')
+            ))
+            self.stdout.write(
+                f'[{label}] {name} {path} -> {response.status_code}, '
+                f'{len(captured.captured_queries)} queries'
+            )
+            for sql in selects:
+                plan, scans = explain(sql)
+                if scans:
+                    flagged += 1
+                    self.stdout.write(self.style.WARNING(f'  FULL SCAN: {sql}'))
+                    for line in scans:
+                        self.stdout.write(f'    {line}')
+                elif verbose:
+                    self.stdout.write(f'  {sql}')
+                    for line in plan:
+                        self.stdout.write(f'    {line}')
+        return flagged
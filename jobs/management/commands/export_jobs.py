@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from jobs.bulk import export_csv, export_jsonl
+from jobs.models import Job
+
+
+class Command(BaseCommand):
+    help = 'Stream active jobs to stdout as CSV or JSON Lines.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', choices=['csv', 'jsonl'], default='jsonl')
+
+    def handle(self, *args, **options):
+        jobs = Job.objects.active().order_by('id')
+        export = export_csv if options['output'] == 'csv' else export_jsonl
+        for chunk in export(jobs):
+            self.stdout.write(chunk, ending='')
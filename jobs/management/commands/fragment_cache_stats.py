@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from jobs.metrics import fragment_cache_stats, reset, series
+
+
+class Command(BaseCommand):
+    help = 'Print the template fragment cache hit ratio recorded in the shared cache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Zero the counters after printing.')
+
+    def handle(self, *args, **options):
+        stats = fragment_cache_stats()
+        ratio = 'n/a' if stats['hit_ratio'] is None else f"{stats['hit_ratio']:.1%}"
+        self.stdout.write(f"hits={stats['hits']} misses={stats['misses']} hit_ratio={ratio}")
+        if options['reset']:
+            reset(*(
+                series('jobs_cache_requests_total', cache='fragment', result=result)
+                for result in ('hit', 'miss')
+            ))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+
+from jobs.benchmarks import BATCH_SIZE, generate_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        'Bulk-load synthetic employers, candidates, jobs and applications with '
+        'realistic skew. Use a dedicated database; each batch commits on its own and '
+        'rows are not cleaned up.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=10_000)
+        parser.add_argument('--applications', type=int, default=100_000)
+        parser.add_argument('--employers', type=int, help='Default: one per 50 jobs.')
+        parser.add_argument('--candidates', type=int, help='Default: one per 20 applications.')
+        parser.add_argument('--companies', type=int, help='Default: one per 20 jobs.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        counts = generate_dataset(
+            jobs=options['jobs'],
+            applications=options['applications'],
+            employers=options['employers'],
+            candidates=options['candidates'],
+            companies=options['companies'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            stdout=self.stdout,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            'Generated ' + ', '.join(f'{count} {name}' for name, count in counts.items()) + '.'
+        ))
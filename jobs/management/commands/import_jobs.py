@@ -0,0 +1,31 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.bulk import BATCH_SIZE, import_jobs, iter_csv, iter_jsonl
+
+
+class Command(BaseCommand):
+    help = 'Upsert jobs from a CSV or JSON Lines file, keyed on external_id.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--username', required=True, help='Employer the new jobs are posted by.')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            employer = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"Unknown user {options['username']!r}.")
+
+        path = options['path']
+        with open(path, encoding='utf-8', newline='') as handle:
+            rows = iter_csv(handle) if path.lower().endswith('.csv') else iter_jsonl(handle)
+            result = import_jobs(rows, employer, batch_size=options['batch_size'])
+
+        for error in result.errors:
+            self.stdout.write(self.style.WARNING(f"Row {error['row']}: {error['errors']}"))
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {result.created} and updated {result.updated} jobs, '
+            f'{len(result.errors)} rows rejected.'
+        ))
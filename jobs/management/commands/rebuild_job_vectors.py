@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from jobs.recommendations import rebuild_vectors
+
+
+class Command(BaseCommand):
+    help = 'Recompute the term vectors the job recommender ranks with.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        saved = rebuild_vectors(batch_size=options['batch_size'], stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(f'Vectorized {saved} jobs.'))
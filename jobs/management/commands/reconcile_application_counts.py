@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from jobs.models import Application, Job
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized Job.applications_count counters in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pk = 0
+        checked = fixed = 0
+        while True:
+            job_ids = list(
+                Job.objects.filter(pk__gt=last_pk).order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not job_ids:
+                break
+            fixed += Application.objects.recount_jobs(job_ids)
+            checked += len(job_ids)
+            last_pk = job_ids[-1]
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {checked} jobs, corrected {fixed} counters.'
+        ))
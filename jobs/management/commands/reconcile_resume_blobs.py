@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from jobs.models import ResumeBlob
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute ResumeBlob.ref_count from live and archived applications in batches, '
+        'deleting unreferenced blobs and their files.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        last_pk = 0
+        checked = corrected = deleted = 0
+        while True:
+            blob_ids = list(
+                ResumeBlob.objects.filter(pk__gt=last_pk).order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not blob_ids:
+                break
+            fixed, removed = ResumeBlob.objects.recount(blob_ids)
+            corrected += fixed
+            deleted += removed
+            checked += len(blob_ids)
+            last_pk = blob_ids[-1]
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {checked} blobs, corrected {corrected} counts, deleted {deleted} unreferenced blobs.'
+        ))
@@ -0,0 +1,63 @@
+import json
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import override_settings
+
+from jobs.benchmarks import compare, default_users, environment, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        'Request every GET view in jobs.urls (pages and API) as several users and '
+        'record latency percentiles, query counts and peak memory as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument(
+            '--user', action='append', default=[],
+            help='Username to benchmark as (repeatable). Default: anonymous, a busy employer and a candidate.',
+        )
+        parser.add_argument('--skip', action='append', default=[], help='URL name to leave out (repeatable).')
+        parser.add_argument('--output', help='Write the JSON report here instead of stdout.')
+        parser.add_argument('--compare', help='Earlier JSON report to print p50 changes against.')
+
+    def handle(self, *args, **options):
+        if options['user']:
+            users = [None]
+            for username in options['user']:
+                try:
+                    users.append(User.objects.get(username=username))
+                except User.DoesNotExist:
+                    raise CommandError(f'Unknown user {username!r}.')
+        else:
+            users = default_users()
+
+        # Sessions and anything else the requests write are rolled back
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            with transaction.atomic():
+                report = {
+                    'environment': environment(),
+                    'settings': {'repeat': options['repeat'], 'warmup': options['warmup']},
+                    'results': run_benchmarks(users, options['repeat'], options['warmup'], set(options['skip'])),
+                }
+                transaction.set_rollback(True)
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+        if options['compare']:
+            with open(options['compare']) as handle:
+                baseline = json.load(handle)
+            # Goes to stderr so stdout stays valid JSON
+            for user, view, before, after, ratio in compare(baseline, report):
+                change = f'{ratio:.2f}x' if ratio is not None else 'n/a'
+                self.stderr.write(f'[{user}] {view}: p50 {before:.2f} -> {after:.2f} ms ({change})')
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from jobs.notifications import BATCH_SIZE, deliver_queued
+
+
+class Command(BaseCommand):
+    help = 'Drain the outbound email queue in batches, retrying failures with backoff.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new messages.')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep when idle.')
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = deliver_queued(batch_size=options['batch_size'])
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                self.stdout.write(f'Sent {sent}, failed {failed}.')
+                # A batch with failures only would spin on the same rows
+                if sent:
+                    continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(f'Done: {total_sent} sent, {total_failed} failed.'))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from jobs.metrics import query_shapes
+
+
+class Command(BaseCommand):
+    help = (
+        'List the SQL query shapes (literals stripped) recorded by the request '
+        'metrics middleware, slowest first.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument(
+            '--order', choices=['total', 'mean', 'calls'], default='total',
+            help='Rank by total time, mean time per call or number of calls.',
+        )
+
+    def handle(self, *args, **options):
+        key = {'total': 'total_seconds', 'mean': 'mean_seconds', 'calls': 'calls'}[options['order']]
+        shapes = sorted(query_shapes(), key=lambda row: row[key], reverse=True)[:options['limit']]
+        if not shapes:
+            self.stdout.write('No queries recorded yet.')
+            return
+        for row in shapes:
+            self.stdout.write(
+                f"{row['total_seconds'] * 1000:10.1f} ms total  {row['mean_seconds'] * 1000:8.2f} ms mean  "
+                f"{row['calls']:8d} calls  [{row['shape']}]"
+            )
+            self.stdout.write(f"    {row['sql']}")
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.routers import sync_sqlite_replicas
+
+
+class Command(BaseCommand):
+    help = (
+        'Copy the SQLite primary database over the SQLite replicas listed in '
+        'DATABASE_REPLICA_URLS, standing in for replication in local testing.'
+    )
+
+    def handle(self, *args, **options):
+        synced = sync_sqlite_replicas()
+        if not synced:
+            raise CommandError('No SQLite primary and replicas are configured.')
+        self.stdout.write(f"Copied the primary to {', '.join(synced)}.")
@@ -0,0 +1,354 @@
+import contextvars
+import functools
+import hashlib
+import re
+import threading
+import time
+from collections import Counter
+
+from django.core.cache import cache
+
+# Counters are buffered per process and added to the shared cache in
+# batches by a background thread, so recording a sample never costs a cache
+# round trip. Every value is an integer; durations are stored in
+# microseconds and families ending in "_seconds" are scaled back when exported.
+FLUSH_EVERY = 100
+FLUSH_INTERVAL = 10  # seconds; idle processes still flush what they buffered
+PREFIX = 'metrics:'
+# Cache backends cannot list keys, so series names are indexed: INDEX_KEY
+# counts numbered slots ("metrics:index:1", ...) that each hold one name,
+# and a marker per name ensures only one worker gives it a slot
+INDEX_KEY = 'metrics:index'
+INDEXED_PREFIX = 'metrics:indexed:'
+SHAPE_PREFIX = 'metrics:shape:'
+EXPORTED_PREFIX = 'jobs_'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_pending = Counter()
+_pending_total = 0
+_pending_shapes = {}
+_known_shapes = set()
+_lock = threading.Lock()
+# Held while writing to the cache, so reset_all() never races an in-flight flush
+_flushing = threading.Lock()
+_flush_wanted = threading.Event()
+_flusher = None
+
+# Stats of the request being handled, set by RequestMetricsMiddleware
+current_request = contextvars.ContextVar('current_request', default=None)
+
+
+def series(name, **labels):
+    if not labels:
+        return name
+    pairs = ','.join(f'{key}="{value}"' for key, value in sorted(labels.items()))
+    return f'{name}{{{pairs}}}'
+
+
+def family(name):
+    return name.split('{', 1)[0]
+
+
+def incr(name, amount=1, **labels):
+    _add(series(name, **labels), amount)
+
+
+def _add(key, amount):
+    global _pending_total
+    with _lock:
+        _pending[key] += amount
+        _pending_total += 1
+        if _pending_total < FLUSH_EVERY:
+            return
+    _wake_flusher()
+
+
+def _wake_flusher():
+    global _flusher
+    with _lock:
+        # Also restarts the thread in a worker forked after it was started
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = threading.Thread(target=_flush_loop, name='metrics-flush', daemon=True)
+            _flusher.start()
+    _flush_wanted.set()
+
+
+def _flush_loop():
+    while True:
+        _flush_wanted.wait(FLUSH_INTERVAL)
+        _flush_wanted.clear()
+        try:
+            flush()
+        except Exception:
+            # A cache outage loses this batch, not the flusher thread
+            pass
+
+
+def observe(name, seconds, buckets=LATENCY_BUCKETS, **labels):
+    # Buckets are stored non-cumulatively and summed up on export
+    bound = next((str(limit) for limit in buckets if seconds <= limit), '+Inf')
+    incr(f'{name}_bucket', le=bound, **labels)
+    incr(f'{name}_sum', to_micros(seconds), **labels)
+    incr(f'{name}_count', **labels)
+
+
+def to_micros(seconds):
+    return int(seconds * 1_000_000)
+
+
+def flush():
+    with _flushing:
+        _flush()
+
+
+def _flush():
+    global _pending_total
+    with _lock:
+        pending = dict(_pending)
+        _pending.clear()
+        _pending_total = 0
+        shapes = dict(_pending_shapes)
+        _pending_shapes.clear()
+    if shapes:
+        cache.set_many({SHAPE_PREFIX + digest: shape for digest, shape in shapes.items()}, None)
+    for name, amount in pending.items():
+        key = PREFIX + name
+        if not cache.add(key, amount, None):
+            try:
+                cache.incr(key, amount)
+            except ValueError:
+                # Evicted between add() and incr()
+                cache.set(key, amount, None)
+    # Checked on every flush, so a name whose marker was evicted or reset is
+    # indexed again instead of being lost for the life of the process
+    markers = cache.get_many([INDEXED_PREFIX + name for name in pending])
+    for name in pending:
+        if INDEXED_PREFIX + name not in markers and cache.add(INDEXED_PREFIX + name, 1, None):
+            cache.add(INDEX_KEY, 0, None)
+            cache.set(f'{INDEX_KEY}:{cache.incr(INDEX_KEY)}', name, None)
+
+
+def _indexed_names():
+    count = cache.get(INDEX_KEY) or 0
+    return set(cache.get_many([f'{INDEX_KEY}:{slot}' for slot in range(1, count + 1)]).values())
+
+
+def get_counts(*names):
+    flush()
+    values = cache.get_many([PREFIX + name for name in names])
+    return {name: values.get(PREFIX + name, 0) for name in names}
+
+
+def snapshot():
+    """Return every recorded series and its value from the shared cache."""
+    flush()
+    names = sorted(_indexed_names())
+    values = cache.get_many([PREFIX + name for name in names])
+    return {name: values[PREFIX + name] for name in names if PREFIX + name in values}
+
+
+def reset(*names):
+    with _lock:
+        for name in names:
+            _pending.pop(name, None)
+    cache.delete_many([PREFIX + name for name in names])
+
+
+def reset_all():
+    global _pending_total
+    with _flushing:
+        with _lock:
+            _pending.clear()
+            _pending_total = 0
+            _pending_shapes.clear()
+            _known_shapes.clear()
+        count = cache.get(INDEX_KEY) or 0
+        names = _indexed_names()
+        cache.delete_many(
+            [PREFIX + name for name in names]
+            + [INDEXED_PREFIX + name for name in names]
+            + [f'{INDEX_KEY}:{slot}' for slot in range(1, count + 1)]
+            + [INDEX_KEY]
+        )
+
+
+# Cache instrumentation
+
+def record_cache(name, hit):
+    incr('jobs_cache_requests_total', cache=name, result='hit' if hit else 'miss')
+    stats = current_request.get()
+    if stats is not None:
+        stats.cache[hit] += 1
+
+
+def cache_stats(name):
+    counts = get_counts(
+        series('jobs_cache_requests_total', cache=name, result='hit'),
+        series('jobs_cache_requests_total', cache=name, result='miss'),
+    )
+    hits, misses = counts.values()
+    total = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_ratio': hits / total if total else None}
+
+
+def fragment_cache_stats():
+    return cache_stats('fragment')
+
+
+# Query shapes
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w."])-?\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s')
+_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+
+
+@functools.lru_cache(maxsize=2048)
+def normalize_sql(sql):
+    """Strip literals and collapse IN lists so equal queries share one shape."""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _LIST.sub('(...)', sql)
+    return ' '.join(sql.split())
+
+
+@functools.lru_cache(maxsize=2048)
+def _shape_keys(sql):
+    shape = normalize_sql(sql)
+    digest = hashlib.md5(shape.encode()).hexdigest()[:16]
+    # Unprefixed families stay out of the Prometheus export
+    return shape, digest, series('query_shape_calls', shape=digest), series('query_shape_seconds', shape=digest)
+
+
+def record_query_shape(sql, seconds):
+    shape, digest, calls_key, seconds_key = _shape_keys(sql)
+    if digest not in _known_shapes:
+        with _lock:
+            _known_shapes.add(digest)
+            _pending_shapes[digest] = shape
+    _add(calls_key, 1)
+    _add(seconds_key, to_micros(seconds))
+
+
+def query_shapes():
+    """Return ``[{'sql', 'calls', 'total_seconds', 'mean_seconds'}]`` for every shape."""
+    shapes = {}
+    for name, value in snapshot().items():
+        name_family = family(name)
+        if name_family not in ('query_shape_calls', 'query_shape_seconds'):
+            continue
+        digest = name.split('"')[1]
+        entry = shapes.setdefault(digest, {'calls': 0, 'total_seconds': 0.0})
+        if name_family == 'query_shape_calls':
+            entry['calls'] = value
+        else:
+            entry['total_seconds'] = value / 1_000_000
+    texts = cache.get_many([SHAPE_PREFIX + digest for digest in shapes])
+    rows = []
+    for digest, entry in shapes.items():
+        calls = entry['calls'] or 1
+        rows.append({
+            'shape': digest,
+            'sql': texts.get(SHAPE_PREFIX + digest, '<evicted>'),
+            'calls': entry['calls'],
+            'total_seconds': entry['total_seconds'],
+            'mean_seconds': entry['total_seconds'] / calls,
+        })
+    return rows
+
+
+# Requests
+
+class RequestStats:
+    __slots__ = ('queries', 'query_seconds', 'template_seconds', 'cache')
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.template_seconds = 0.0
+        self.cache = [0, 0]  # misses, hits
+
+    def execute(self, execute, sql, params, many, context):
+        # Called by jobs.instrumentation.record_query for the current request
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.queries += 1
+            self.query_seconds += elapsed
+            record_query_shape(sql, elapsed)
+
+
+def record_request(view, method, status, seconds, stats):
+    labels = {'view': view, 'method': method}
+    incr('jobs_http_requests_total', status=status, **labels)
+    observe('jobs_http_request_duration_seconds', seconds, **labels)
+    incr('jobs_db_queries_total', stats.queries, **labels)
+    incr('jobs_db_query_duration_seconds_total', to_micros(stats.query_seconds), **labels)
+    incr('jobs_template_render_seconds_total', to_micros(stats.template_seconds), **labels)
+    misses, hits = stats.cache
+    if hits:
+        incr('jobs_view_cache_hits_total', hits, **labels)
+    if misses:
+        incr('jobs_view_cache_misses_total', misses, **labels)
+
+
+# Export
+
+def _is_seconds(name):
+    base = re.sub(r'_(sum|total)$', '', family(name))
+    return base.endswith('_seconds')
+
+
+def _format(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus():
+    """Render the exported series in the Prometheus text format."""
+    families = {}
+    for name, value in snapshot().items():
+        if not name.startswith(EXPORTED_PREFIX):
+            continue
+        families.setdefault(family(name), []).append((name, value))
+
+    histograms = {name[:-len('_bucket')] for name in families if name.endswith('_bucket')}
+    lines = []
+    for name in sorted(families):
+        base = next((h for h in histograms if name in (f'{h}_bucket', f'{h}_sum', f'{h}_count')), None)
+        if base is not None:
+            if name == f'{base}_bucket':
+                lines.append(f'# TYPE {base} histogram')
+                lines.extend(_cumulative_buckets(families[name]))
+            else:
+                lines.extend(_sample(series_name, value) for series_name, value in families[name])
+            continue
+        lines.append(f'# TYPE {name} counter')
+        lines.extend(_sample(series_name, value) for series_name, value in families[name])
+    return '\n'.join(lines) + '\n'
+
+
+def _sample(name, value):
+    if _is_seconds(name):
+        value = value / 1_000_000
+    return f'{name} {_format(value)}'
+
+
+def _cumulative_buckets(samples):
+    # Group by the labels other than "le" and emit running totals
+    groups = {}
+    for name, value in samples:
+        labels = dict(re.findall(r'(\w+)="([^"]*)"', name))
+        bound = labels.pop('le')
+        groups.setdefault(tuple(sorted(labels.items())), {})[bound] = value
+    lines = []
+    bounds = [str(limit) for limit in LATENCY_BUCKETS] + ['+Inf']
+    for labels, counts in sorted(groups.items()):
+        running = 0
+        for bound in bounds:
+            running += counts.get(bound, 0)
+            lines.append(f"{series(family(samples[0][0]), **dict(labels), le=bound)} {running}")
+    return lines
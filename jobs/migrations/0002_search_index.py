@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:44
+
+import django.db.models.deletion
+import re
+from collections import Counter
+
+from django.db import migrations, models
+
+# Frozen copy of jobs.search as of this migration, so later changes to the
+# live tokenizer never change what this migration writes.
+FIELD_WEIGHTS = {
+    'title': 8,
+    'company_name': 5,
+    'location': 4,
+    'description': 1,
+}
+
+STOP_WORDS = {
+    'a', 'an', 'and', 'at', 'for', 'in', 'of', 'on', 'or', 'the', 'to', 'with',
+}
+
+MAX_TERM_LENGTH = 64
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    tokens = []
+    for token in TOKEN_RE.findall((text or '').lower()):
+        if token in STOP_WORDS:
+            continue
+        tokens.append(token[:MAX_TERM_LENGTH])
+    return tokens
+
+
+def index_existing_jobs(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    SearchIndexEntry = apps.get_model('jobs', 'SearchIndexEntry')
+    entries = []
+    for job in Job.objects.iterator(chunk_size=500):
+        weights = Counter()
+        for field, field_weight in FIELD_WEIGHTS.items():
+            for term in tokenize(getattr(job, field)):
+                weights[term] += field_weight
+        entries.extend(
+            SearchIndexEntry(term=term, job_id=job.pk, weight=weight)
+            for term, weight in weights.items()
+        )
+        if len(entries) >= 5000:
+            SearchIndexEntry.objects.bulk_create(entries)
+            entries = []
+    SearchIndexEntry.objects.bulk_create(entries)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchIndexEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveIntegerField(default=1)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_entries', to='jobs.job')),
+            ],
+            options={
+                'verbose_name_plural': 'search index entries',
+                'unique_together': {('term', 'job')},
+            },
+        ),
+        migrations.RunPython(index_existing_jobs, migrations.RunPython.noop),
+    ]
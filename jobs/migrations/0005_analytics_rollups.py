@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:50
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncDate
+
+
+def backfill_rollups(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    Application = apps.get_model('jobs', 'Application')
+    JobTypeDailyStat = apps.get_model('jobs', 'JobTypeDailyStat')
+    totals = {}
+    job_rows = (
+        Job.objects.order_by().annotate(day=TruncDate('created_at'))
+        .values('day', 'job_type')
+        .annotate(jobs=Count('id'), active_jobs=Count('id', filter=Q(is_active=True)))
+    )
+    for row in job_rows:
+        stat = totals.setdefault((row['day'], row['job_type']), JobTypeDailyStat(day=row['day'], job_type=row['job_type']))
+        stat.jobs = row['jobs']
+        stat.active_jobs = row['active_jobs']
+    application_rows = (
+        Application.objects.order_by()
+        .annotate(day=TruncDate('submitted_at'), job_type=F('job__job_type'))
+        .values('day', 'job_type')
+        .annotate(applications=Count('id'))
+    )
+    for row in application_rows:
+        stat = totals.setdefault((row['day'], row['job_type']), JobTypeDailyStat(day=row['day'], job_type=row['job_type']))
+        stat.applications = row['applications']
+    JobTypeDailyStat.objects.bulk_create(totals.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_hot_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobTypeDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('job_type', models.CharField(choices=[('FT', 'Full Time'), ('PT', 'Part Time'), ('CT', 'Contract'), ('IN', 'Internship')], max_length=2)),
+                ('jobs', models.IntegerField(default=0)),
+                ('active_jobs', models.IntegerField(default=0)),
+                ('applications', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-day', 'job_type'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['-applications_count'], name='job_top_applied_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='jobtypedailystat',
+            unique_together={('day', 'job_type')},
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:57
+
+import hashlib
+
+import django.db.models.deletion
+import jobs.models
+from django.db import migrations, models
+
+
+def link_existing_resumes(apps, schema_editor):
+    # Existing files stay where they are; identical ones share one blob
+    Application = apps.get_model('jobs', 'Application')
+    ResumeBlob = apps.get_model('jobs', 'ResumeBlob')
+    blobs = {}
+    for application in Application.objects.exclude(resume='').iterator(chunk_size=500):
+        storage = application.resume.storage
+        if not storage.exists(application.resume.name):
+            continue
+        hasher = hashlib.sha256()
+        with storage.open(application.resume.name) as handle:
+            for chunk in handle.chunks():
+                hasher.update(chunk)
+        digest = hasher.hexdigest()
+        blob = blobs.get(digest)
+        if blob is None:
+            blob = blobs[digest] = ResumeBlob.objects.create(
+                sha256=digest,
+                file=application.resume.name,
+                size=storage.size(application.resume.name),
+            )
+        blob.ref_count += 1
+        application.resume_blob = blob
+        application.save(update_fields=['resume_blob'])
+    for blob in blobs.values():
+        blob.save(update_fields=['ref_count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0006_outbound_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('file', models.FileField(upload_to=jobs.models.resume_blob_path)),
+                ('size', models.PositiveIntegerField()),
+                ('ref_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='resume_blob',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='applications', to='jobs.resumeblob'),
+        ),
+        migrations.RunPython(link_existing_resumes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:56
+
+import django.db.models.deletion
+import math
+import re
+import zlib
+from array import array
+from collections import Counter
+
+from django.db import migrations, models
+
+# Frozen copy of the jobs.search tokenizer and jobs.recommendations
+# vectorizer as of this migration, so later changes to the live code never
+# change what this migration writes.
+STOP_WORDS = {
+    'a', 'an', 'and', 'at', 'for', 'in', 'of', 'on', 'or', 'the', 'to', 'with',
+}
+MAX_TERM_LENGTH = 64
+TOKEN_RE = re.compile(r'\w+')
+
+DIMENSIONS = 1 << 20
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'location': 2.0,
+    'description': 1.0,
+}
+MAX_FEATURES = 24
+
+
+def tokenize(text):
+    tokens = []
+    for token in TOKEN_RE.findall((text or '').lower()):
+        if token in STOP_WORDS:
+            continue
+        tokens.append(token[:MAX_TERM_LENGTH])
+    return tokens
+
+
+def feature_index(term):
+    return zlib.crc32(term.encode()) & (DIMENSIONS - 1)
+
+
+def term_weights(fields):
+    weights = Counter()
+    for text, field_weight in fields:
+        for term, count in Counter(tokenize(text)).items():
+            weights[feature_index(term)] += field_weight * (1 + math.log(count))
+    return weights
+
+
+def normalize(weights, limit=None):
+    items = sorted(weights.items(), key=lambda item: -item[1])[:limit]
+    norm = math.sqrt(sum(weight * weight for _, weight in items)) or 1.0
+    return sorted((feature, weight / norm) for feature, weight in items)
+
+
+def pack(items):
+    features = array('i', (feature for feature, _ in items))
+    weights = array('f', (weight for _, weight in items))
+    return features.tobytes(), weights.tobytes()
+
+
+def vectorize_existing_jobs(apps, schema_editor):
+    Job = apps.get_model('jobs', 'Job')
+    JobVector = apps.get_model('jobs', 'JobVector')
+    vectors = []
+    for job in Job.objects.only('pk', *FIELD_WEIGHTS).iterator(chunk_size=500):
+        items = normalize(
+            term_weights((getattr(job, field), weight) for field, weight in FIELD_WEIGHTS.items()),
+            MAX_FEATURES,
+        )
+        features, weights = pack(items)
+        vectors.append(JobVector(job_id=job.pk, features=features, weights=weights))
+        if len(vectors) >= 500:
+            JobVector.objects.bulk_create(vectors)
+            vectors = []
+    JobVector.objects.bulk_create(vectors)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0008_job_external_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobVector',
+            fields=[
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='vector', serialize=False, to='jobs.job')),
+                ('features', models.BinaryField()),
+                ('weights', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+            ],
+        ),
+        migrations.RunPython(vectorize_existing_jobs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,116 @@
+import re
+from collections import defaultdict
+
+from django.db import migrations, transaction
+
+BATCH_SIZE = 2000
+
+# Frozen copy of jobs.salary.parse_salary as of this migration, so later
+# changes to the live parser never change what this migration writes.
+PERIODS_PER_YEAR = {'H': 2080, 'D': 260, 'W': 52, 'M': 12, 'Y': 1}
+PERIOD_WORDS = {
+    'H': ('hour', 'hourly', 'hr', 'hrs', 'ph'),
+    'D': ('day', 'daily', 'pd'),
+    'W': ('week', 'weekly', 'wk', 'pw'),
+    'M': ('month', 'monthly', 'mo', 'mon', 'pm'),
+    'Y': ('year', 'yearly', 'yr', 'annum', 'annual', 'annually', 'pa', 'lpa'),
+}
+
+CURRENCY_SYMBOLS = {'$': 'USD', '€': 'EUR', '£': 'GBP', '₹': 'INR', '¥': 'JPY'}
+CURRENCY_CODES = {
+    'usd', 'eur', 'gbp', 'inr', 'jpy', 'cad', 'aud', 'sgd', 'chf', 'sek', 'pln', 'brl', 'mxn', 'zar',
+}
+CURRENCY_ALIASES = {'rs': 'INR', 'inr': 'INR', 'lpa': 'INR', 'lakh': 'INR', 'lakhs': 'INR', 'cr': 'INR', 'crore': 'INR'}
+
+MULTIPLIERS = {
+    'k': 1_000, 'm': 1_000_000, 'mn': 1_000_000, 'million': 1_000_000,
+    'l': 100_000, 'lac': 100_000, 'lacs': 100_000, 'lakh': 100_000, 'lakhs': 100_000, 'lpa': 100_000,
+    'cr': 10_000_000, 'crore': 10_000_000, 'crores': 10_000_000,
+}
+
+AMOUNT_RE = re.compile(
+    r'(?<![\w.])(\d[\d,]*(?:\.\d+)?)\s*(' + '|'.join(sorted(MULTIPLIERS, key=len, reverse=True)) + r')?(?![a-z])'
+)
+WORD_RE = re.compile(r'[a-z]+')
+
+MIN_ANNUAL = 1_000
+MAX_ANNUAL = 2_000_000_000
+
+
+def _currency(text, words):
+    for symbol, code in CURRENCY_SYMBOLS.items():
+        if symbol in text:
+            return code
+    for word in words:
+        if word in CURRENCY_CODES:
+            return word.upper()
+        if word in CURRENCY_ALIASES:
+            return CURRENCY_ALIASES[word]
+    return ''
+
+
+def _period(words):
+    for period, names in PERIOD_WORDS.items():
+        if any(word in names for word in words):
+            return period
+    return 'Y'
+
+
+def parse_salary(text):
+    """Return ``(minimum, maximum, currency, period)``; empty when ``text`` has no amount."""
+    text = (text or '').lower()
+    matches = AMOUNT_RE.findall(text)
+    if not matches:
+        return None, None, '', ''
+    words = set(WORD_RE.findall(text))
+    period = _period(words)
+
+    matches = matches[:2]
+    trailing = MULTIPLIERS.get(matches[-1][1], 1)
+    amounts = []
+    for number, unit in matches:
+        value = float(number.replace(',', ''))
+        amounts.append(value * (MULTIPLIERS[unit] if unit else trailing))
+    annual = [round(amount * PERIODS_PER_YEAR[period]) for amount in amounts]
+    if not all(MIN_ANNUAL <= amount <= MAX_ANNUAL for amount in annual):
+        return None, None, '', ''
+    return min(annual), max(annual), _currency(text, words), period
+
+
+def backfill_salaries(apps, schema_editor):
+    # One short transaction per batch, so the job table is never locked for
+    # the whole backfill. Postings repeat a handful of salary strings, so
+    # each batch needs one UPDATE per distinct parsed value.
+    Job = apps.get_model('jobs', 'Job')
+    last_pk = 0
+    while True:
+        batch = list(
+            Job.objects.filter(pk__gt=last_pk).exclude(salary_range='')
+            .order_by('pk').values_list('pk', 'salary_range')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        groups = defaultdict(list)
+        for pk, salary_range in batch:
+            groups[parse_salary(salary_range)].append(pk)
+        with transaction.atomic():
+            for (minimum, maximum, currency, period), pks in groups.items():
+                Job.objects.filter(pk__in=pks).update(
+                    salary_min=minimum,
+                    salary_max=maximum,
+                    salary_currency=currency,
+                    salary_period=period,
+                )
+        last_pk = batch[-1][0]
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('jobs', '0010_job_salary'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_salaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,99 @@
+import csv
+import re
+from collections import defaultdict
+from pathlib import Path
+
+from django.db import migrations, transaction
+
+BATCH_SIZE = 2000
+
+# The lookup and geohash encoding as of this migration, so later changes to
+# jobs.geo never change what it writes. The gazetteer is read by path.
+GAZETTEER_PATH = Path(__file__).resolve().parent.parent / 'data' / 'gazetteer.csv'
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+SEPARATORS_RE = re.compile(r'[,;/|()]| - ')
+WORD_RE = re.compile(r'\w+')
+
+
+def _normalize(text):
+    return ' '.join(WORD_RE.findall(text.casefold()))
+
+
+def load_gazetteer():
+    """Return ``{normalized name or alias: (latitude, longitude)}``."""
+    places = {}
+    with open(GAZETTEER_PATH, newline='', encoding='utf-8') as handle:
+        for row in csv.DictReader(handle):
+            place = float(row['latitude']), float(row['longitude'])
+            for name in [row['name'], *filter(None, row['aliases'].split('|'))]:
+                places.setdefault(_normalize(name), place)
+    return places
+
+
+def geocode(places, location):
+    for candidate in [location, *SEPARATORS_RE.split(location or '')]:
+        place = places.get(_normalize(candidate))
+        if place is not None:
+            return place
+    return None
+
+
+def encode_geohash(latitude, longitude, precision=6):
+    south, north, west, east = -90.0, 90.0, -180.0, 180.0
+    chars = []
+    bits = value = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            middle = (west + east) / 2
+            value = value << 1 | (longitude >= middle)
+            west, east = (middle, east) if longitude >= middle else (west, middle)
+        else:
+            middle = (south + north) / 2
+            value = value << 1 | (latitude >= middle)
+            south, north = (middle, north) if latitude >= middle else (south, middle)
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits = value = 0
+    return ''.join(chars)
+
+
+def backfill_locations(apps, schema_editor):
+    # Batched like the salary backfill: locations repeat heavily, so each
+    # short transaction issues one UPDATE per distinct place.
+    Job = apps.get_model('jobs', 'Job')
+    places = load_gazetteer()
+    last_pk = 0
+    while True:
+        batch = list(
+            Job.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', 'location')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        groups = defaultdict(list)
+        for pk, location in batch:
+            place = geocode(places, location)
+            if place is not None:
+                groups[place].append(pk)
+        with transaction.atomic():
+            for (latitude, longitude), pks in groups.items():
+                Job.objects.filter(pk__in=pks).update(
+                    latitude=latitude,
+                    longitude=longitude,
+                    geohash=encode_geohash(latitude, longitude),
+                )
+        last_pk = batch[-1][0]
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('jobs', '0012_job_location_geo'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_locations, migrations.RunPython.noop),
+    ]
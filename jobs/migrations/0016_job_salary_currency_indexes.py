@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 01:11
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0015_outbound_email_claims'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='job',
+            name='job_active_salary_max_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='job',
+            name='job_active_salary_min_idx',
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True), ('salary_max__isnull', False)), fields=['salary_currency', '-salary_max', '-id'], name='job_currency_salary_max_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(condition=models.Q(('is_active', True), ('salary_min__isnull', False)), fields=['salary_currency', 'salary_min', 'id'], name='job_currency_salary_min_idx'),
+        ),
+    ]
@@ -1,11 +1,23 @@
-from django.db import models
+from django.conf import settings
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F
 from django.contrib.auth.models import User
 from django.core.validators import FileExtensionValidator
+from django.utils import timezone
+import datetime
 import os
+from collections import Counter
+from .resumes import file_digest
+from .geo import encode_geohash, geocode
+from .salary import PERIOD_CHOICES, parse_salary
 
 def resume_upload_path(instance, filename):
     return f'resumes/{instance.applicant.username}/{filename}'
 
+def resume_blob_path(instance, filename):
+    extension = os.path.splitext(filename)[1].lower()
+    return f'resumes/blobs/{instance.sha256[:2]}/{instance.sha256}{extension}'
+
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     is_employer = models.BooleanField(default=False)
@@ -16,6 +28,23 @@ class UserProfile(models.Model):
     def __str__(self):
         return f"{self.user.username}'s Profile"
 
+class JobQuerySet(models.QuerySet):
+    # Columns rendered by job cards (job_list, home)
+    LISTING_FIELDS = [
+        'id', 'title', 'description', 'company_name', 'location', 'job_type',
+        'salary_range', 'salary_min', 'salary_max', 'created_at', 'updated_at',
+        'is_active', 'applications_count',
+    ]
+    
+    def active(self):
+        return self.filter(is_active=True)
+    
+    def for_listing(self):
+        return self.active().only(*self.LISTING_FIELDS)
+    
+    def for_api(self):
+        return self.select_related('posted_by')
+
 class Job(models.Model):
     JOB_TYPES = [
         ('FT', 'Full Time'),
@@ -28,21 +57,256 @@ class Job(models.Model):
     description = models.TextField()
     company_name = models.CharField(max_length=200)
     location = models.CharField(max_length=200)
+    # Geocoded from location on save against the bundled gazetteer
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
+    geohash = models.CharField(max_length=12, blank=True, editable=False)
     job_type = models.CharField(max_length=2, choices=JOB_TYPES, default='FT')
     salary_range = models.CharField(max_length=100, blank=True)
+    # Parsed from salary_range on save: annual amounts in salary_currency
+    salary_min = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    salary_max = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    salary_currency = models.CharField(max_length=3, blank=True, editable=False)
+    salary_period = models.CharField(max_length=1, choices=PERIOD_CHOICES, blank=True, editable=False)
     posted_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='jobs')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    # Deactivated by the expire_jobs command once past
+    expires_at = models.DateTimeField(null=True, blank=True)
+    external_id = models.CharField(max_length=100, unique=True, null=True, blank=True)
+    applications_count = models.PositiveIntegerField(default=0, editable=False)
+    
+    objects = JobQuerySet.as_manager()
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['-created_at', '-id'],
+                condition=models.Q(is_active=True),
+                name='job_active_recent_idx',
+            ),
+            models.Index(
+                fields=['job_type', '-created_at', '-id'],
+                condition=models.Q(is_active=True),
+                name='job_active_type_recent_idx',
+            ),
+            models.Index(fields=['posted_by', 'is_active'], name='job_owner_active_idx'),
+            models.Index(fields=['-applications_count'], name='job_top_applied_idx'),
+            # Salary sorts in both directions and the range filters, which
+            # always compare amounts within one currency
+            models.Index(
+                fields=['salary_currency', '-salary_max', '-id'],
+                condition=models.Q(is_active=True, salary_max__isnull=False),
+                name='job_currency_salary_max_idx',
+            ),
+            models.Index(
+                fields=['salary_currency', 'salary_min', 'id'],
+                condition=models.Q(is_active=True, salary_min__isnull=False),
+                name='job_currency_salary_min_idx',
+            ),
+            # Radius and nearest-job queries scan geohash prefix ranges; not
+            # partial, as SQLite only combines OR'd ranges on a full index
+            models.Index(fields=['geohash'], name='job_geohash_idx'),
+            # Expiry sweeps and archival each read one end of the job table
+            models.Index(
+                fields=['expires_at'],
+                condition=models.Q(is_active=True, expires_at__isnull=False),
+                name='job_active_expiry_idx',
+            ),
+            models.Index(
+                fields=['updated_at'],
+                condition=models.Q(is_active=False),
+                name='job_inactive_updated_idx',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.title} at {self.company_name}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored state so signal handlers can compute deltas
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+    
+    SALARY_FIELDS = ['salary_min', 'salary_max', 'salary_currency', 'salary_period']
+    GEO_FIELDS = ['latitude', 'longitude', 'geohash']
+    
+    def save(self, *args, **kwargs):
+        # applications_count is only written with F() updates, so a stale
+        # instance must never write its copy back, not even when asked to
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name != 'applications_count'
+                and field.attname not in deferred
+            ]
+        elif kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = [name for name in kwargs['update_fields'] if name != 'applications_count']
+        if self._state.adding:
+            self.set_default_expiry()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'salary_range' in update_fields:
+            self.parse_salary()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], *self.SALARY_FIELDS}
+        if update_fields is None or 'location' in update_fields:
+            self.geocode_location()
+            if update_fields is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], *self.GEO_FIELDS}
+        super().save(*args, **kwargs)
+    
+    def parse_salary(self):
+        salary = parse_salary(self.salary_range)
+        self.salary_min, self.salary_max = salary.minimum, salary.maximum
+        self.salary_currency, self.salary_period = salary.currency, salary.period
+    
+    def set_default_expiry(self):
+        if self.expires_at is None and settings.JOB_EXPIRY_DAYS:
+            self.expires_at = timezone.now() + datetime.timedelta(days=settings.JOB_EXPIRY_DAYS)
+    
+    def geocode_location(self):
+        place = geocode(self.location)
+        if place is None:
+            self.latitude = self.longitude = None
+            self.geohash = ''
+        else:
+            self.latitude, self.longitude = place.latitude, place.longitude
+            self.geohash = encode_geohash(place.latitude, place.longitude)
+    
     def application_count(self):
-        return self.applications.count()
+        return self.applications_count
+
+class ResumeBlobManager(models.Manager):
+    def store(self, uploaded_file):
+        """Return the blob for this content, storing it only if it is new.
+        
+        A new blob's file is written when the transaction commits, like
+        release() deletes it, so a rollback leaves no file behind.
+        """
+        digest = file_digest(uploaded_file)
+        with transaction.atomic(using=self.db):
+            if self.filter(sha256=digest).update(ref_count=F('ref_count') + 1):
+                return self.get(sha256=digest)
+            blob = self.model(sha256=digest, size=uploaded_file.size, ref_count=1)
+            blob.file.name = blob.file.field.generate_filename(blob, os.path.basename(uploaded_file.name))
+            try:
+                with transaction.atomic(using=self.db):
+                    blob.save(using=self.db)
+            except IntegrityError:
+                # A concurrent upload of the same content won the race
+                self.filter(sha256=digest).update(ref_count=F('ref_count') + 1)
+                return self.get(sha256=digest)
+            name, storage = blob.file.name, blob.file.storage
+            transaction.on_commit(lambda: self._write(storage, name, uploaded_file), using=self.db)
+        return blob
+    
+    @staticmethod
+    def _write(storage, name, content):
+        # Names are content-addressed, so an existing file holds these bytes
+        if not storage.exists(name):
+            storage.save(name, content)
+    
+    def release(self, blob_id):
+        self.filter(pk=blob_id).update(ref_count=F('ref_count') - 1)
+        orphan = self.filter(pk=blob_id, ref_count__lte=0)
+        name = orphan.values_list('file', flat=True).first()
+        # One conditional DELETE, so a reference acquired meanwhile keeps the
+        # blob; the collector would select first and delete by pk regardless
+        if name is not None and orphan._raw_delete(self.db):
+            storage = self.model._meta.get_field('file').storage
+            transaction.on_commit(lambda: storage.delete(name), using=self.db)
+    
+    def recount(self, blob_ids):
+        """Reset ``ref_count`` to the live and archived applications using each blob.
+        
+        Unreferenced blobs are deleted, with their files once the transaction
+        commits. Returns ``(corrected, deleted)``.
+        """
+        with transaction.atomic(using=self.db):
+            # Locked, so a concurrent store() waits for the corrected count
+            blobs = list(self.select_for_update().filter(pk__in=blob_ids).only('pk', 'file', 'ref_count'))
+            references = Counter()
+            for model in (Application, ArchivedApplication):
+                references.update(dict(
+                    model.objects.using(self.db).filter(resume_blob_id__in=blob_ids).order_by()
+                    .values_list('resume_blob').annotate(n=Count('id'))
+                ))
+            stale, orphans = [], []
+            for blob in blobs:
+                actual = references.get(blob.pk, 0)
+                if not actual:
+                    orphans.append(blob)
+                elif blob.ref_count != actual:
+                    blob.ref_count = actual
+                    stale.append(blob)
+            self.bulk_update(stale, ['ref_count'])
+            if orphans:
+                self.filter(pk__in=[blob.pk for blob in orphans])._raw_delete(self.db)
+                storage = self.model._meta.get_field('file').storage
+                names = [blob.file.name for blob in orphans]
+                
+                def delete_files():
+                    for name in names:
+                        storage.delete(name)
+                transaction.on_commit(delete_files, using=self.db)
+        return len(stale), len(orphans)
+
+class ResumeBlob(models.Model):
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to=resume_blob_path)
+    size = models.PositiveIntegerField()
+    ref_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    objects = ResumeBlobManager()
+    
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.ref_count} refs)"
+
+class ApplicationQuerySet(models.QuerySet):
+    def for_candidate(self, user):
+        return self.filter(applicant=user).select_related('job')
+    
+    def for_employer_review(self, job):
+        return self.filter(job=job).select_related('applicant')
+    
+    def for_api(self):
+        return self.select_related('job__posted_by', 'applicant')
+    
+    def bulk_create(self, objs, *args, **kwargs):
+        with transaction.atomic(using=self.db):
+            created = super().bulk_create(objs, *args, **kwargs)
+            per_job = Counter(obj.job_id for obj in created if obj.pk is not None)
+            for job_id, count in per_job.items():
+                Job.objects.using(self.db).filter(pk=job_id).update(
+                    applications_count=F('applications_count') + count
+                )
+        return created
+    
+    def recount_jobs(self, job_ids):
+        # Lock the job rows first so concurrent applications wait for the fix
+        with transaction.atomic(using=self.db):
+            jobs = list(
+                Job.objects.using(self.db).select_for_update()
+                .filter(pk__in=job_ids).only('pk', 'applications_count')
+            )
+            counts = dict(
+                self.filter(job_id__in=job_ids).values_list('job').annotate(n=Count('id'))
+            )
+            stale = []
+            for job in jobs:
+                actual = counts.get(job.pk, 0)
+                if job.applications_count != actual:
+                    job.applications_count = actual
+                    stale.append(job)
+            Job.objects.using(self.db).bulk_update(stale, ['applications_count'])
+        return len(stale)
 
 class Application(models.Model):
     STATUS_CHOICES = [
@@ -59,13 +323,155 @@ class Application(models.Model):
         validators=[FileExtensionValidator(allowed_extensions=['pdf', 'doc', 'docx'])],
         help_text="Upload your resume (PDF, DOC, or DOCX format, max 5MB)"
     )
+    resume_blob = models.ForeignKey(
+        ResumeBlob, null=True, blank=True, editable=False,
+        on_delete=models.PROTECT, related_name='applications'
+    )
     message = models.TextField()
     status = models.CharField(max_length=1, choices=STATUS_CHOICES, default='P')
     submitted_at = models.DateTimeField(auto_now_add=True)
     
+    objects = ApplicationQuerySet.as_manager()
+    
     class Meta:
         unique_together = ['job', 'applicant']
         ordering = ['-submitted_at']
+        indexes = [
+            models.Index(fields=['applicant', 'status'], name='application_applicant_idx'),
+            models.Index(fields=['job', '-submitted_at'], name='application_job_recent_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.applicant.username} - {self.job.title}"
+    
+    def save(self, *args, **kwargs):
+        # Keep the insert and the post_save counter update in one transaction
+        with transaction.atomic(using=kwargs.get('using')):
+            if self.resume and not self.resume._committed:
+                # Point at the shared copy instead of writing a new file
+                self.resume_blob = ResumeBlob.objects.db_manager(kwargs.get('using')).store(self.resume.file)
+                self.resume = self.resume_blob.file.name
+            super().save(*args, **kwargs)
+
+class JobTypeDailyStat(models.Model):
+    day = models.DateField()
+    job_type = models.CharField(max_length=2, choices=Job.JOB_TYPES)
+    jobs = models.IntegerField(default=0)
+    active_jobs = models.IntegerField(default=0)
+    applications = models.IntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['day', 'job_type']
+        ordering = ['-day', 'job_type']
+    
+    def __str__(self):
+        return f"{self.day} {self.job_type}: {self.jobs} jobs, {self.applications} applications"
+
+
+class OutboundEmail(models.Model):
+    STATUS_CHOICES = [
+        ('Q', 'Queued'),
+        ('P', 'Sending'),
+        ('S', 'Sent'),
+        ('F', 'Failed'),
+    ]
+    
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    recipients = models.JSONField(default=list)
+    status = models.CharField(max_length=1, choices=STATUS_CHOICES, default='Q')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # While Sending: when the claim lapses and another worker may take over
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim_token = models.UUIDField(null=True, blank=True, editable=False)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['next_attempt_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.recipients)}"
+
+
+class SearchIndexEntry(models.Model):
+    term = models.CharField(max_length=64)
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='search_entries')
+    weight = models.PositiveIntegerField(default=1)
+    
+    class Meta:
+        unique_together = ['term', 'job']
+        verbose_name_plural = 'search index entries'
+    
+    def __str__(self):
+        return f"{self.term} -> {self.job_id}"
+
+
+class JobVector(models.Model):
+    # Hashed feature indices (int32) and their L2-normalised weights
+    # (float32), packed so the recommender can load a million rows quickly
+    job = models.OneToOneField(Job, on_delete=models.CASCADE, primary_key=True, related_name='vector')
+    features = models.BinaryField()
+    weights = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    
+    def __str__(self):
+        return f"Vector of job {self.job_id}"
+
+
+class ArchivedJob(models.Model):
+    # Inactive jobs moved out of the job table by archive_jobs; ids are kept
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=200)
+    description = models.TextField()
+    company_name = models.CharField(max_length=200)
+    location = models.CharField(max_length=200)
+    job_type = models.CharField(max_length=2, choices=Job.JOB_TYPES)
+    salary_range = models.CharField(max_length=100, blank=True)
+    salary_min = models.PositiveIntegerField(null=True, blank=True)
+    salary_max = models.PositiveIntegerField(null=True, blank=True)
+    salary_currency = models.CharField(max_length=3, blank=True)
+    salary_period = models.CharField(max_length=1, choices=PERIOD_CHOICES, blank=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    posted_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_jobs')
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    expires_at = models.DateTimeField(null=True, blank=True)
+    external_id = models.CharField(max_length=100, null=True, blank=True, db_index=True)
+    applications_count = models.PositiveIntegerField(default=0)
+    archived_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    class Meta:
+        ordering = ['-archived_at', '-id']
+    
+    def __str__(self):
+        return f"{self.title} at {self.company_name}"
+
+
+class ArchivedApplication(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    job = models.ForeignKey(ArchivedJob, on_delete=models.CASCADE, related_name='applications')
+    applicant = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_applications')
+    resume = models.FileField(upload_to=resume_upload_path)
+    # Keeps the reference the live application held, so the blob survives
+    resume_blob = models.ForeignKey(
+        ResumeBlob, null=True, blank=True, on_delete=models.PROTECT, related_name='archived_applications'
+    )
+    message = models.TextField()
+    status = models.CharField(max_length=1, choices=Application.STATUS_CHOICES)
+    submitted_at = models.DateTimeField()
+    
+    class Meta:
+        ordering = ['-submitted_at']
+        indexes = [
+            models.Index(fields=['applicant', '-submitted_at'], name='archived_app_applicant_idx'),
+        ]
     
     def __str__(self):
-        return f"{self.applicant.username} - {self.job.title}"
\ No newline at end of file
+        return f"{self.applicant_id} - {self.job_id}"
@@ -0,0 +1,155 @@
+import datetime
+import uuid
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection as db_connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Application, OutboundEmail
+
+BATCH_SIZE = 100
+MAX_ATTEMPTS = 6
+BASE_BACKOFF = 60  # seconds, doubled on every failed attempt
+MAX_BACKOFF = 6 * 60 * 60
+# How long a worker may hold claimed messages before another may send them
+CLAIM_LEASE = datetime.timedelta(minutes=10)
+
+
+def build_email(subject, body, recipients, from_email=None):
+    recipients = [address for address in recipients if address]
+    if not recipients:
+        return None
+    return OutboundEmail(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        recipients=recipients,
+    )
+
+
+def enqueue_email(subject, body, recipients, from_email=None):
+    # Call inside the transaction that creates the related rows, so the
+    # message is committed (or rolled back) together with them.
+    email = build_email(subject, body, recipients, from_email)
+    if email is not None:
+        email.save()
+    return email
+
+
+def enqueue_emails(emails):
+    return OutboundEmail.objects.bulk_create([email for email in emails if email is not None])
+
+
+def notify_new_application(application):
+    job = application.job
+    return enqueue_email(
+        subject=f'New Application for {job.title}',
+        body=f'{application.applicant.username} has applied for {job.title}.',
+        recipients=[job.posted_by.email],
+    )
+
+
+def notify_status_changes(applications, status):
+    # applications: dicts with applicant__username, applicant__email and job__title
+    label = dict(Application.STATUS_CHOICES)[status].lower()
+    return enqueue_emails(
+        build_email(
+            subject=f'Your application for {application["job__title"]}',
+            body=(
+                f'Hi {application["applicant__username"]}, your application for '
+                f'{application["job__title"]} has been {label}.'
+            ),
+            recipients=[application['applicant__email']],
+        )
+        for application in applications
+    )
+
+
+def backoff(attempts):
+    return datetime.timedelta(seconds=min(BASE_BACKOFF * 2 ** (attempts - 1), MAX_BACKOFF))
+
+
+def claim_due(batch_size=BATCH_SIZE, now=None):
+    """Claim up to ``batch_size`` due messages for this worker and return them.
+
+    A short transaction marks them Sending under a fresh token, with a lease
+    in ``next_attempt_at``; messages whose lease ran out, because their worker
+    died mid-batch, are due again. The conditional UPDATE means two workers
+    never claim the same message, with or without SKIP LOCKED.
+    """
+    now = now or timezone.now()
+    token = uuid.uuid4()
+    due = Q(status='Q') | Q(status='P', attempts__lt=MAX_ATTEMPTS)
+    with transaction.atomic():
+        # Abandoned claims that used up their attempts will not be retried
+        OutboundEmail.objects.filter(
+            status='P', attempts__gte=MAX_ATTEMPTS, next_attempt_at__lte=now,
+        ).update(status='F', claim_token=None, last_error='Delivery lease expired')
+        candidates = OutboundEmail.objects.filter(due, next_attempt_at__lte=now)
+        if db_connection.features.has_select_for_update_skip_locked:
+            candidates = candidates.select_for_update(skip_locked=True)
+        ids = list(candidates.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return []
+        OutboundEmail.objects.filter(due, pk__in=ids, next_attempt_at__lte=now).update(
+            status='P', claim_token=token, next_attempt_at=now + CLAIM_LEASE,
+            attempts=F('attempts') + 1,
+        )
+    return list(OutboundEmail.objects.filter(claim_token=token))
+
+
+def _failure(email, exc, now):
+    changes = {'claim_token': None, 'last_error': f'{type(exc).__name__}: {exc}'}
+    if email.attempts >= MAX_ATTEMPTS:
+        changes['status'] = 'F'
+    else:
+        changes.update(status='Q', next_attempt_at=now + backoff(email.attempts))
+    return changes
+
+
+def deliver_queued(batch_size=BATCH_SIZE):
+    """Send one batch of due messages over a single SMTP connection.
+
+    Messages are claimed, sent outside any transaction, then their outcomes
+    recorded in a second short transaction, so no database lock is held
+    while talking to the mail server. Returns ``(sent, failed)`` for the batch.
+    """
+    emails = claim_due(batch_size)
+    if not emails:
+        return 0, 0
+
+    sent_ids, failures = [], {}
+    mail_connection = get_connection()
+    try:
+        mail_connection.open()
+    except Exception as exc:
+        failures = {email.pk: _failure(email, exc, timezone.now()) for email in emails}
+    else:
+        try:
+            for email in emails:
+                message = EmailMessage(
+                    email.subject, email.body, email.from_email, email.recipients,
+                    connection=mail_connection,
+                )
+                try:
+                    message.send()
+                except Exception as exc:
+                    failures[email.pk] = _failure(email, exc, timezone.now())
+                else:
+                    sent_ids.append(email.pk)
+        finally:
+            mail_connection.close()
+
+    # Only rows this worker still holds: a lease that lapsed mid-batch may
+    # have passed a message on to another worker
+    token = emails[0].claim_token
+    claimed = OutboundEmail.objects.filter(claim_token=token)
+    with transaction.atomic():
+        claimed.filter(pk__in=sent_ids).update(
+            status='S', claim_token=None, sent_at=timezone.now(), last_error='',
+        )
+        for pk, changes in failures.items():
+            claimed.filter(pk=pk).update(**changes)
+    return len(sent_ids), len(failures)
@@ -0,0 +1,267 @@
+import base64
+import datetime
+import hashlib
+import json
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import Http404
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .routers import read_from_primary
+
+COUNT_CACHE_TIMEOUT = 60
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def keyset_ordering(queryset):
+    # The queryset's own ordering, made total with a trailing primary key
+    ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+    if not all(isinstance(field, str) for field in ordering):
+        raise ValueError('Keyset pagination only supports ordering by field names.')
+    if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+        descending = bool(ordering) and ordering[0].startswith('-')
+        ordering.append('-id' if descending else 'id')
+    return tuple(ordering)
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def encode_cursor(values, reverse=False):
+    payload = json.dumps({'v': [_encode_value(v) for v in values], 'r': reverse})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return list(payload['v']), bool(payload['r'])
+    except (ValueError, TypeError, KeyError):
+        raise InvalidCursor(token)
+
+
+def approximate_count(queryset, timeout=COUNT_CACHE_TIMEOUT):
+    # Totals are cached per query shape; a slightly stale count is fine for
+    # "about N results" and saves a COUNT(*) on every page.
+    try:
+        sql = str(queryset.order_by().query)
+    except Exception:
+        return queryset.count()
+    key = 'jobs:count:' + hashlib.md5(sql.encode()).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        # Counted on the primary, like every other cached value
+        with read_from_primary():
+            count = queryset.count()
+        cache.set(key, count, timeout)
+    return count
+
+
+async def aapproximate_count(queryset, timeout=COUNT_CACHE_TIMEOUT):
+    try:
+        sql = str(queryset.order_by().query)
+    except Exception:
+        return await queryset.acount()
+    key = 'jobs:count:' + hashlib.md5(sql.encode()).hexdigest()
+    count = await cache.aget(key)
+    if count is None:
+        with read_from_primary():
+            count = await queryset.acount()
+        await cache.aset(key, count, timeout)
+    return count
+
+
+class KeysetPage:
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """Seek-based pagination over a total ordering, without OFFSET or COUNT(*)."""
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = keyset_ordering(queryset)
+        self._count = None
+
+    @property
+    def count(self):
+        if self._count is None:
+            self._count = approximate_count(self.queryset)
+        return self._count
+
+    async def acount(self):
+        # Fills the cache behind ``count``, so templates can read it later
+        if self._count is None:
+            self._count = await aapproximate_count(self.queryset)
+        return self._count
+
+    def _seek_filter(self, values, reverse):
+        condition = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            lookup = f'{name}__lt' if descending else f'{name}__gt'
+            condition |= equal & Q(**{lookup: value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def _key(self, obj):
+        if isinstance(obj, dict):
+            return [obj[field.lstrip('-')] for field in self.ordering]
+        return [getattr(obj, field.lstrip('-')) for field in self.ordering]
+
+    def _prepare(self, cursor):
+        values, reverse = decode_cursor(cursor) if cursor else (None, False)
+        if values is not None and len(values) != len(self.ordering):
+            raise InvalidCursor(cursor)
+
+        queryset = self.queryset
+        if reverse:
+            queryset = queryset.order_by(*(
+                field[1:] if field.startswith('-') else '-' + field
+                for field in self.ordering
+            ))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if values is not None:
+            queryset = queryset.filter(self._seek_filter(values, reverse))
+        return queryset[:self.per_page + 1], values, reverse
+
+    def _build_page(self, rows, values, reverse):
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+
+        # Travelling backwards we know a next page exists (we came from it)
+        if reverse:
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+        next_cursor = previous_cursor = None
+        if rows and has_next:
+            next_cursor = encode_cursor(self._key(rows[-1]))
+        if rows and has_previous:
+            previous_cursor = encode_cursor(self._key(rows[0]), reverse=True)
+        return KeysetPage(rows, self, next_cursor, previous_cursor)
+
+    def page(self, cursor=None):
+        queryset, values, reverse = self._prepare(cursor)
+        return self._build_page(list(queryset), values, reverse)
+
+    async def apage(self, cursor=None):
+        queryset, values, reverse = self._prepare(cursor)
+        return self._build_page([row async for row in queryset], values, reverse)
+
+    def get_page(self, cursor=None):
+        """Like page(), but a malformed cursor is a 404, as it is in the API."""
+        try:
+            return self.page(cursor)
+        except (InvalidCursor, ValueError, ValidationError):
+            raise Http404('Invalid cursor')
+
+    async def aget_page(self, cursor=None):
+        try:
+            return await self.apage(cursor)
+        except (InvalidCursor, ValueError, ValidationError):
+            raise Http404('Invalid cursor')
+
+
+class KeysetCursorPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        # As DRF's strict positive ints: 0 and below mean the default
+        if size < 1:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.paginator = KeysetPaginator(queryset, self.get_page_size(request))
+        try:
+            self.page = self.paginator.page(request.query_params.get(self.cursor_query_param))
+        except (InvalidCursor, ValueError, ValidationError):
+            raise NotFound('Invalid cursor')
+        return list(self.page)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.paginator = KeysetPaginator(queryset, self.get_page_size(request))
+        try:
+            self.page = await self.paginator.apage(request.query_params.get(self.cursor_query_param))
+        except (InvalidCursor, ValueError, ValidationError):
+            raise NotFound('Invalid cursor')
+        # get_paginated_response() reads the count
+        await self.paginator.acount()
+        return list(self.page)
+
+    def get_link(self, cursor):
+        if cursor is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.paginator.count,
+            'next': self.get_link(self.page.next_cursor),
+            'previous': self.get_link(self.page.previous_cursor),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {'type': 'integer', 'description': 'Approximate total, cached briefly.'},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,51 @@
+from django.urls import URLPattern, URLResolver, reverse
+
+from . import urls as jobs_urls
+from .models import Application, Job
+
+# Views that only accept POST or need an action argument are not profiled
+SKIPPED_VIEWS = {'update_application_status', 'api-job-bulk-import', 'api-application-bulk-status',
+                 'bulk_update_application_status'}
+
+
+def _iter_patterns(patterns, prefix=''):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            namespace = f'{pattern.namespace}:' if pattern.namespace else prefix
+            yield from _iter_patterns(pattern.url_patterns, namespace)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield prefix + pattern.name, pattern
+
+
+def _sample_kwargs(name, pattern, job, application):
+    kwargs = {}
+    for param in pattern.pattern.regex.groupindex:
+        if param == 'pk' and 'application' in name:
+            if application is None:
+                return None
+            kwargs[param] = application.pk
+        elif param in ('pk', 'job_id'):
+            if job is None:
+                return None
+            kwargs[param] = job.pk
+        else:
+            # format suffixes and other free-form arguments
+            return None
+    return kwargs
+
+
+def view_requests():
+    """Return ``(url_name, path)`` for every GET-able view in jobs.urls."""
+    job = Job.objects.order_by('-applications_count').first()
+    application = Application.objects.order_by('-submitted_at').first()
+    requests = []
+    seen = set()
+    for name, pattern in _iter_patterns(jobs_urls.urlpatterns):
+        if name in SKIPPED_VIEWS or name in seen:
+            continue
+        kwargs = _sample_kwargs(name, pattern, job, application)
+        if kwargs is None:
+            continue
+        seen.add(name)
+        requests.append((name, reverse(name, kwargs=kwargs)))
+    return requests
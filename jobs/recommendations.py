@@ -0,0 +1,392 @@
+""""Jobs for you": TF-IDF matching of candidates against every active job.
+
+Each job is stored as a short hashed term vector (JobVector), kept in step
+by the post_save signal and the bulk paths. Recommending loads those rows
+once per process into a sparse jobs x features matrix and afterwards only
+reads the vectors updated since the last refresh, so ranking never scans
+the Job table. Jobs changed since the matrix was built live in a small
+delta segment that is folded back into the base on the next full build.
+Refreshes and rebuilds read the primary on a background thread, while
+requests keep ranking against the current matrix.
+
+Ranking needs NumPy and SciPy; without them recommend_jobs() returns
+nothing and available() is False. Writing vectors needs neither. Install
+them from requirements-optional.txt.
+"""
+import datetime
+import math
+import threading
+import time
+import zlib
+from array import array
+from collections import Counter
+
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .models import Application, Job, JobVector, UserProfile
+from .routers import read_from_primary
+from .search import tokenize
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # pragma: no cover - exercised only without the extras
+    np = sparse = None
+
+# Terms are hashed into a fixed space, so the vocabulary never needs a table
+DIMENSIONS = 1 << 20
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'location': 2.0,
+    'description': 1.0,
+}
+# 24 terms per job keep a million jobs at about 200 MB of matrix
+MAX_FEATURES = 24
+
+# Candidate profile: the bio plus the jobs applied to most recently
+HISTORY_SIZE = 20
+HISTORY_DECAY = 0.9
+
+REFRESH_INTERVAL = 10
+# Re-read vectors this many seconds before the watermark, so rows committed
+# late by a slow transaction are not missed
+REFRESH_OVERLAP = 5
+# Rebuild the base once the delta holds this share of it
+DELTA_RATIO = 0.05
+MIN_DELTA = 1000
+LOAD_CHUNK_SIZE = 5000
+
+# Scoring reads the candidate's strongest terms, and of each term only the
+# jobs weighting it most: a common term then costs as much as a rare one,
+# and a million jobs rank in a few milliseconds
+MAX_QUERY_FEATURES = 32
+POSTINGS_LIMIT = 20000
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+# Ranked candidates fetched per wanted job, to allow for deactivated or
+# deleted jobs still in the matrix
+OVERFETCH = 3
+
+
+def available():
+    return np is not None
+
+
+# Vectors
+
+def feature_index(term):
+    return zlib.crc32(term.encode()) & (DIMENSIONS - 1)
+
+
+def term_weights(fields):
+    """Map hashed features to sublinear tf weights for ``(text, field_weight)`` pairs."""
+    weights = Counter()
+    for text, field_weight in fields:
+        for term, count in Counter(tokenize(text)).items():
+            weights[feature_index(term)] += field_weight * (1 + math.log(count))
+    return weights
+
+
+def normalize(weights, limit=None):
+    items = sorted(weights.items(), key=lambda item: -item[1])[:limit]
+    norm = math.sqrt(sum(weight * weight for _, weight in items)) or 1.0
+    return sorted((feature, weight / norm) for feature, weight in items)
+
+
+def pack(items):
+    features = array('i', (feature for feature, _ in items))
+    weights = array('f', (weight for _, weight in items))
+    return features.tobytes(), weights.tobytes()
+
+
+def unpack(features, weights):
+    return zip(array('i', bytes(features)), array('f', bytes(weights)))
+
+
+def job_vector(job):
+    items = normalize(
+        term_weights((getattr(job, field), weight) for field, weight in FIELD_WEIGHTS.items()),
+        MAX_FEATURES,
+    )
+    features, weights = pack(items)
+    return JobVector(job_id=job.pk, features=features, weights=weights)
+
+
+def save_job_vectors(jobs, batch_size=500):
+    vectors = [job_vector(job) for job in jobs]
+    JobVector.objects.bulk_create(
+        vectors, batch_size=batch_size, update_conflicts=True,
+        unique_fields=['job'], update_fields=['features', 'weights', 'updated_at'],
+    )
+    return len(vectors)
+
+
+def rebuild_vectors(batch_size=500, stdout=None):
+    saved = 0
+    batch = []
+    jobs = Job.objects.only('pk', *FIELD_WEIGHTS).order_by('pk')
+    for job in jobs.iterator(chunk_size=batch_size):
+        batch.append(job)
+        if len(batch) >= batch_size:
+            saved += save_job_vectors(batch, batch_size)
+            batch = []
+            if stdout:
+                stdout.write(f'Vectorized {saved} jobs...')
+    if batch:
+        saved += save_job_vectors(batch, batch_size)
+    reset_matrix()
+    return saved
+
+
+# Job matrix
+
+class Segment:
+    """Rows of L2-normalised TF-IDF job vectors, stored column-major.
+
+    Each column lists its jobs by descending weight, so scoring reads the
+    head of the columns of the query's terms and never the whole matrix.
+    """
+    __slots__ = ('matrix', 'job_ids', 'live')
+
+    def __init__(self, matrix, job_ids, live=None):
+        self.matrix = matrix
+        self.job_ids = job_ids
+        self.live = np.ones(len(job_ids), dtype=bool) if live is None else live
+
+    @classmethod
+    def from_rows(cls, job_ids, indptr, indices, data, idf):
+        data = data * idf[indices]
+        rows = np.repeat(np.arange(len(job_ids)), np.diff(indptr))
+        norms = np.sqrt(np.bincount(rows, weights=data * data, minlength=len(job_ids)))
+        data /= np.where(norms > 0, norms, 1)[rows]
+        matrix = sparse.csr_matrix(
+            (data.astype(np.float32), indices, indptr), shape=(len(job_ids), DIMENSIONS),
+        ).tocsc()
+        # One sort by (column, descending weight); weights lie in [0, 1]
+        columns = np.repeat(np.arange(DIMENSIONS, dtype=np.int64), np.diff(matrix.indptr))
+        rank = ((1 - np.clip(matrix.data, 0, 1)) * 0xFFFFFFFF).astype(np.int64)
+        order = np.argsort((columns << 32) | rank, kind='stable')
+        matrix.indices, matrix.data = matrix.indices[order], matrix.data[order]
+        return cls(matrix, np.asarray(job_ids, dtype=np.int64))
+
+    def top(self, features, weights, k):
+        matrix = self.matrix
+        starts = matrix.indptr[features]
+        ends = np.minimum(matrix.indptr[features + 1], starts + POSTINGS_LIMIT)
+        if not len(self.job_ids) or not (ends - starts).any():
+            return self.job_ids[:0], np.zeros(0, dtype=np.float64)
+        spans = [slice(start, end) for start, end in zip(starts, ends)]
+        rows = np.concatenate([matrix.indices[span] for span in spans])
+        values = np.concatenate([matrix.data[span] * weight for span, weight in zip(spans, weights)])
+        scores = np.bincount(rows, weights=values, minlength=len(self.job_ids))
+        scores[~self.live] = 0
+        matched = np.flatnonzero(scores > 0)
+        k = min(k, len(matched))
+        if not k:
+            return self.job_ids[:0], scores[:0]
+        best = matched[np.argpartition(-scores[matched], k - 1)[:k]]
+        return self.job_ids[best], scores[best]
+
+
+def _load_rows(queryset):
+    job_ids, features, weights, lengths, active = [], [], [], [], []
+    rows = queryset.values_list('job_id', 'features', 'weights', 'job__is_active')
+    for job_id, row_features, row_weights, is_active in rows.iterator(chunk_size=LOAD_CHUNK_SIZE):
+        job_ids.append(job_id)
+        features.append(bytes(row_features))
+        weights.append(bytes(row_weights))
+        lengths.append(len(row_features) // 4)
+        active.append(is_active)
+    indptr = np.zeros(len(job_ids) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=indptr[1:])
+    indices = np.frombuffer(b''.join(features), dtype=np.int32)
+    data = np.frombuffer(b''.join(weights), dtype=np.float32).astype(np.float64)
+    return job_ids, indptr, indices, data, active
+
+
+class JobMatrix:
+    def __init__(self):
+        started = timezone.now()
+        job_ids, indptr, indices, data, _ = _load_rows(
+            JobVector.objects.filter(job__is_active=True).order_by('job_id')
+        )
+        # Smoothed IDF, fixed until the next full build
+        document_frequency = np.bincount(indices, minlength=DIMENSIONS)
+        self.idf = np.log((1 + len(job_ids)) / (1 + document_frequency)) + 1
+        self.base = Segment.from_rows(job_ids, indptr, indices, data, self.idf)
+        self.delta = Segment.from_rows([], np.zeros(1, dtype=np.int64), indices[:0], data[:0], self.idf)
+        self.changed = {}
+        self.watermark = started - datetime.timedelta(seconds=REFRESH_OVERLAP)
+        self.refreshed_at = time.monotonic()
+
+    def needs_rebuild(self):
+        return len(self.changed) > max(MIN_DELTA, DELTA_RATIO * len(self.base.job_ids))
+
+    def is_stale(self):
+        return self.needs_rebuild() or time.monotonic() - self.refreshed_at >= REFRESH_INTERVAL
+
+    def refresh(self):
+        """Move vectors updated since the last refresh into the delta segment."""
+        started = timezone.now()
+        job_ids, indptr, indices, data, active = _load_rows(
+            JobVector.objects.filter(updated_at__gte=self.watermark)
+        )
+        self.watermark = started - datetime.timedelta(seconds=REFRESH_OVERLAP)
+        self.refreshed_at = time.monotonic()
+        if not job_ids:
+            return
+        for row, job_id in enumerate(job_ids):
+            if active[row]:
+                span = slice(indptr[row], indptr[row + 1])
+                self.changed[job_id] = (indices[span], data[span])
+            else:
+                self.changed.pop(job_id, None)
+
+        # Hide the superseded base rows; swap in new objects so concurrent
+        # readers keep a consistent view
+        live = self.base.live.copy()
+        changed_ids = np.asarray(job_ids, dtype=np.int64)
+        positions = np.searchsorted(self.base.job_ids, changed_ids)
+        positions = positions[positions < len(live)]
+        live[positions[np.isin(self.base.job_ids[positions], changed_ids)]] = False
+        base = Segment(self.base.matrix, self.base.job_ids, live)
+
+        delta_ids = sorted(self.changed)
+        lengths = [len(self.changed[job_id][0]) for job_id in delta_ids]
+        delta_indptr = np.zeros(len(delta_ids) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=delta_indptr[1:])
+        delta_indices = np.concatenate([self.changed[job_id][0] for job_id in delta_ids] or [indices[:0]])
+        delta_data = np.concatenate([self.changed[job_id][1] for job_id in delta_ids] or [data[:0]])
+        self.base, self.delta = base, Segment.from_rows(
+            delta_ids, delta_indptr, delta_indices, delta_data, self.idf,
+        )
+
+    def top(self, vector, k):
+        """Return ``[(job_id, score)]`` of the k best matches for a term vector."""
+        if not vector:
+            return []
+        features = np.fromiter((feature for feature, _ in vector), dtype=np.int64, count=len(vector))
+        weights = np.fromiter((weight for _, weight in vector), dtype=np.float64, count=len(vector))
+        weights *= self.idf[features]
+        weights /= np.linalg.norm(weights) or 1
+        strongest = np.argsort(-weights, kind='stable')[:MAX_QUERY_FEATURES]
+        features, weights = features[strongest], weights[strongest]
+        base, delta = self.base, self.delta
+        ids, scores = zip(base.top(features, weights, k), delta.top(features, weights, k))
+        ids, scores = np.concatenate(ids), np.concatenate(scores)
+        order = np.argsort(-scores, kind='stable')[:k]
+        return [(int(ids[i]), float(scores[i])) for i in order]
+
+
+_matrix = None
+# Held while building, refreshing or replacing the matrix
+_lock = threading.Lock()
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def _update(matrix):
+    global _matrix
+    with _lock:
+        # Skip if reset or replaced while this update waited
+        if _matrix is not matrix or not matrix.is_stale():
+            return
+        # A replica lagging more than REFRESH_OVERLAP would lose vectors
+        with read_from_primary():
+            if matrix.needs_rebuild():
+                _matrix = JobMatrix()
+            else:
+                matrix.refresh()
+
+
+def _update_in_background(matrix):
+    global _worker
+    with _worker_lock:
+        if _worker is not None and _worker.is_alive():
+            return
+        _worker = threading.Thread(target=_background_update, args=(matrix,), name='job-matrix', daemon=True)
+        _worker.start()
+
+
+def _background_update(matrix):
+    try:
+        _update(matrix)
+    finally:
+        connections.close_all()
+
+
+def get_matrix():
+    """Return this process's job matrix, refreshing or rebuilding it when due.
+
+    Only the first call in a process waits for a full build; after that the
+    update runs on a worker thread and callers get the current matrix.
+    Inside a transaction it runs inline instead, since another connection
+    would not see the transaction's rows.
+    """
+    global _matrix
+    matrix = _matrix
+    if matrix is None:
+        with _lock:
+            if _matrix is None:
+                with read_from_primary():
+                    _matrix = JobMatrix()
+            return _matrix
+    if matrix.is_stale():
+        if transaction.get_connection().in_atomic_block:
+            _update(matrix)
+            return _matrix
+        _update_in_background(matrix)
+    return matrix
+
+
+def reset_matrix():
+    global _matrix
+    with _lock:
+        _matrix = None
+
+
+# Candidates
+
+def candidate_vector(user, applied_job_ids):
+    """Blend the candidate's bio with the jobs they applied to, newest first."""
+    bio = UserProfile.objects.filter(user=user).values_list('bio', flat=True).first() or ''
+    weights = Counter(dict(normalize(term_weights([(bio, 1.0)]))))
+    recent = applied_job_ids[:HISTORY_SIZE]
+    vectors = {
+        job_id: (features, row_weights)
+        for job_id, features, row_weights in
+        JobVector.objects.filter(job_id__in=recent).values_list('job_id', 'features', 'weights')
+    }
+    for age, job_id in enumerate(recent):
+        if job_id in vectors:
+            for feature, weight in unpack(*vectors[job_id]):
+                weights[feature] += weight * HISTORY_DECAY ** age
+    return normalize(weights)
+
+
+def recommend_jobs(user, limit=DEFAULT_LIMIT, queryset=None):
+    """Return up to ``limit`` active jobs ranked for ``user``, each with ``match_score``."""
+    if not available() or not user.is_authenticated:
+        return []
+    applied = list(
+        Application.objects.filter(applicant=user).order_by('-submitted_at').values_list('job_id', flat=True)
+    )
+    vector = candidate_vector(user, applied)
+    if not vector:
+        return []
+    ranked = get_matrix().top(vector, limit * OVERFETCH + len(applied))
+    applied = set(applied)
+    ranked = [(job_id, score) for job_id, score in ranked if job_id not in applied]
+    queryset = Job.objects.for_listing() if queryset is None else queryset
+    jobs = queryset.in_bulk([job_id for job_id, _ in ranked[:limit * OVERFETCH]])
+    results = []
+    for job_id, score in ranked:
+        job = jobs.get(job_id)
+        if job is not None:
+            job.match_score = round(score, 4)
+            results.append(job)
+            if len(results) == limit:
+                break
+    return results
@@ -0,0 +1,59 @@
+import hashlib
+
+from django.core.files.uploadhandler import SkipFile, TemporaryFileUploadHandler
+
+MAX_RESUME_SIZE = 5 * 1024 * 1024  # 5MB
+RESUME_TOO_LARGE = 'Resume file size must be under 5MB.'
+
+# Upload fields whose size is capped while streaming
+UPLOAD_LIMITS = {
+    'resume': MAX_RESUME_SIZE,
+}
+
+
+def oversized_uploads(request):
+    """Return the names of capped fields whose upload HashingUploadHandler dropped."""
+    return getattr(request, '_oversized_uploads', frozenset())
+
+
+def file_digest(uploaded_file):
+    # Uploads that came through HashingUploadHandler were hashed in flight
+    digest = getattr(uploaded_file, 'sha256', None)
+    if digest:
+        return digest
+    hasher = hashlib.sha256()
+    uploaded_file.seek(0)
+    for chunk in uploaded_file.chunks():
+        hasher.update(chunk)
+    uploaded_file.seek(0)
+    return hasher.hexdigest()
+
+
+class HashingUploadHandler(TemporaryFileUploadHandler):
+    """Stream uploads to disk chunk by chunk, hashing them on the way.
+
+    A capped field that passes its UPLOAD_LIMITS size is dropped mid-stream:
+    its temporary file is deleted, the rest of its body is read past
+    without being stored, and the field name is recorded on the request
+    (see oversized_uploads()) so forms can say why the file is missing.
+    """
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.limit = UPLOAD_LIMITS.get(field_name)
+        self.hasher = hashlib.sha256()
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.limit is not None and self.received > self.limit:
+            if self.request is not None:
+                self.request._oversized_uploads = {*oversized_uploads(self.request), self.field_name}
+            raise SkipFile
+        self.hasher.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        uploaded_file = super().file_complete(file_size)
+        uploaded_file.sha256 = self.hasher.hexdigest()
+        return uploaded_file
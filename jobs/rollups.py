@@ -0,0 +1,122 @@
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Application, ArchivedApplication, ArchivedJob, Job, JobTypeDailyStat
+
+COUNTERS = ('jobs', 'active_jobs', 'applications')
+
+
+def apply_delta(day, job_type, using=None, **deltas):
+    deltas = {name: value for name, value in deltas.items() if value}
+    if not deltas:
+        return
+    rows = JobTypeDailyStat.objects.using(using).filter(day=day, job_type=job_type)
+    updates = {name: F(name) + value for name, value in deltas.items()}
+    if rows.update(**updates):
+        return
+    try:
+        with transaction.atomic(using=using):
+            JobTypeDailyStat.objects.using(using).create(day=day, job_type=job_type, **deltas)
+    except IntegrityError:
+        # Another writer created the row first
+        rows.update(**updates)
+
+
+def job_saved(job, created, using=None):
+    day = timezone.localdate(job.created_at)
+    if created:
+        apply_delta(day, job.job_type, using=using, jobs=1, active_jobs=int(job.is_active))
+    else:
+        loaded = getattr(job, '_loaded_values', {})
+        old_type = loaded.get('job_type', job.job_type)
+        old_active = loaded.get('is_active', job.is_active)
+        if old_type != job.job_type:
+            apply_delta(day, old_type, using=using, jobs=-1, active_jobs=-int(old_active))
+            apply_delta(day, job.job_type, using=using, jobs=1, active_jobs=int(job.is_active))
+        elif old_active != job.is_active:
+            apply_delta(day, job.job_type, using=using, active_jobs=1 if job.is_active else -1)
+    job._loaded_values = {'job_type': job.job_type, 'is_active': job.is_active}
+
+
+def apply_job_states(changes, using=None):
+    # changes: (before, after) pairs of (day, job_type, is_active), None when absent
+    deltas = defaultdict(lambda: {'jobs': 0, 'active_jobs': 0})
+    for before, after in changes:
+        for state, sign in ((before, -1), (after, 1)):
+            if state is None:
+                continue
+            day, job_type, is_active = state
+            deltas[day, job_type]['jobs'] += sign
+            deltas[day, job_type]['active_jobs'] += sign * int(is_active)
+    for (day, job_type), counters in deltas.items():
+        apply_delta(day, job_type, using=using, **counters)
+
+
+def job_state(job):
+    return timezone.localdate(job.created_at), job.job_type, job.is_active
+
+
+def job_deleted(job, using=None):
+    apply_delta(
+        timezone.localdate(job.created_at), job.job_type, using=using,
+        jobs=-1, active_jobs=-int(job.is_active),
+    )
+
+
+def application_changed(application, delta, using=None):
+    if Application.job.is_cached(application):
+        job_type = application.job.job_type
+    else:
+        job_type = (
+            Job.objects.using(using).filter(pk=application.job_id)
+            .values_list('job_type', flat=True).first()
+        )
+    if job_type is None:
+        return
+    apply_delta(timezone.localdate(application.submitted_at), job_type, using=using, applications=delta)
+
+
+def rebuild(batch_size=1000):
+    # Both sides are grouped by the database and streamed; only one counter
+    # row per (day, job_type) is held in memory.
+    totals = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    # Archived jobs and applications still count, as inactive history
+    job_counts = (
+        (Job, {'jobs': Count('id'), 'active_jobs': Count('id', filter=Q(is_active=True))}),
+        (ArchivedJob, {'jobs': Count('id')}),
+    )
+    for model, counts in job_counts:
+        job_rows = (
+            model.objects.order_by()
+            .annotate(day=TruncDate('created_at'))
+            .values('day', 'job_type')
+            .annotate(**counts)
+        )
+        for row in job_rows.iterator(chunk_size=batch_size):
+            counters = totals[row['day'], row['job_type']]
+            counters['jobs'] += row['jobs']
+            counters['active_jobs'] += row.get('active_jobs', 0)
+    for model in (Application, ArchivedApplication):
+        application_rows = (
+            model.objects.order_by()
+            .annotate(day=TruncDate('submitted_at'), job_type=F('job__job_type'))
+            .values('day', 'job_type')
+            .annotate(applications=Count('id'))
+        )
+        for row in application_rows.iterator(chunk_size=batch_size):
+            totals[row['day'], row['job_type']]['applications'] += row['applications']
+
+    with transaction.atomic():
+        JobTypeDailyStat.objects.all().delete()
+        JobTypeDailyStat.objects.bulk_create(
+            [
+                JobTypeDailyStat(day=day, job_type=job_type, **counters)
+                for (day, job_type), counters in totals.items()
+            ],
+            batch_size=batch_size,
+        )
+    return len(totals)
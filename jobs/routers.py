@@ -0,0 +1,172 @@
+import contextvars
+import functools
+import random
+import sqlite3
+import time
+from contextlib import closing, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Only this app's tables go to replicas; sessions and users stay on the
+# primary, so a replica lagging behind a login never logs anyone out
+REPLICA_APP_LABELS = {'jobs'}
+PIN_COOKIE = 'primary_pin'
+
+_replica_reads = contextvars.ContextVar('replica_reads', default=False)
+_request_state = contextvars.ContextVar('replica_request_state', default=None)
+
+
+class RequestState:
+    __slots__ = ('pinned', 'wrote')
+
+    def __init__(self, pinned):
+        self.pinned = pinned
+        self.wrote = False
+
+
+@contextmanager
+def read_from_replicas():
+    """Let reads of read-only listing and analytics code go to a replica."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+@contextmanager
+def read_from_primary():
+    """Send reads back to the primary, even inside read_from_replicas().
+
+    For values that outlive the request, such as cache entries stored under
+    a freshly bumped version, which must not be computed from a lagging replica.
+    """
+    token = _replica_reads.set(False)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def replica_reads(view):
+    """Decorator form of read_from_replicas() for sync and async views."""
+    if iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def wrapper(*args, **kwargs):
+            with read_from_replicas():
+                return await view(*args, **kwargs)
+    else:
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            with read_from_replicas():
+                return view(*args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    """Send reads inside read_from_replicas() to a replica, everything else to the primary.
+
+    Reads stay on the primary inside transactions, after the current request
+    wrote anything, and while the client's pin cookie is fresh.
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if not replicas or not _replica_reads.get() or model._meta.app_label not in REPLICA_APP_LABELS:
+            return DEFAULT_DB_ALIAS
+        state = _request_state.get()
+        if state is not None and (state.pinned or state.wrote):
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        # Only writes to tables replicas serve can be missing from them;
+        # session and last_login writes would pin every login for nothing
+        state = _request_state.get()
+        if state is not None and model._meta.app_label in REPLICA_APP_LABELS:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaPinningMiddleware:
+    """Pin a client's reads to the primary for a while after its own writes.
+
+    Requests that write set a short-lived cookie; while it is fresh the
+    client reads from the primary and sees what it just posted or applied
+    to, whatever the replicas' lag.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        state = RequestState(self.is_pinned(request))
+        token = _request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        return self.pin(response, state)
+
+    async def __acall__(self, request):
+        state = RequestState(self.is_pinned(request))
+        token = _request_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        return self.pin(response, state)
+
+    def is_pinned(self, request):
+        try:
+            return int(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def pin(self, response, state):
+        if state.wrote and settings.DATABASE_REPLICAS:
+            seconds = settings.REPLICA_PIN_SECONDS
+            response.set_cookie(
+                PIN_COOKIE, str(int(time.time()) + seconds),
+                max_age=seconds, httponly=True, samesite='Lax',
+            )
+        return response
+
+
+def copy_sqlite_database(source, target):
+    # The backup API copies a consistent snapshot, WAL contents included
+    with closing(sqlite3.connect(source)) as primary, closing(sqlite3.connect(target)) as replica:
+        primary.backup(replica)
+
+
+def sync_sqlite_replicas():
+    """Copy the SQLite primary over every SQLite replica; return the aliases copied."""
+    primary = connections[DEFAULT_DB_ALIAS]
+    if primary.vendor != 'sqlite':
+        return []
+    synced = []
+    for alias in settings.DATABASE_REPLICAS:
+        replica = connections[alias]
+        if replica.vendor == 'sqlite':
+            replica.close()
+            copy_sqlite_database(primary.settings_dict['NAME'], replica.settings_dict['NAME'])
+            synced.append(alias)
+    return synced
@@ -0,0 +1,125 @@
+"""Parse free-text ``Job.salary_range`` values into annual numeric bounds.
+
+Handles the shapes seen in postings: ``$40k - $60k``, ``€50,000 - €70,000``,
+``₹8-12 LPA``, ``1.2 Cr``, ``$30/hr``, ``4000-5000 EUR per month``. Amounts
+are stored per year in the posting's own currency; anything unparseable
+leaves the numeric fields empty.
+"""
+import re
+from dataclasses import dataclass
+
+PERIOD_CHOICES = [
+    ('H', 'Hourly'),
+    ('D', 'Daily'),
+    ('W', 'Weekly'),
+    ('M', 'Monthly'),
+    ('Y', 'Yearly'),
+]
+# Multipliers to a year, assuming full-time hours
+PERIODS_PER_YEAR = {'H': 2080, 'D': 260, 'W': 52, 'M': 12, 'Y': 1}
+PERIOD_WORDS = {
+    'H': ('hour', 'hourly', 'hr', 'hrs', 'ph'),
+    'D': ('day', 'daily', 'pd'),
+    'W': ('week', 'weekly', 'wk', 'pw'),
+    'M': ('month', 'monthly', 'mo', 'mon', 'pm'),
+    'Y': ('year', 'yearly', 'yr', 'annum', 'annual', 'annually', 'pa', 'lpa'),
+}
+
+CURRENCY_SYMBOLS = {'$': 'USD', '€': 'EUR', '£': 'GBP', '₹': 'INR', '¥': 'JPY'}
+CURRENCY_CODES = {
+    'usd', 'eur', 'gbp', 'inr', 'jpy', 'cad', 'aud', 'sgd', 'chf', 'sek', 'pln', 'brl', 'mxn', 'zar',
+}
+CURRENCY_ALIASES = {'rs': 'INR', 'inr': 'INR', 'lpa': 'INR', 'lakh': 'INR', 'lakhs': 'INR', 'cr': 'INR', 'crore': 'INR'}
+# Every code a parsed salary can carry
+CURRENCIES = sorted({code.upper() for code in CURRENCY_CODES} | set(CURRENCY_SYMBOLS.values()))
+
+MULTIPLIERS = {
+    'k': 1_000, 'm': 1_000_000, 'mn': 1_000_000, 'million': 1_000_000,
+    'l': 100_000, 'lac': 100_000, 'lacs': 100_000, 'lakh': 100_000, 'lakhs': 100_000, 'lpa': 100_000,
+    'cr': 10_000_000, 'crore': 10_000_000, 'crores': 10_000_000,
+}
+
+AMOUNT_RE = re.compile(
+    r'(?<![\w.])(\d[\d,]*(?:\.\d+)?)\s*(' + '|'.join(sorted(MULTIPLIERS, key=len, reverse=True)) + r')?(?![a-z])'
+)
+WORD_RE = re.compile(r'[a-z]+')
+
+# Annual amounts outside this range are typos or not salaries ("2 years")
+MIN_ANNUAL = 1_000
+MAX_ANNUAL = 2_000_000_000
+
+
+@dataclass(frozen=True)
+class Salary:
+    minimum: int | None = None
+    maximum: int | None = None
+    currency: str = ''
+    period: str = ''
+
+
+def _currency(text, words):
+    for symbol, code in CURRENCY_SYMBOLS.items():
+        if symbol in text:
+            return code
+    for word in words:
+        if word in CURRENCY_CODES:
+            return word.upper()
+        if word in CURRENCY_ALIASES:
+            return CURRENCY_ALIASES[word]
+    return ''
+
+
+def _period(words):
+    for period, names in PERIOD_WORDS.items():
+        if any(word in names for word in words):
+            return period
+    return 'Y'
+
+
+def parse_salary(text):
+    """Return a :class:`Salary`; its bounds are ``None`` when ``text`` has no amount."""
+    text = (text or '').lower()
+    matches = AMOUNT_RE.findall(text)
+    if not matches:
+        return Salary()
+    words = set(WORD_RE.findall(text))
+    period = _period(words)
+
+    # "40-60k" and "8-12 LPA": a bare leading number takes the unit after the last one
+    matches = matches[:2]
+    trailing = MULTIPLIERS.get(matches[-1][1], 1)
+    amounts = []
+    for number, unit in matches:
+        value = float(number.replace(',', ''))
+        amounts.append(value * (MULTIPLIERS[unit] if unit else trailing))
+    annual = [round(amount * PERIODS_PER_YEAR[period]) for amount in amounts]
+    if not all(MIN_ANNUAL <= amount <= MAX_ANNUAL for amount in annual):
+        return Salary()
+    return Salary(min(annual), max(annual), _currency(text, words), period)
+
+
+# Bands for faceting, by the annual minimum
+BANDS = [0, 25_000, 50_000, 100_000, 150_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000]
+
+
+def band_value(currency, low):
+    return f'{currency}:{low}'
+
+
+def parse_band(value):
+    """Return ``(currency, low, high)`` for a band value; ``high`` is None for the top band."""
+    currency, _, low = value.rpartition(':')
+    low = int(low)
+    if low not in BANDS:
+        raise ValueError(value)
+    index = BANDS.index(low)
+    high = BANDS[index + 1] if index + 1 < len(BANDS) else None
+    return currency, low, high
+
+
+def band_label(value):
+    currency, low, high = parse_band(value)
+    prefix = f'{currency} ' if currency else ''
+    if high is None:
+        return f'{prefix}{low:,}+'
+    return f'{prefix}{low:,} - {high:,}'
@@ -0,0 +1,111 @@
+import re
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Exists, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Job, SearchIndexEntry
+
+# Relative weight of a term depending on the field it was found in
+FIELD_WEIGHTS = {
+    'title': 8,
+    'company_name': 5,
+    'location': 4,
+    'description': 1,
+}
+
+STOP_WORDS = {
+    'a', 'an', 'and', 'at', 'for', 'in', 'of', 'on', 'or', 'the', 'to', 'with',
+}
+
+MAX_TERM_LENGTH = 64
+TOKEN_RE = re.compile(r'\w+')
+
+
+def tokenize(text):
+    tokens = []
+    for token in TOKEN_RE.findall((text or '').lower()):
+        if token in STOP_WORDS:
+            continue
+        tokens.append(token[:MAX_TERM_LENGTH])
+    return tokens
+
+
+def build_entries(job):
+    weights = Counter()
+    for field, field_weight in FIELD_WEIGHTS.items():
+        for term in tokenize(getattr(job, field)):
+            weights[term] += field_weight
+    return [
+        SearchIndexEntry(term=term, job_id=job.pk, weight=weight)
+        for term, weight in weights.items()
+    ]
+
+
+def index_job(job):
+    with transaction.atomic():
+        SearchIndexEntry.objects.filter(job_id=job.pk).delete()
+        SearchIndexEntry.objects.bulk_create(build_entries(job))
+
+
+def index_jobs(jobs, batch_size=500):
+    entries = []
+    job_ids = []
+    for job in jobs:
+        job_ids.append(job.pk)
+        entries.extend(build_entries(job))
+    with transaction.atomic():
+        SearchIndexEntry.objects.filter(job_id__in=job_ids).delete()
+        SearchIndexEntry.objects.bulk_create(entries, batch_size=batch_size)
+    return len(entries)
+
+
+def _prefix_filter(term):
+    # A range scan instead of LIKE 'term%' so the (term, job) index is used on
+    # every backend regardless of collation.
+    return Q(term__gte=term, term__lt=term + '\uffff')
+
+
+def search_jobs(queryset, query):
+    """Prefix-match every term of ``query`` and order by ``search_rank``."""
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms:
+        return queryset
+
+    matches_any = Q()
+    for term in terms:
+        term_filter = _prefix_filter(term)
+        matches_any |= term_filter
+        queryset = queryset.filter(Exists(
+            SearchIndexEntry.objects.filter(term_filter, job=OuterRef('pk'))
+        ))
+
+    rank = (
+        SearchIndexEntry.objects.filter(matches_any, job=OuterRef('pk'))
+        .values('job')
+        .annotate(total=Sum('weight'))
+        .values('total')
+    )
+    return queryset.annotate(
+        search_rank=Coalesce(Subquery(rank), Value(0), output_field=IntegerField())
+    ).order_by('-search_rank', '-created_at', '-id')
+
+
+def rebuild_index(batch_size=500, stdout=None):
+    # index_jobs() replaces the entries of each batch, so the index stays
+    # queryable for the whole rebuild.
+    indexed = 0
+    batch = []
+    for job in Job.objects.order_by('pk').iterator(chunk_size=batch_size):
+        batch.append(job)
+        if len(batch) >= batch_size:
+            index_jobs(batch, batch_size=batch_size)
+            indexed += len(batch)
+            batch = []
+            if stdout:
+                stdout.write(f'Indexed {indexed} jobs...')
+    if batch:
+        index_jobs(batch, batch_size=batch_size)
+        indexed += len(batch)
+    return indexed
@@ -1,7 +1,35 @@
 from rest_framework import serializers
+from django.db.models.functions import Substr
 from .models import Job, Application
+from .pagination import keyset_ordering
+from .resumes import RESUME_TOO_LARGE, oversized_uploads
 from django.contrib.auth.models import User
 
+MAX_STATUS_UPDATES = 1000
+
+# Compact list rows: output name -> model field or expression. Rows come
+# straight from .values() and skip the serializer field machinery.
+COMPACT_DESCRIPTION_LENGTH = 200
+COMPACT_JOB_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'description': Substr('description', 1, COMPACT_DESCRIPTION_LENGTH),
+    'company_name': 'company_name',
+    'location': 'location',
+    'job_type': 'job_type',
+    'salary_range': 'salary_range',
+    'salary_min': 'salary_min',
+    'salary_max': 'salary_max',
+    'salary_currency': 'salary_currency',
+    'latitude': 'latitude',
+    'longitude': 'longitude',
+    'posted_by': 'posted_by_id',
+    'created_at': 'created_at',
+    'is_active': 'is_active',
+    'application_count': 'applications_count',
+}
+DEFAULT_COMPACT_FIELDS = ['id', 'title', 'company_name', 'location', 'job_type', 'created_at']
+
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
@@ -9,15 +37,76 @@ class UserSerializer(serializers.ModelSerializer):
 
 class JobSerializer(serializers.ModelSerializer):
     posted_by = UserSerializer(read_only=True)
-    application_count = serializers.IntegerField(read_only=True)
+    application_count = serializers.IntegerField(source='applications_count', read_only=True)
+    # Only present on ?near= queries, which annotate it
+    distance_km = serializers.FloatField(read_only=True)
     
     class Meta:
         model = Job
         fields = ['id', 'title', 'description', 'company_name', 'location', 
-                  'job_type', 'salary_range', 'posted_by', 'created_at', 
-                  'is_active', 'application_count']
+                  'latitude', 'longitude', 'job_type', 'salary_range', 'salary_min', 'salary_max',
+                  'salary_currency', 'salary_period', 'posted_by', 'created_at', 
+                  'expires_at', 'is_active', 'application_count', 'distance_km']
         read_only_fields = ['created_at']
 
+class RecommendedJobSerializer(JobSerializer):
+    match_score = serializers.FloatField(read_only=True)
+    
+    class Meta(JobSerializer.Meta):
+        fields = JobSerializer.Meta.fields + ['match_score']
+
+def parse_compact_fields(value):
+    fields = [name.strip() for name in value.split(',') if name.strip()] or DEFAULT_COMPACT_FIELDS
+    unknown = [name for name in fields if name not in COMPACT_JOB_FIELDS]
+    if unknown:
+        raise serializers.ValidationError({
+            'fields': [f"Unknown field(s): {', '.join(unknown)}. Choose from {', '.join(COMPACT_JOB_FIELDS)}."]
+        })
+    return list(dict.fromkeys(fields))
+
+class CompactJobRows:
+    """A ``.values()`` queryset of the requested fields plus the keyset columns."""
+    
+    def __init__(self, queryset, fields):
+        self.columns = {}
+        plain, expressions = [], {}
+        for name in fields:
+            source = COMPACT_JOB_FIELDS[name]
+            if isinstance(source, str):
+                plain.append(source)
+                self.columns[name] = source
+            else:
+                # values() aliases may not shadow model fields
+                alias = f'compact_{name}'
+                expressions[alias] = source
+                self.columns[name] = alias
+        ordering = [field.lstrip('-') for field in keyset_ordering(queryset)]
+        self.queryset = queryset.values(*dict.fromkeys(plain + ordering), **expressions)
+    
+    def render(self, rows):
+        columns = self.columns.items()
+        return [{name: row[key] for name, key in columns} for row in rows]
+
+class JobImportSerializer(serializers.ModelSerializer):
+    external_id = serializers.CharField(max_length=100)
+
+    class Meta:
+        model = Job
+        fields = ['external_id', 'title', 'description', 'company_name',
+                  'location', 'job_type', 'salary_range', 'expires_at', 'is_active']
+
+    def to_internal_value(self, data):
+        # CSV exports write a missing expiry as an empty cell
+        if isinstance(data, dict) and data.get('expires_at') == '':
+            data = {**data, 'expires_at': None}
+        return super().to_internal_value(data)
+
+class BulkStatusSerializer(serializers.Serializer):
+    application_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=MAX_STATUS_UPDATES
+    )
+    status = serializers.ChoiceField(choices=Application.STATUS_CHOICES)
+
 class ApplicationSerializer(serializers.ModelSerializer):
     job = JobSerializer(read_only=True)
     applicant = UserSerializer(read_only=True)
@@ -26,4 +115,12 @@ class ApplicationSerializer(serializers.ModelSerializer):
         model = Application
         fields = ['id', 'job', 'applicant', 'resume', 'message', 
                   'status', 'submitted_at']
-        read_only_fields = ['submitted_at', 'status']
\ No newline at end of file
+        read_only_fields = ['submitted_at', 'status']
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        # An oversized upload was dropped while streaming and arrives as no file
+        if request is not None and 'resume' in oversized_uploads(request):
+            fields['resume'].error_messages['required'] = RESUME_TOO_LARGE
+        return fields
@@ -0,0 +1,118 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import rollups
+from .cache import bump_version
+from .dashboard import invalidate_dashboard
+from .fragments import invalidate_fragments
+from .models import Application, ArchivedApplication, Job, ResumeBlob
+from .recommendations import save_job_vectors
+from .search import index_job
+
+
+@receiver(post_save, sender=Job)
+def update_search_index(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    index_job(instance)
+
+
+@receiver(post_save, sender=Job)
+def update_job_vector(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    save_job_vectors([instance])
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_job_caches(sender, instance, raw=False, using=None, **kwargs):
+    if raw:
+        return
+    # After commit, so a concurrent refresh cannot cache pre-commit data
+    transaction.on_commit(lambda: bump_version('jobs'), using=using)
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_job_fragments(sender, instance, raw=False, using=None, **kwargs):
+    if raw:
+        return
+    # delete() clears instance.pk before the callback runs
+    job_id = instance.pk
+    transaction.on_commit(lambda: invalidate_fragments(job_id), using=using)
+
+
+@receiver(post_save, sender=Application)
+def increment_application_count(sender, instance, created, raw=False, using=None, **kwargs):
+    if raw or not created:
+        return
+    Job.objects.using(using).filter(pk=instance.job_id).update(
+        applications_count=F('applications_count') + 1
+    )
+
+
+@receiver(post_delete, sender=Application)
+def decrement_application_count(sender, instance, using=None, **kwargs):
+    Job.objects.using(using).filter(pk=instance.job_id, applications_count__gt=0).update(
+        applications_count=F('applications_count') - 1
+    )
+
+
+@receiver(post_save, sender=Job)
+def update_job_rollups(sender, instance, created, raw=False, using=None, **kwargs):
+    if raw:
+        return
+    rollups.job_saved(instance, created, using=using)
+
+
+@receiver(post_delete, sender=Job)
+def remove_job_from_rollups(sender, instance, using=None, **kwargs):
+    rollups.job_deleted(instance, using=using)
+
+
+@receiver(post_save, sender=Application)
+def add_application_to_rollups(sender, instance, created, raw=False, using=None, **kwargs):
+    if raw or not created:
+        return
+    rollups.application_changed(instance, 1, using=using)
+
+
+@receiver(post_delete, sender=Application)
+def remove_application_from_rollups(sender, instance, using=None, **kwargs):
+    rollups.application_changed(instance, -1, using=using)
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Job)
+def invalidate_employer_dashboard(sender, instance, raw=False, using=None, **kwargs):
+    if raw:
+        return
+    transaction.on_commit(lambda: invalidate_dashboard(instance.posted_by_id), using=using)
+
+
+@receiver(post_save, sender=Application)
+@receiver(post_delete, sender=Application)
+def invalidate_application_dashboards(sender, instance, raw=False, using=None, **kwargs):
+    if raw:
+        return
+    if Application.job.is_cached(instance):
+        employer_id = instance.job.posted_by_id
+    else:
+        employer_id = (
+            Job.objects.using(using).filter(pk=instance.job_id)
+            .values_list('posted_by_id', flat=True).first()
+        )
+    transaction.on_commit(
+        lambda: invalidate_dashboard(instance.applicant_id, employer_id), using=using
+    )
+
+
+# Also reached by deletes that cascade from a user or an archived job
+@receiver(post_delete, sender=Application)
+@receiver(post_delete, sender=ArchivedApplication)
+def release_resume_blob(sender, instance, using=None, **kwargs):
+    if instance.resume_blob_id:
+        ResumeBlob.objects.db_manager(using).release(instance.resume_blob_id)
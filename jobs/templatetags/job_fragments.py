@@ -0,0 +1,42 @@
+from django import template
+
+from ..fragments import FRAGMENTS, get_or_render
+
+register = template.Library()
+
+
+class JobFragmentNode(template.Node):
+    def __init__(self, nodelist, name, job, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.job = job
+        self.vary_on = vary_on
+
+    def render(self, context):
+        job = self.job.resolve(context)
+        vary_on = [value.resolve(context) for value in self.vary_on]
+        return get_or_render(self.name, job, vary_on, lambda: self.nodelist.render(context))
+
+
+@register.tag('jobfragment')
+def do_jobfragment(parser, token):
+    """
+    Cache the enclosed template fragment for one job::
+
+        {% jobfragment card job job.applications_count %} ... {% endjobfragment %}
+
+    The fragment is re-rendered when the job's ``updated_at`` or any of the
+    extra vary-on values change. Nothing user-specific belongs inside.
+    """
+    nodelist = parser.parse(('endjobfragment',))
+    parser.delete_first_token()
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' takes a fragment name and a job.")
+    name = bits[1]
+    if name not in FRAGMENTS:
+        raise template.TemplateSyntaxError(f"Unknown job fragment {name!r}.")
+    return JobFragmentNode(
+        nodelist, name, parser.compile_filter(bits[2]),
+        [parser.compile_filter(bit) for bit in bits[3:]],
+    )
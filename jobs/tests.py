@@ -1,13 +1,63 @@
 # jobs/tests.py - Unit Tests
 
-from django.test import TestCase, Client
+from django.test import TestCase, TransactionTestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.core import mail
+from django.db import connection, connections, models, transaction
+from django.utils import timezone
 from django.contrib.auth.models import User
-from django.urls import reverse
-from .models import Job, Application, UserProfile
+from django.urls import resolve, reverse
+from django.core.cache import cache
+from django.core.management import call_command
+from job_portal.database import database_config, parse_database_url
+from .models import (
+    Job, Application, UserProfile, SearchIndexEntry, JobTypeDailyStat, OutboundEmail, ResumeBlob,
+    ArchivedJob, ArchivedApplication,
+)
+from .api_views import IsEmployerOrReadOnly
+from .apps import warn_if_cache_not_shared
+from .fragments import fragment_key
+from . import metrics, recommendations, rollups, views
+from .metrics import fragment_cache_stats
+from .serializers import COMPACT_DESCRIPTION_LENGTH, DEFAULT_COMPACT_FIELDS, JobSerializer
+from .benchmarks import generate_dataset, load_test_asgi, load_test_paths, load_test_wsgi, page_views, percentile
+from .concurrency import gather_queries
+from .facets import InvalidFilter, facet_counts, filter_jobs
+from .salary import Salary, parse_salary
+from .geo import covering_cells, encode_geohash, geocode, nearest_jobs
+from .lifecycle import archive_jobs, expire_jobs
+from .routers import PIN_COOKIE, ReplicaRouter, copy_sqlite_database, read_from_replicas
 from .forms import JobForm, ApplicationForm, UserRegistrationForm
+from .cache import aget_or_refresh, bump_version, get_home_stats, get_or_refresh
+from .notifications import CLAIM_LEASE, MAX_ATTEMPTS, claim_due, deliver_queued, enqueue_email
+from .pagination import KeysetPaginator
+from .resumes import MAX_RESUME_SIZE, HashingUploadHandler
+from .search import search_jobs
+from asgiref.sync import async_to_sync, iscoroutinefunction, sync_to_async
+from contextlib import contextmanager
+import datetime
+import hashlib
+import json
+import os
+from io import StringIO
+from unittest import mock
 import tempfile
+import threading
+import unittest
 from django.core.files.uploadedfile import SimpleUploadedFile
 
+class QueryBudgetMixin:
+    @contextmanager
+    def assertQueryBudget(self, budget):
+        """Fail if the block issues more than ``budget`` queries"""
+        with CaptureQueriesContext(connection) as context:
+            yield context
+        executed = len(context.captured_queries)
+        if executed > budget:
+            queries = '\n'.join(query['sql'] for query in context.captured_queries)
+            self.fail(f'{executed} queries exceed the budget of {budget}:\n{queries}')
+
+
 class ModelTests(TestCase):
     def setUp(self):
         self.user = User.objects.create_user(
@@ -246,6 +296,1791 @@ class APITests(TestCase):
         data = response.json()
         self.assertIn('total_jobs', data)
         self.assertIn('total_applications', data)
+        
+    @override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+    def test_analytics_rollups(self):
+        """Test analytics reads incrementally maintained rollups"""
+        candidate = User.objects.create_user(username='candidate', password='pass123')
+        Application.objects.create(
+            job=self.job,
+            applicant=candidate,
+            resume=SimpleUploadedFile('resume.pdf', b'%PDF'),
+            message='Hi'
+        )
+        self.job.job_type = 'CT'
+        self.job.save()
+        Job.objects.create(
+            title='Closed Job',
+            description='Closed',
+            company_name='TestCo',
+            location='Test City',
+            is_active=False,
+            posted_by=self.user
+        )
+        with self.assertNumQueries(3):
+            data = self.client.get('/api/jobs/analytics/').json()
+        self.assertEqual(data['total_jobs'], 1)
+        self.assertEqual(data['total_applications'], 1)
+        self.assertEqual(data['job_types'], [
+            {'job_type': 'CT', 'count': 1},
+            {'job_type': 'FT', 'count': 1},
+        ])
+        self.assertEqual(data['top_jobs'][0]['application_count'], 1)
+        
+        rows = list(JobTypeDailyStat.objects.values_list('job_type', 'jobs', 'active_jobs'))
+        JobTypeDailyStat.objects.all().delete()
+        call_command('backfill_rollups', stdout=StringIO())
+        self.assertEqual(
+            sorted(JobTypeDailyStat.objects.values_list('job_type', 'jobs', 'active_jobs')),
+            sorted(rows)
+        )
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.employer = User.objects.create_user(
+            username='employer',
+            email='employer@example.com',
+            password='pass123'
+        )
+        UserProfile.objects.create(user=self.employer, is_employer=True)
+        self.python_job = Job.objects.create(
+            title='Senior Python Developer',
+            description='Build Django services',
+            company_name='Snake Works',
+            location='Pune',
+            posted_by=self.employer
+        )
+        self.java_job = Job.objects.create(
+            title='Java Engineer',
+            description='Python scripting is a plus',
+            company_name='Bean Corp',
+            location='Mumbai',
+            posted_by=self.employer
+        )
+        
+    def test_index_updated_on_save(self):
+        """Test saving a job refreshes its index entries"""
+        self.python_job.title = 'Senior Golang Developer'
+        self.python_job.save()
+        terms = set(SearchIndexEntry.objects.filter(
+            job=self.python_job
+        ).values_list('term', flat=True))
+        self.assertIn('golang', terms)
+        self.assertNotIn('python', terms)
+        
+    def test_prefix_match_and_ranking(self):
+        """Test prefix terms match and title hits rank first"""
+        results = list(search_jobs(Job.objects.all(), 'pyth'))
+        self.assertEqual(results, [self.python_job, self.java_job])
+        
+    def test_all_terms_required(self):
+        """Test every query term must match"""
+        results = list(search_jobs(Job.objects.all(), 'python mumbai'))
+        self.assertEqual(results, [self.java_job])
+        
+    def test_job_list_search(self):
+        """Test job list view uses the search index"""
+        response = self.client.get(reverse('job_list'), {'search': 'snake'})
+        self.assertContains(response, 'Senior Python Developer')
+        self.assertNotContains(response, 'Java Engineer')
+        
+    def test_api_search(self):
+        """Test API list supports the search parameter"""
+        response = self.client.get('/api/jobs/', {'search': 'bean'})
+        titles = [job['title'] for job in response.json()['results']]
+        self.assertEqual(titles, ['Java Engineer'])
+        
+    def test_rebuild_command(self):
+        """Test rebuild_search_index restores a wiped index"""
+        SearchIndexEntry.objects.all().delete()
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertTrue(SearchIndexEntry.objects.filter(term='java').exists())
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ApplicationCounterTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user(username='employer', password='pass123')
+        self.job = Job.objects.create(
+            title='Counter Job',
+            description='Description',
+            company_name='Company',
+            location='Location',
+            posted_by=self.employer
+        )
+        self.candidates = [
+            User.objects.create_user(username=f'candidate{i}', password='pass123')
+            for i in range(3)
+        ]
+        
+    def make_application(self, candidate):
+        return Application(
+            job=self.job,
+            applicant=candidate,
+            resume=SimpleUploadedFile('resume.pdf', b'%PDF', content_type='application/pdf'),
+            message='Hello'
+        )
+        
+    def test_counter_tracks_create_and_delete(self):
+        """Test the stored counter follows single creates and deletes"""
+        application = self.make_application(self.candidates[0])
+        application.save()
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.application_count(), 1)
+        application.delete()
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.application_count(), 0)
+        
+    def test_counter_tracks_bulk_operations(self):
+        """Test bulk_create and queryset delete keep the counter in sync"""
+        Application.objects.bulk_create([self.make_application(c) for c in self.candidates])
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.applications_count, 3)
+        Application.objects.filter(applicant__in=self.candidates[:2]).delete()
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.applications_count, 1)
+        
+    def test_saving_a_stale_job_keeps_concurrent_increments(self):
+        """Test a full save of a job loaded before an application does not reset its counter"""
+        stale = Job.objects.get(pk=self.job.pk)
+        self.make_application(self.candidates[0]).save()
+        stale.title = 'Edited Title'
+        stale.save()
+        stale.save(update_fields=['applications_count'])
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.title, self.job.applications_count), ('Edited Title', 1))
+        
+    def test_reconcile_command(self):
+        """Test reconcile_application_counts repairs drifted counters"""
+        self.make_application(self.candidates[0]).save()
+        Job.objects.filter(pk=self.job.pk).update(applications_count=42)
+        call_command('reconcile_application_counts', batch_size=1, stdout=StringIO())
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.applications_count, 1)
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employer = User.objects.create_user(username='employer', password='pass123')
+        self.jobs = [
+            Job.objects.create(
+                title=f'Paginated Job {i}',
+                description='Description',
+                company_name='Company',
+                location='Location',
+                posted_by=self.employer
+            )
+            for i in range(12)
+        ]
+        # Newest first, ties on created_at broken by id
+        self.expected = sorted(self.jobs, key=lambda job: (job.created_at, job.id), reverse=True)
+        
+    def test_forward_and_backward(self):
+        """Test cursors walk forward and back over the same pages"""
+        paginator = KeysetPaginator(Job.objects.all(), 5)
+        first = paginator.page()
+        self.assertFalse(first.has_previous())
+        second = paginator.page(first.next_cursor)
+        third = paginator.page(second.next_cursor)
+        self.assertFalse(third.has_next())
+        self.assertEqual(list(first) + list(second) + list(third), self.expected)
+        back = paginator.page(third.previous_cursor)
+        self.assertEqual(list(back), list(second))
+        self.assertEqual(list(paginator.page(back.previous_cursor)), list(first))
+        self.assertEqual(paginator.count, 12)
+        
+    def test_job_list_cursor(self):
+        """Test job list view paginates with cursors and rejects bad ones"""
+        response = self.client.get(reverse('job_list'))
+        next_cursor = response.context['page_obj'].next_cursor
+        response = self.client.get(reverse('job_list'), {'cursor': next_cursor})
+        self.assertEqual(list(response.context['page_obj']), self.expected[9:])
+        self.assertEqual(self.client.get(reverse('job_list'), {'cursor': 'garbage'}).status_code, 404)
+        with page_views(async_views=True):
+            self.assertEqual(self.client.get(reverse('job_list'), {'cursor': 'garbage'}).status_code, 404)
+        
+    def test_api_cursor(self):
+        """Test API list follows next links without offsets"""
+        data = self.client.get('/api/jobs/', {'page_size': 5}).json()
+        self.assertEqual(data['count'], 12)
+        ids = [job['id'] for job in data['results']]
+        while data['next']:
+            data = self.client.get(data['next']).json()
+            ids.extend(job['id'] for job in data['results'])
+        self.assertEqual(ids, [job.id for job in self.expected])
+        self.assertEqual(self.client.get('/api/jobs/', {'cursor': 'garbage'}).status_code, 404)
+        for size in ('0', '-3'):
+            data = self.client.get('/api/jobs/', {'page_size': size}).json()
+            self.assertEqual(len(data['results']), 10)
+        data = self.client.get('/api/jobs/', {'page_size': '0', 'fields': 'id'}).json()
+        self.assertEqual(len(data['results']), 10)
+
+
+class ExplainQueriesTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user(username='employer', password='pass123')
+        UserProfile.objects.create(user=self.employer, is_employer=True)
+        Job.objects.create(
+            title='Indexed Job',
+            description='Description',
+            company_name='Company',
+            location='Location',
+            posted_by=self.employer
+        )
+        
+    def test_views_are_explained(self):
+        """Test explain_queries walks the views and reports plans"""
+        out = StringIO()
+        call_command('explain_queries', user=['employer'], verbose_plans=True, stdout=out)
+        output = out.getvalue()
+        self.assertIn('[anonymous] job_list', output)
+        self.assertIn('[employer] dashboard', output)
+        self.assertIn('job_active_recent_idx', output)
+
+
+class HomeCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employer = User.objects.create_user(username='employer', password='pass123')
+        
+    def create_job(self, company='Company'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Job.objects.create(
+                title='Cached Job',
+                description='Description',
+                company_name=company,
+                location='Location',
+                posted_by=self.employer
+            )
+        
+    def test_home_served_from_cache(self):
+        """Test repeated home hits skip the aggregate queries"""
+        self.create_job()
+        self.client.get(reverse('home'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('home'))
+        self.assertEqual(response.context['total_jobs'], 1)
+        
+    def test_job_save_bumps_version(self):
+        """Test creating a job invalidates the cached aggregates"""
+        self.create_job()
+        self.assertEqual(get_home_stats()['total_companies'], 1)
+        self.create_job(company='Other Company')
+        self.assertEqual(get_home_stats()['total_companies'], 2)
+        
+    def test_stale_value_served_while_refreshing(self):
+        """Test only the lock holder recomputes an expired entry"""
+        get_or_refresh('test:key', lambda: 'old', 60, namespace='test')
+        bump_version('test')
+        cache.add('test:key:lock', 1)
+        self.assertEqual(get_or_refresh('test:key', lambda: 'new', 60, namespace='test'), 'old')
+        cache.delete('test:key:lock')
+        self.assertEqual(get_or_refresh('test:key', lambda: 'new', 60, namespace='test'), 'new')
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class DashboardTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employer = User.objects.create_user(username='employer', password='pass123')
+        UserProfile.objects.create(user=self.employer, is_employer=True)
+        self.candidate = User.objects.create_user(username='candidate', password='pass123')
+        UserProfile.objects.create(user=self.candidate, is_candidate=True)
+        self.jobs = [
+            Job.objects.create(
+                title=f'Dashboard Job {i}',
+                description='Description',
+                company_name='Company',
+                location='Location',
+                is_active=(i != 0),
+                posted_by=self.employer
+            )
+            for i in range(3)
+        ]
+        
+    def apply(self, job, status='P'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Application.objects.create(
+                job=job,
+                applicant=self.candidate,
+                resume=SimpleUploadedFile('resume.pdf', b'%PDF'),
+                message='Hi',
+                status=status
+            )
+        
+    def test_employer_dashboard(self):
+        """Test employer counters come from one aggregate query"""
+        self.apply(self.jobs[1])
+        self.client.login(username='employer', password='pass123')
+        with self.assertQueryBudget(6):
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.context['total_jobs'], 3)
+        self.assertEqual(response.context['active_jobs'], 2)
+        self.assertEqual(response.context['total_applications'], 1)
+        self.assertEqual(response.context['top_jobs'][0], self.jobs[1])
+        
+    def test_candidate_dashboard_cached_and_invalidated(self):
+        """Test candidate dashboard is cached until the candidate applies"""
+        self.apply(self.jobs[1], status='A')
+        self.client.login(username='candidate', password='pass123')
+        self.client.get(reverse('dashboard'))
+        with self.assertQueryBudget(3):
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.context['accepted'], 1)
+        self.apply(self.jobs[2])
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.context['total_applications'], 2)
+        self.assertEqual(response.context['pending'], 1)
+        self.assertContains(response, 'Dashboard Job 2')
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class QueryCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employer = User.objects.create_user(username='employer', password='pass123')
+        UserProfile.objects.create(user=self.employer, is_employer=True)
+        self.candidates = []
+        self.jobs = []
+        
+    def add_rows(self, count):
+        for _ in range(count):
+            i = len(self.jobs)
+            job = Job.objects.create(
+                title=f'Query Job {i}',
+                description='Description',
+                company_name=f'Company {i}',
+                location='Location',
+                posted_by=self.employer
+            )
+            candidate = User.objects.create_user(username=f'candidate{i}', password='pass123')
+            UserProfile.objects.create(user=candidate, is_candidate=True)
+            self.jobs.append(job)
+            self.candidates.append(candidate)
+            # Every candidate applies to the first job; the first candidate to every job
+            for target, applicant in {(job, candidate), (self.jobs[0], candidate), (job, self.candidates[0])}:
+                Application.objects.create(
+                    job=target,
+                    applicant=applicant,
+                    resume=SimpleUploadedFile('resume.pdf', b'%PDF'),
+                    message='Hi'
+                )
+        
+    def count_queries(self, username, url):
+        self.client.logout()
+        if username:
+            self.client.force_login(User.objects.get(username=username))
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+        
+    def assertConstantQueries(self, username, url):
+        self.add_rows(1)
+        few = self.count_queries(username, url)
+        self.add_rows(4)
+        cache.clear()
+        self.assertEqual(self.count_queries(username, url), few)
+        
+    def test_my_applications(self):
+        """Test my_applications does not query per application"""
+        self.assertConstantQueries('candidate0', reverse('my_applications'))
+        
+    def test_job_applications(self):
+        """Test job_applications does not query per applicant"""
+        self.add_rows(1)
+        self.assertConstantQueries('employer', reverse('job_applications', args=[self.jobs[0].pk]))
+        
+    def test_job_list(self):
+        """Test job_list does not query per job card"""
+        self.assertConstantQueries(None, reverse('job_list'))
+        
+    def test_api_lists(self):
+        """Test API job and application lists do not query per row"""
+        self.assertConstantQueries(None, '/api/jobs/')
+        self.assertConstantQueries('employer', '/api/applications/')
+
+
+@override_settings(
+    MEDIA_ROOT=tempfile.mkdtemp(),
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class NotificationQueueTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user(
+            username='employer', email='employer@example.com', password='pass123'
+        )
+        UserProfile.objects.create(user=self.employer, is_employer=True)
+        self.candidate = User.objects.create_user(username='candidate', password='pass123')
+        UserProfile.objects.create(user=self.candidate, is_candidate=True)
+        self.job = Job.objects.create(
+            title='Queued Job',
+            description='Description',
+            company_name='Company',
+            location='Location',
+            posted_by=self.employer
+        )
+        
+    def test_apply_enqueues_instead_of_sending(self):
+        """Test applying queues the notification without sending it"""
+        self.client.login(username='candidate', password='pass123')
+        response = self.client.post(reverse('apply_job', args=[self.job.pk]), {
+            'message': 'Hire me',
+            'resume': SimpleUploadedFile('resume.pdf', b'%PDF', content_type='application/pdf'),
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(mail.outbox), 0)
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.recipients, ['employer@example.com'])
+        
+        call_command('send_queued_emails', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, 'New Application for Queued Job')
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'S')
+        
+    def test_rolled_back_application_sends_nothing(self):
+        """Test the queued message rolls back with the application"""
+        try:
+            with transaction.atomic():
+                enqueue_email('Subject', 'Body', ['someone@example.com'])
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertFalse(OutboundEmail.objects.exists())
+        
+    def test_failed_delivery_is_retried_with_backoff(self):
+        """Test failures are rescheduled and finally marked failed"""
+        email = enqueue_email('Subject', 'Body', ['someone@example.com'])
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError('SMTP down')):
+            self.assertEqual(deliver_queued(), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'Q')
+        self.assertEqual(email.attempts, 1)
+        self.assertGreater(email.next_attempt_at, timezone.now())
+        self.assertIn('SMTP down', email.last_error)
+        
+        OutboundEmail.objects.filter(pk=email.pk).update(
+            attempts=MAX_ATTEMPTS - 1, next_attempt_at=timezone.now()
+        )
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError('SMTP down')):
+            deliver_queued()
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'F')
+        
+    def test_claimed_messages_are_sent_outside_transactions(self):
+        """Test claims stop double sends and no transaction spans the SMTP send"""
+        email = enqueue_email('Subject', 'Body', ['someone@example.com'])
+        depth = len(connection.atomic_blocks)
+        depths = []
+        
+        def send(message):
+            depths.append(len(connection.atomic_blocks))
+            # Another worker polling mid-send finds nothing due
+            self.assertEqual(claim_due(), [])
+            return 1
+        
+        with mock.patch('django.core.mail.EmailMessage.send', autospec=True, side_effect=send):
+            self.assertEqual(deliver_queued(), (1, 0))
+        self.assertEqual(depths, [depth])
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts, email.claim_token), ('S', 1, None))
+        
+    def test_lapsed_claim_is_taken_over(self):
+        """Test a dead worker's messages are sent after the lease and its outcome is dropped"""
+        email = enqueue_email('Subject', 'Body', ['someone@example.com'])
+        [stale] = claim_due()
+        later = timezone.now() + CLAIM_LEASE + datetime.timedelta(seconds=1)
+        [claimed] = claim_due(now=later)
+        self.assertNotEqual(claimed.claim_token, stale.claim_token)
+        self.assertEqual(claimed.attempts, 2)
+        # The first worker's late result no longer touches the row
+        self.assertFalse(OutboundEmail.objects.filter(claim_token=stale.claim_token).exists())
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'P')
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ResumeStorageTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user(username='employer', password='pass123')
+        self.candidate = User.objects.create_user(username='candidate', password='pass123')
+        UserProfile.objects.create(user=self.candidate, is_candidate=True)
+        self.jobs = [
+            Job.objects.create(
+                title=f'Resume Job {i}',
+                description='Description',
+                company_name='Company',
+                location='Location',
+                posted_by=self.employer
+            )
+            for i in range(2)
+        ]
+        self.client.login(username='candidate', password='pass123')
+        
+    def apply(self, job, content, name='resume.pdf'):
+        return self.client.post(reverse('apply_job', args=[job.pk]), {
+            'message': 'Hire me',
+            'resume': SimpleUploadedFile(name, content, content_type='application/pdf'),
+        })
+        
+    def test_identical_uploads_share_one_blob(self):
+        """Test the same resume uploaded twice is stored once"""
+        self.apply(self.jobs[0], b'%PDF same content')
+        self.apply(self.jobs[1], b'%PDF same content', name='renamed.pdf')
+        blob = ResumeBlob.objects.get()
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(blob.sha256, hashlib.sha256(b'%PDF same content').hexdigest())
+        names = set(Application.objects.values_list('resume', flat=True))
+        self.assertEqual(names, {blob.file.name})
+        
+    def test_blob_released_with_last_reference(self):
+        """Test deleting every application removes the blob and its file"""
+        self.apply(self.jobs[0], b'%PDF shared')
+        self.apply(self.jobs[1], b'%PDF shared')
+        blob = ResumeBlob.objects.get()
+        storage, name = blob.file.storage, blob.file.name
+        Application.objects.first().delete()
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Application.objects.first().delete()
+        self.assertFalse(ResumeBlob.objects.exists())
+        self.assertFalse(storage.exists(name))
+        
+    def test_release_keeps_a_blob_referenced_meanwhile(self):
+        """Test a reference taken between the refcount drop and the delete keeps the blob"""
+        # Created directly: the test client closes the upload before the
+        # captured commit callbacks would write it
+        with self.captureOnCommitCallbacks(execute=True):
+            Application.objects.create(
+                job=self.jobs[0], applicant=self.candidate, message='Hire me',
+                resume=SimpleUploadedFile('resume.pdf', b'%PDF raced'),
+            )
+        blob = ResumeBlob.objects.get()
+        first = models.QuerySet.first
+        
+        def first_then_acquire(queryset):
+            name = first(queryset)
+            ResumeBlob.objects.filter(pk=blob.pk).update(ref_count=models.F('ref_count') + 1)
+            return name
+        
+        with self.captureOnCommitCallbacks() as callbacks:
+            with mock.patch.object(models.QuerySet, 'first', first_then_acquire):
+                ResumeBlob.objects.release(blob.pk)
+        self.assertEqual(callbacks, [])
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 1)
+        self.assertTrue(blob.file.storage.exists(blob.file.name))
+        
+    def test_deleting_a_user_releases_live_and_archived_references(self):
+        """Test applications removed by cascade, live or archived, release their blob"""
+        with self.captureOnCommitCallbacks(execute=True):
+            for job in self.jobs:
+                Application.objects.create(
+                    job=job, applicant=self.candidate, message='Hire me',
+                    resume=SimpleUploadedFile('resume.pdf', b'%PDF cascaded'),
+                )
+        blob = ResumeBlob.objects.get()
+        Job.objects.filter(pk=self.jobs[0].pk).update(
+            is_active=False, updated_at=timezone.now() - datetime.timedelta(days=365)
+        )
+        self.assertEqual(archive_jobs(before=timezone.now()), (1, 1))
+        self.assertEqual(ResumeBlob.objects.get().ref_count, 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.candidate.delete()
+        self.assertFalse(ResumeBlob.objects.exists())
+        self.assertFalse(blob.file.storage.exists(blob.file.name))
+        
+    def test_reconcile_resume_blobs(self):
+        """Test the reconcile command fixes drifted counts and deletes unreferenced blobs"""
+        with self.captureOnCommitCallbacks(execute=True):
+            Application.objects.create(
+                job=self.jobs[0], applicant=self.candidate, message='Hire me',
+                resume=SimpleUploadedFile('resume.pdf', b'%PDF referenced'),
+            )
+            orphan = ResumeBlob.objects.store(SimpleUploadedFile('orphan.pdf', b'%PDF orphaned'))
+        ResumeBlob.objects.update(ref_count=5)
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('reconcile_resume_blobs', batch_size=1, stdout=out)
+        self.assertIn('corrected 1 counts, deleted 1 unreferenced blobs', out.getvalue())
+        self.assertEqual(ResumeBlob.objects.get().ref_count, 1)
+        self.assertFalse(orphan.file.storage.exists(orphan.file.name))
+        
+    def test_rolled_back_upload_leaves_no_file(self):
+        """Test a new blob's file is written only when its transaction commits"""
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                application = Application.objects.create(
+                    job=self.jobs[0], applicant=self.candidate, message='Hire me',
+                    resume=SimpleUploadedFile('resume.pdf', b'%PDF rolled back'),
+                )
+                transaction.set_rollback(True)
+        self.assertFalse(ResumeBlob.objects.exists())
+        self.assertFalse(application.resume.storage.exists(application.resume.name))
+        
+    def test_oversized_upload_rejected(self):
+        """Test uploads over the limit are rejected without being stored"""
+        with mock.patch.object(HashingUploadHandler, 'file_complete') as complete:
+            response = self.apply(self.jobs[0], b'%' * (MAX_RESUME_SIZE + 1))
+        complete.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Resume file size must be under 5MB.')
+        self.assertFalse(ResumeBlob.objects.exists())
+        
+        response = self.client.post('/api/applications/', {
+            'message': 'Hire me',
+            'resume': SimpleUploadedFile('resume.pdf', b'%' * (MAX_RESUME_SIZE + 1)),
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['resume'], ['Resume file size must be under 5MB.'])
+
+
+
+class BulkImportExportTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user(username='employer', password='pass123')
+        UserProfile.objects.create(user=self.employer, is_employer=True)
+        self.other = User.objects.create_user(username='other', password='pass123')
+        self.existing = Job.objects.create(
+            title='Old Title',
+            description='Description',
+            company_name='Company',
+            location='Location',
+            external_id='ext-1',
+            posted_by=self.employer
+        )
+        Job.objects.create(
+            title='Foreign Job',
+            description='Description',
+            company_name='Other',
+            location='Location',
+            external_id='ext-foreign',
+            posted_by=self.other
+        )
+        self.client.login(username='employer', password='pass123')
+        
+    def row(self, external_id, **fields):
+        return json.dumps({
+            'external_id': external_id,
+            'title': 'Imported Engineer',
+            'description': 'Imported description',
+            'company_name': 'Company',
+            'location': 'Remote',
+            **fields,
+        })
+        
+    def test_jsonl_import_upserts_and_reports_errors(self):
+        """Test JSONL import creates, updates and reports bad rows"""
+        body = '\n'.join([
+            self.row('ext-1', title='New Title', job_type='CT'),
+            self.row('ext-2'),
+            '{not json',
+            self.row('ext-3', job_type='XX'),
+            self.row('ext-foreign'),
+        ])
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/api/jobs/import/', body, content_type='application/x-ndjson'
+            )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data['created'], data['updated']), (1, 1))
+        self.assertEqual(sorted(error['row'] for error in data['errors']), [3, 4, 5])
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.title, self.existing.job_type), ('New Title', 'CT'))
+        created = Job.objects.get(external_id='ext-2')
+        self.assertEqual(created.posted_by, self.employer)
+        self.assertIn(created, search_jobs(Job.objects.all(), 'imported'))
+        self.assertEqual(
+            dict(JobTypeDailyStat.objects.values_list('job_type', 'jobs')),
+            {'FT': 2, 'CT': 1}
+        )
+        
+    def test_csv_upload_import(self):
+        """Test a multipart CSV upload is imported"""
+        content = (
+            'external_id,title,description,company_name,location,job_type\n'
+            'csv-1,CSV Job,From a spreadsheet,Company,Remote,PT\n'
+        ).encode()
+        response = self.client.post('/api/jobs/import/', {
+            'file': SimpleUploadedFile('jobs.csv', content, content_type='text/csv'),
+        })
+        self.assertEqual(response.json()['created'], 1)
+        self.assertEqual(Job.objects.get(external_id='csv-1').job_type, 'PT')
+        
+    def test_import_requires_employer(self):
+        """Test anonymous users cannot import"""
+        self.client.logout()
+        response = self.client.post(
+            '/api/jobs/import/', self.row('ext-9'), content_type='application/x-ndjson'
+        )
+        self.assertEqual(response.status_code, 403)
+        
+    def test_export_streams_active_jobs(self):
+        """Test export streams one line per active job"""
+        response = self.client.get('/api/jobs/export/?output=jsonl')
+        self.assertTrue(response.streaming)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([row['external_id'] for row in rows], ['ext-1', 'ext-foreign'])
+        
+        response = self.client.get('/api/jobs/export/?output=csv')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertTrue(lines[0].startswith('id,external_id,title'))
+        self.assertEqual(len(lines), 3)
+        
+    def test_export_requires_employer_or_staff(self):
+        """Test anonymous users and candidates cannot export"""
+        self.client.logout()
+        self.assertEqual(self.client.get('/api/jobs/export/').status_code, 403)
+        candidate = User.objects.create_user(username='candidate', password='pass123')
+        UserProfile.objects.create(user=candidate, is_candidate=True)
+        self.client.force_login(candidate)
+        self.assertEqual(self.client.get('/api/jobs/export/').status_code, 403)
+        candidate.is_staff = True
+        candidate.save()
+        self.assertEqual(self.client.get('/api/jobs/export/').status_code, 200)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class BulkStatusTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user(username='employer', password='pass123')
+        UserProfile.objects.create(user=self.employer, is_employer=True)
+        self.job = Job.objects.create(
+            title='Triage Job',
+            description='Description',
+            company_name='Company',
+            location='Location',
+            posted_by=self.employer
+        )
+        self.applications = [
+            Application.objects.create(
+                job=self.job,
+                applicant=User.objects.create_user(username=f'candidate{i}', email=f'c{i}@example.com'),
+                resume=SimpleUploadedFile('resume.pdf', b'%PDF'),
+                message='Hi'
+            )
+            for i in range(3)
+        ]
+        self.client.login(username='employer', password='pass123')
+        
+    def test_bulk_status_form(self):
+        """Test the HTML form updates every selected application"""
+        ids = [application.pk for application in self.applications[:2]]
+        response = self.client.post(
+            reverse('bulk_update_application_status', args=[self.job.pk]),
+            {'application_ids': ids, 'status': 'A'}
+        )
+        self.assertRedirects(response, reverse('job_applications', args=[self.job.pk]))
+        self.assertEqual(
+            list(Application.objects.order_by('pk').values_list('status', flat=True)),
+            ['A', 'A', 'P']
+        )
+        self.assertEqual(OutboundEmail.objects.filter(subject__startswith='Your application').count(), 2)
+        
+    def test_bulk_status_api_query_budget(self):
+        """Test the API checks ownership and updates in constant queries"""
+        ids = [application.pk for application in self.applications]
+        # session and user, ownership SELECT, UPDATE, outbox INSERT and the savepoint pair
+        with self.assertQueryBudget(7):
+            response = self.client.post(
+                '/api/applications/bulk-status/',
+                {'application_ids': ids, 'status': 'D'},
+                content_type='application/json'
+            )
+        self.assertEqual(response.json(), {'updated': 3})
+        self.assertFalse(Application.objects.exclude(status='D').exists())
+        
+    def test_bulk_status_rejects_foreign_applications(self):
+        """Test nothing changes when any application belongs to someone else"""
+        other = User.objects.create_user(username='other', password='pass123')
+        UserProfile.objects.create(user=other, is_employer=True)
+        self.client.login(username='other', password='pass123')
+        response = self.client.post(
+            '/api/applications/bulk-status/',
+            {'application_ids': [self.applications[0].pk], 'status': 'A'},
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Application.objects.filter(status='A').exists())
+
+
+class FragmentCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset_all()
+        self.employer = User.objects.create_user(username='employer', password='pass123')
+        self.job = Job.objects.create(
+            title='Cached Job',
+            description='Original description',
+            company_name='Company',
+            location='Location',
+            posted_by=self.employer
+        )
+        
+    def test_cards_are_reused_until_the_job_changes(self):
+        """Test job cards are served from cache and re-rendered after an edit"""
+        self.client.get(reverse('job_list'))
+        self.client.get(reverse('job_list'))
+        self.assertEqual(fragment_cache_stats()['hits'], 1)
+        
+        self.job.description = 'Edited description'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.save()
+        response = self.client.get(reverse('job_list'))
+        self.assertContains(response, 'Edited description')
+        self.assertEqual(fragment_cache_stats()['misses'], 2)
+        
+    def test_detail_keeps_per_user_parts_fresh(self):
+        """Test the cached description does not freeze the apply button"""
+        candidate = User.objects.create_user(username='candidate', password='pass123')
+        UserProfile.objects.create(user=candidate, is_candidate=True)
+        self.client.get(reverse('job_detail', args=[self.job.pk]))
+        self.client.login(username='candidate', password='pass123')
+        response = self.client.get(reverse('job_detail', args=[self.job.pk]))
+        self.assertContains(response, 'Original description')
+        self.assertContains(response, 'Apply Now')
+        self.assertEqual(fragment_cache_stats()['hits'], 1)
+        
+    def test_delete_drops_fragments(self):
+        """Test deleting a job removes its cached fragments"""
+        self.client.get(reverse('job_detail', args=[self.job.pk]))
+        key = fragment_key('description', self.job.pk)
+        self.assertIsNotNone(cache.get(key))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.job.delete()
+        self.assertIsNone(cache.get(key))
+
+
+class ConditionalRequestTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employer = User.objects.create_user(username='employer', password='pass123')
+        self.job = Job.objects.create(
+            title='Conditional Job',
+            description='Description',
+            company_name='Company',
+            location='Location',
+            posted_by=self.employer
+        )
+        
+    def test_detail_not_modified(self):
+        """Test job detail answers 304 from one query and changes after an edit"""
+        url = reverse('job_detail', args=[self.job.pk])
+        response = self.client.get(url)
+        self.assertIn('Last-Modified', response)
+        etag = response['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        
+        self.job.title = 'Renamed Job'
+        self.job.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        
+    def test_list_etag_tracks_the_filtered_set(self):
+        """Test the job list ETag changes when a job leaves the set"""
+        url = reverse('job_list')
+        etag = self.client.get(url)['ETag']
+        # The validators come from the cache until a job changes
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get(url + '?job_type=PT', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            Job.objects.filter(pk=self.job.pk).delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        
+    def test_html_etag_varies_per_user(self):
+        """Test a logged-in user never gets an anonymous copy confirmed"""
+        url = reverse('job_detail', args=[self.job.pk])
+        etag = self.client.get(url)['ETag']
+        self.client.login(username='employer', password='pass123')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Last-Modified', response)
+        
+    def test_api_not_modified(self):
+        """Test API list and detail answer 304 without serializing"""
+        for url in ['/api/jobs/', f'/api/jobs/{self.job.pk}/']:
+            response = self.client.get(url)
+            self.assertIn('Last-Modified', response)
+            with mock.patch.object(JobSerializer, 'to_representation') as serialize:
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(response.status_code, 304)
+            serialize.assert_not_called()
+        self.assertEqual(self.client.get('/api/jobs/abc/').status_code, 404)
+
+
+class CompactJobListTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employer = User.objects.create_user(username='employer', password='pass123')
+        self.jobs = [
+            Job.objects.create(
+                title=f'Compact Job {i}',
+                description='Long description ' * 50,
+                company_name='Company',
+                location='Location',
+                posted_by=self.employer
+            )
+            for i in range(3)
+        ]
+        
+    def test_compact_rows_select_fields(self):
+        """Test ?fields= returns plain rows with only the requested fields"""
+        # validators, the page and the (cached) count
+        with self.assertNumQueries(3):
+            data = self.client.get('/api/jobs/?fields=id,title,description,posted_by').json()
+        row = data['results'][0]
+        self.assertEqual(set(row), {'id', 'title', 'description', 'posted_by'})
+        self.assertEqual(row['id'], self.jobs[-1].pk)
+        self.assertEqual(row['posted_by'], self.employer.pk)
+        self.assertEqual(len(row['description']), COMPACT_DESCRIPTION_LENGTH)
+        
+    def test_compact_rows_paginate_and_search(self):
+        """Test compact rows follow cursors and search ordering"""
+        first = self.client.get('/api/jobs/?fields=title&page_size=2').json()
+        second = self.client.get(first['next']).json()
+        titles = [row['title'] for row in first['results'] + second['results']]
+        self.assertEqual(titles, ['Compact Job 2', 'Compact Job 1', 'Compact Job 0'])
+        data = self.client.get('/api/jobs/?fields=&search=compact').json()
+        self.assertEqual(set(data['results'][0]), set(DEFAULT_COMPACT_FIELDS))
+        
+    def test_unknown_field_rejected(self):
+        """Test unknown compact fields are a 400"""
+        response = self.client.get('/api/jobs/?fields=title,password')
+        self.assertEqual(response.status_code, 400)
+        
+    def test_benchmark_command(self):
+        """Test the list benchmark runs and leaves no rows behind"""
+        out = StringIO()
+        call_command('benchmark_job_list', rows=[5], repeat=1, stdout=out)
+        self.assertIn('speedup', out.getvalue())
+        self.assertEqual(Job.objects.count(), 3)
+
+
+class BenchmarkHarnessTests(TestCase):
+    def test_generated_data_is_consistent_and_skewed(self):
+        """Test generated data keeps counters, rollups and the index in step"""
+        counts = generate_dataset(jobs=60, applications=300, seed=1, batch_size=50)
+        self.assertEqual(Job.objects.count(), counts['jobs'])
+        self.assertEqual(Application.objects.count(), counts['applications'])
+        self.assertEqual(
+            Job.objects.aggregate(total=models.Sum('applications_count'))['total'],
+            counts['applications']
+        )
+        self.assertEqual(
+            JobTypeDailyStat.objects.aggregate(total=models.Sum('jobs'))['total'], 60
+        )
+        self.assertTrue(SearchIndexEntry.objects.exists())
+        top_location = Job.objects.values('location').annotate(n=models.Count('id')).order_by('-n')[0]
+        self.assertEqual(top_location['location'], 'Remote')
+
+    def test_generated_data_commits_per_batch(self):
+        """Test every job batch is written in its own transaction"""
+        with CaptureQueriesContext(connection) as queries:
+            generate_dataset(jobs=60, applications=0, seed=1, batch_size=20)
+        job_batches = [
+            i for i, query in enumerate(queries.captured_queries)
+            if query['sql'].startswith('INSERT INTO "jobs_job"')
+        ]
+        self.assertEqual(len(job_batches), 3)
+        for i in job_batches:
+            self.assertTrue(queries.captured_queries[i - 1]['sql'].startswith('SAVEPOINT'))
+
+    def test_run_benchmarks_writes_json(self):
+        """Test the runner reports percentiles for every view"""
+        generate_dataset(jobs=5, applications=10, seed=1)
+        path = os.path.join(tempfile.mkdtemp(), 'report.json')
+        call_command('run_benchmarks', repeat=2, warmup=0, output=path, stdout=StringIO())
+        with open(path) as handle:
+            report = json.load(handle)
+        views = {row['view'] for row in report['results']}
+        self.assertTrue({'home', 'job_list', 'api-job-list'} <= views)
+        row = report['results'][0]
+        self.assertLessEqual(row['p50_ms'], row['p99_ms'])
+        self.assertIn('peak_memory_kib', row)
+        self.assertEqual(report['environment']['jobs'], 5)
+        self.assertEqual(percentile([5, 1, 3, 2, 4], 50), 3)
+
+
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset_all()
+        self.employer = User.objects.create_user(username='employer', password='pass123')
+        Job.objects.create(
+            title='Metered Job',
+            description='Description',
+            company_name='Company',
+            location='Location',
+            posted_by=self.employer
+        )
+        
+    def test_requests_recorded_per_view(self):
+        """Test latency, queries, cache and template time are recorded per URL name"""
+        self.client.get(reverse('job_list'))
+        self.client.get(reverse('home'))
+        self.client.get(reverse('home'))
+        values = metrics.snapshot()
+        labels = {'view': 'home', 'method': 'GET'}
+        self.assertEqual(values[metrics.series('jobs_http_requests_total', status=200, **labels)], 2)
+        self.assertEqual(values[metrics.series('jobs_http_request_duration_seconds_count', **labels)], 2)
+        self.assertEqual(values[metrics.series('jobs_view_cache_hits_total', **labels)], 1)
+        self.assertGreater(values[metrics.series('jobs_db_queries_total', view='job_list', method='GET')], 0)
+        self.assertGreater(values[metrics.series('jobs_template_render_seconds_total', **labels)], 0)
+        
+    def test_series_index_survives_lost_entries(self):
+        """Test a series whose index entry is lost is indexed again on the next flush"""
+        metrics.incr('jobs_test_total')
+        self.assertEqual(metrics.snapshot()['jobs_test_total'], 1)
+        # As if another process had reset the index, or its keys were evicted
+        cache.delete_many([metrics.INDEX_KEY, f'{metrics.INDEX_KEY}:1', metrics.INDEXED_PREFIX + 'jobs_test_total'])
+        metrics.incr('jobs_test_total')
+        self.assertEqual(metrics.snapshot()['jobs_test_total'], 2)
+        
+    def test_flush_runs_off_the_request_thread(self):
+        """Test a full buffer wakes the flusher thread instead of writing inline"""
+        with mock.patch.object(metrics, 'flush') as flush, mock.patch.object(metrics, '_wake_flusher') as wake:
+            for _ in range(metrics.FLUSH_EVERY):
+                metrics.incr('jobs_test_total')
+        wake.assert_called_once()
+        flush.assert_not_called()
+        metrics.flush()
+        self.assertEqual(metrics.get_counts('jobs_test_total')['jobs_test_total'], metrics.FLUSH_EVERY)
+        
+    def test_prometheus_endpoint(self):
+        """Test /metrics/ renders cumulative histograms and needs authorization"""
+        self.client.get(reverse('home'))
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 403)
+        with self.settings(METRICS_TOKEN='secret'):
+            response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('# TYPE jobs_http_request_duration_seconds histogram', body)
+        self.assertIn('jobs_http_request_duration_seconds_bucket{le="+Inf",method="GET",view="home"} 1', body)
+        self.assertNotIn('query_shape', body)
+        
+    def test_slowest_queries_normalizes_literals(self):
+        """Test query shapes strip literals so repeated lookups share one shape"""
+        self.assertEqual(
+            metrics.normalize_sql("SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'x' LIMIT 21"),
+            'SELECT * FROM t WHERE id IN (...) AND name = ? LIMIT ?'
+        )
+        job = Job.objects.get()
+        self.client.get(reverse('job_detail', args=[job.pk]))
+        self.client.get(reverse('job_detail', args=[job.pk]))
+        out = StringIO()
+        call_command('slowest_queries', order='calls', stdout=out)
+        self.assertIn('FROM "jobs_job"', out.getvalue())
+        self.assertIn('2 calls', out.getvalue())
+        
+    def test_startup_warns_when_metrics_use_local_cache(self):
+        """Test a scraped /metrics/ without a shared cache logs a warning"""
+        with self.assertLogs('jobs.apps', 'WARNING') as logs, override_settings(METRICS_TOKEN='secret'):
+            warn_if_cache_not_shared()
+        self.assertIn('REDIS_URL', logs.output[0])
+        redis = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}
+        with self.assertNoLogs('jobs.apps'), override_settings(METRICS_TOKEN='secret', CACHES=redis):
+            warn_if_cache_not_shared()
+        with self.assertNoLogs('jobs.apps'):
+            warn_if_cache_not_shared()
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employer = User.objects.create_user(username='employer', password='pass123')
+        self.job = Job.objects.create(
+            title='Async Job',
+            description='Description',
+            company_name='Company',
+            location='Location',
+            posted_by=self.employer
+        )
+        
+    def test_async_pages_match_sync_pages(self):
+        """Test the async page views serve what the sync ones do when enabled"""
+        UserProfile.objects.create(user=self.employer, is_employer=True)
+        self.client.login(username='employer', password='pass123')
+        urls = ['/', '/jobs/', f'/jobs/{self.job.pk}/', '/dashboard/']
+        self.assertIs(resolve('/jobs/').func, views.job_list)
+        sync_responses = [self.client.get(url) for url in urls]
+        with page_views(async_views=True):
+            self.assertIs(resolve('/jobs/').func, views.ajob_list)
+            for url, expected in zip(urls, sync_responses):
+                response = self.client.get(url)
+                self.assertContains(response, 'Async Job')
+                self.assertEqual(response.get('ETag'), expected.get('ETag'))
+        self.assertIs(resolve('/jobs/').func, views.job_list)
+        
+    def test_api_is_served_by_drf(self):
+        """Test job API reads go through DRF's permission and throttle checks"""
+        with mock.patch.object(IsEmployerOrReadOnly, 'has_permission', return_value=False) as check:
+            response = self.client.get('/api/jobs/')
+        self.assertEqual(response.status_code, 403)
+        check.assert_called_once()
+        
+    def test_async_api_reads_match_sync_reads(self):
+        """Test the async job API actions answer as the sync ones do"""
+        self.job.location = 'Delhi'
+        self.job.save()
+        urls = [
+            '/api/jobs/', '/api/jobs/?fields=id,title&facets=1', f'/api/jobs/{self.job.pk}/',
+            '/api/jobs/analytics/', '/api/jobs/nearby/?near=Mumbai', '/api/jobs/nearby/?near=Atlantis',
+            '/api/jobs/?cursor=bogus', '/api/jobs/0/', '/api/jobs/abc/',
+        ]
+        sync_responses = [self.client.get(url) for url in urls]
+        with page_views(async_views=True):
+            self.assertTrue(iscoroutinefunction(resolve('/api/jobs/').func))
+            for url, expected in zip(urls, sync_responses):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, expected.status_code, url)
+                self.assertEqual(response.json(), expected.json(), url)
+                self.assertEqual(response.get('ETag'), expected.get('ETag'), url)
+            etag = self.client.get('/api/jobs/')['ETag']
+            self.assertEqual(self.client.get('/api/jobs/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+            self.assertContains(self.client.get('/api/jobs/', HTTP_ACCEPT='text/html'), 'Async Job')
+            with mock.patch.object(IsEmployerOrReadOnly, 'has_permission', return_value=False) as check:
+                self.assertEqual(self.client.get(f'/api/jobs/{self.job.pk}/').status_code, 403)
+            check.assert_called_once()
+            # Writes on the same routes still go through the sync dispatch
+            self.assertEqual(self.client.post('/api/jobs/', {'title': 'New'}).status_code, 403)
+        
+    def test_gather_queries_inside_transaction(self):
+        """Test gather_queries runs on the request's connection inside a transaction"""
+        results = async_to_sync(gather_queries)(
+            Job.objects.count, lambda: Job.objects.get().title,
+        )
+        self.assertEqual(results, [1, 'Async Job'])
+
+
+class ASGILoadTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        employer = User.objects.create_user(username='employer', password='pass123')
+        Job.objects.create(
+            title='Loaded Job',
+            description='Description',
+            company_name='Company',
+            location='Location',
+            posted_by=employer
+        )
+        
+    def test_gather_queries_runs_concurrently(self):
+        """Test independent queries run on their own threads when connections are reused"""
+        threads = set()
+        
+        def count():
+            threads.add(threading.get_ident())
+            return Job.objects.count()
+        
+        self.assertEqual(async_to_sync(gather_queries)(count, count), [1, 1])
+        self.assertEqual(threads, {threading.get_ident()})
+        threads.clear()
+        with mock.patch.dict(connection.settings_dict, {'CONN_MAX_AGE': 60}):
+            self.assertEqual(async_to_sync(gather_queries)(count, count), [1, 1])
+        self.assertNotIn(threading.get_ident(), threads)
+        
+    def test_wsgi_and_asgi_load_tests(self):
+        """Test both handlers serve every read-heavy endpoint under load"""
+        paths = load_test_paths()
+        self.assertEqual(len(paths), 5)
+        for load_test, async_views in ((load_test_wsgi, False), (load_test_asgi, True)):
+            with page_views(async_views):
+                result = load_test(paths, 10, 4)
+            self.assertEqual(result['requests'], 10)
+            self.assertEqual(result['errors'], 0)
+            self.assertGreater(result['requests_per_second'], 0)
+
+
+class DatabaseSettingsTests(TestCase):
+    def test_database_url_parsing(self):
+        """Test DATABASE_URL selects the backend and enables the pool for PostgreSQL"""
+        config = database_config({'DATABASE_URL': 'postgres://jobs:p%40ss@db:5432/portal?sslmode=require'}, 'unused')
+        self.assertEqual(config['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual((config['USER'], config['PASSWORD'], config['HOST'], config['PORT']), ('jobs', 'p@ss', 'db', '5432'))
+        self.assertEqual(config['OPTIONS']['sslmode'], 'require')
+        self.assertEqual(config['OPTIONS']['pool']['max_size'], 20)
+        self.assertEqual(config['CONN_MAX_AGE'], 0)
+        
+        config = database_config({'DATABASE_URL': 'postgres://db/portal', 'DB_POOL': '0', 'DB_CONN_MAX_AGE': '60'}, 'unused')
+        self.assertNotIn('pool', config['OPTIONS'])
+        self.assertEqual(config['CONN_MAX_AGE'], 60)
+        self.assertTrue(config['CONN_HEALTH_CHECKS'])
+        self.assertEqual(parse_database_url('sqlite:////var/jobs.sqlite3')['NAME'], '/var/jobs.sqlite3')
+        with self.assertRaises(ValueError):
+            parse_database_url('oracle://db/portal')
+        
+    def test_sqlite_pragmas_applied_on_connect(self):
+        """Test SQLite connections get the configured journal mode and a busy timeout"""
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite only')
+        wal = 'journal_mode=WAL' in connection.settings_dict['OPTIONS']['init_command']
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone()[0] == 'wal', wal)
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertGreater(cursor.fetchone()[0], 0)
+        
+    def test_checked_in_sqlite_file_stays_out_of_wal(self):
+        """Test WAL is on for configured SQLite files and opt-in for the bundled one"""
+        def journal(env):
+            return 'journal_mode=WAL' in database_config(env, 'db.sqlite3')['OPTIONS']['init_command']
+        
+        self.assertFalse(journal({}))
+        self.assertTrue(journal({'DB_SQLITE_WAL': '1'}))
+        self.assertTrue(journal({'DATABASE_URL': 'sqlite:////var/jobs.sqlite3'}))
+        self.assertFalse(journal({'DATABASE_URL': 'sqlite:////var/jobs.sqlite3', 'DB_SQLITE_WAL': '0'}))
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ConcurrentApplicationTests(TransactionTestCase):
+    CANDIDATES = 16
+    
+    def setUp(self):
+        employer = User.objects.create_user(username='employer', password='pass123')
+        self.job = Job.objects.create(
+            title='Popular Job',
+            description='Description',
+            company_name='Company',
+            location='Location',
+            posted_by=employer
+        )
+        self.candidates = []
+        for i in range(self.CANDIDATES):
+            candidate = User.objects.create_user(username=f'candidate{i}', password='pass123')
+            UserProfile.objects.create(user=candidate, is_candidate=True)
+            self.candidates.append(candidate)
+        
+    def test_simultaneous_applications(self):
+        """Test concurrent apply_job submissions all commit without lock errors"""
+        barrier = threading.Barrier(self.CANDIDATES)
+        statuses, errors = [], []
+        
+        def apply(candidate):
+            client = Client()
+            try:
+                client.force_login(candidate)
+                barrier.wait(timeout=30)
+                response = client.post(reverse('apply_job', args=[self.job.pk]), {
+                    'message': 'Hire me',
+                    'resume': SimpleUploadedFile('resume.pdf', b'%PDF same resume', content_type='application/pdf'),
+                })
+                statuses.append(response.status_code)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connections.close_all()
+        
+        threads = [threading.Thread(target=apply, args=(candidate,)) for candidate in self.candidates]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(errors, [])
+        self.assertEqual(statuses, [302] * self.CANDIDATES)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.applications_count, self.CANDIDATES)
+        self.assertEqual(Application.objects.count(), self.CANDIDATES)
+        blob = ResumeBlob.objects.get()
+        self.assertEqual(blob.ref_count, self.CANDIDATES)
+        self.assertTrue(blob.file.storage.exists(blob.file.name))
+
+
+class ReplicaRouterTests(TestCase):
+    @override_settings(DATABASE_REPLICAS=['replica_1'])
+    def test_routing_decisions(self):
+        """Test only scoped reads of this app's tables go to a replica"""
+        router = ReplicaRouter()
+        self.assertEqual(router.db_for_read(Job), 'default')
+        with read_from_replicas():
+            # TestCase holds a transaction open on the primary
+            self.assertEqual(router.db_for_read(Job), 'default')
+            with mock.patch.object(connection, 'in_atomic_block', False):
+                self.assertEqual(router.db_for_read(Job), 'replica_1')
+                self.assertEqual(router.db_for_read(User), 'default')
+            self.assertEqual(router.db_for_write(Job), 'default')
+        self.assertFalse(router.allow_migrate('replica_1', 'jobs'))
+        self.assertTrue(router.allow_migrate('default', 'jobs'))
+
+    @override_settings(DATABASE_REPLICAS=['replica_1'])
+    def test_cached_values_are_computed_on_the_primary(self):
+        """Test get_or_refresh computes from the primary inside replica reads"""
+        cache.clear()
+        router = ReplicaRouter()
+        with read_from_replicas(), mock.patch.object(connection, 'in_atomic_block', False):
+            self.assertEqual(get_or_refresh('test:alias', lambda: router.db_for_read(Job), 60), 'default')
+            self.assertEqual(router.db_for_read(Job), 'replica_1')
+
+            async def acompute():
+                return await sync_to_async(router.db_for_read)(Job)
+
+            self.assertEqual(async_to_sync(aget_or_refresh)('test:aalias', acompute, 60), 'default')
+
+
+class SQLiteReplicaTests(TransactionTestCase):
+    """A second SQLite file, copied from the primary, stands in for a lagging replica."""
+    
+    @classmethod
+    def setUpClass(cls):
+        if connection.vendor != 'sqlite' or connection.is_in_memory_db():
+            raise unittest.SkipTest('Needs a file-backed SQLite test database')
+        super().setUpClass()
+        # Registered after the test runner set up its databases, which would
+        # otherwise create and migrate a test database for the alias
+        cls.replica_path = os.path.join(tempfile.mkdtemp(), 'replica.sqlite3')
+        connections.settings['replica_1'] = {**connection.settings_dict, 'NAME': cls.replica_path}
+        cls.databases = cls.databases | {'replica_1'}
+        
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica_1'].close()
+        del connections['replica_1']
+        del connections.settings['replica_1']
+        
+    def setUp(self):
+        cache.clear()
+        self.employer = User.objects.create_user(username='employer', password='pass123')
+        UserProfile.objects.create(user=self.employer, is_employer=True)
+        self.job = Job.objects.create(
+            title='Replicated Title',
+            description='Description',
+            company_name='Company',
+            location='Location',
+            posted_by=self.employer
+        )
+        connections['replica_1'].close()
+        copy_sqlite_database(connection.settings_dict['NAME'], self.replica_path)
+        # The primary moves on; the replica has not caught up
+        Job.objects.filter(pk=self.job.pk).update(title='Primary Title')
+        
+    @override_settings(DATABASE_REPLICAS=['replica_1'])
+    def test_reads_pinned_to_primary_after_write(self):
+        """Test listing reads come from the replica until the client writes"""
+        url = reverse('job_detail', args=[self.job.pk])
+        self.assertContains(self.client.get(url), 'Replicated Title')
+        self.assertContains(self.client.get('/api/jobs/'), 'Replicated Title')
+        
+        # Logging in writes the session and last_login, which replicas do not serve
+        response = self.client.post(reverse('login'), {'username': 'employer', 'password': 'pass123'})
+        self.assertEqual(response.status_code, 302)
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+        self.assertContains(self.client.get(url), 'Replicated Title')
+        
+        response = self.client.post(reverse('job_update', args=[self.job.pk]), {
+            'title': 'Edited Title',
+            'description': 'Description',
+            'company_name': 'Company',
+            'location': 'Location',
+            'job_type': 'FT',
+            'is_active': True,
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertContains(self.client.get(url), 'Edited Title')
+        self.assertContains(Client().get(url), 'Replicated Title')
+
+@unittest.skipUnless(recommendations.available(), 'NumPy and SciPy are not installed')
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class RecommendationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        recommendations.reset_matrix()
+        self.employer = User.objects.create_user(username='employer', password='pass123')
+        self.candidate = User.objects.create_user(username='candidate', password='pass123')
+        UserProfile.objects.create(
+            user=self.candidate, is_candidate=True,
+            bio='Backend developer writing Python and Django services.',
+        )
+        self.python_job = self.create_job('Python Backend Developer', 'Build Django services in Python.')
+        self.django_job = self.create_job('Django Engineer', 'Maintain our Python API.')
+        self.nurse_job = self.create_job('Registered Nurse', 'Care for patients on the ward.')
+        self.inactive_job = self.create_job('Python Developer', 'Python and Django.', is_active=False)
+        
+    def tearDown(self):
+        recommendations.reset_matrix()
+        
+    def create_job(self, title, description, location='Berlin', **kwargs):
+        return Job.objects.create(
+            title=title, description=description, company_name='Company',
+            location=location, posted_by=self.employer, **kwargs
+        )
+        
+    def test_ranks_active_jobs_by_similarity(self):
+        """Test matching active jobs rank first and unrelated ones are left out"""
+        jobs = recommendations.recommend_jobs(self.candidate)
+        self.assertEqual(jobs, [self.python_job, self.django_job])
+        self.assertGreater(jobs[0].match_score, jobs[1].match_score)
+        
+    def test_application_history_shapes_results(self):
+        """Test applied jobs are excluded and steer the profile towards similar ones"""
+        nurse = User.objects.create_user(username='nurse', password='pass123')
+        UserProfile.objects.create(user=nurse, is_candidate=True)
+        self.assertEqual(recommendations.recommend_jobs(nurse), [])
+        Application.objects.create(
+            job=self.nurse_job, applicant=nurse,
+            resume=SimpleUploadedFile('resume.pdf', b'%PDF'), message='Hi',
+        )
+        ward_job = self.create_job('Ward Nurse', 'Care for patients at night.')
+        jobs = recommendations.recommend_jobs(nurse)
+        self.assertEqual(jobs[0], ward_job)
+        self.assertNotIn(self.nurse_job, jobs)
+        
+    def test_matrix_refreshes_incrementally(self):
+        """Test new, edited and deactivated jobs reach the matrix without a rebuild"""
+        matrix = recommendations.get_matrix()
+        new_job = self.create_job('Senior Python Developer', 'Django and Python.')
+        self.django_job.title = 'Accountant'
+        self.django_job.description = 'Bookkeeping.'
+        self.django_job.save()
+        self.python_job.is_active = False
+        self.python_job.save()
+        matrix.refreshed_at = 0
+        
+        self.assertEqual(recommendations.recommend_jobs(self.candidate), [new_job])
+        self.assertIs(recommendations.get_matrix(), matrix)
+        self.assertLessEqual({self.django_job.pk, new_job.pk}, set(matrix.delta.job_ids.tolist()))
+        
+    def test_stale_matrix_is_served_while_it_updates(self):
+        """Test outside transactions a due refresh runs on a worker thread"""
+        matrix = recommendations.get_matrix()
+        matrix.refreshed_at = 0
+        with mock.patch.object(connection, 'in_atomic_block', False), \
+                mock.patch.object(recommendations, '_update_in_background') as update:
+            self.assertIs(recommendations.get_matrix(), matrix)
+        update.assert_called_once_with(matrix)
+        
+    @override_settings(DATABASE_REPLICAS=['replica_1'])
+    def test_matrix_reads_the_primary(self):
+        """Test builds and refreshes read the primary even inside replica reads"""
+        # replica_1 has no connection settings, so reading it would raise
+        with read_from_replicas(), mock.patch.object(connection, 'in_atomic_block', False):
+            matrix = recommendations.get_matrix()
+            matrix.refreshed_at = 0
+            recommendations._update(matrix)
+        self.assertGreater(matrix.refreshed_at, 0)
+        
+    def test_dashboard_and_api(self):
+        """Test recommendations appear on the candidate dashboard and in the API"""
+        self.assertEqual(self.client.get('/api/jobs/recommended/').status_code, 403)
+        self.client.login(username='candidate', password='pass123')
+        self.assertContains(self.client.get(reverse('dashboard')), 'Jobs for You')
+        
+        response = self.client.get('/api/jobs/recommended/', {'limit': 1})
+        self.assertEqual(response.status_code, 200)
+        [result] = response.json()['results']
+        self.assertEqual(result['id'], self.python_job.pk)
+        self.assertGreater(result['match_score'], 0)
+        with mock.patch.object(recommendations, 'available', return_value=False):
+            self.assertEqual(self.client.get('/api/jobs/recommended/').status_code, 503)
+
+
+class FacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employer = User.objects.create_user(username='employer', password='pass123')
+        for title, location, company, job_type, salary in [
+            ('Python Developer', 'Pune', 'Snake Works', 'FT', '$60k - $80k'),
+            ('Python Intern', 'Pune', 'Snake Works', 'IN', ''),
+            ('Python Lead', 'Mumbai', 'Bean Corp', 'FT', '$60k - $80k'),
+            ('Java Engineer', 'Mumbai', 'Bean Corp', 'CT', ''),
+        ]:
+            Job.objects.create(
+                title=title, description='Description', company_name=company, location=location,
+                job_type=job_type, salary_range=salary, posted_by=self.employer
+            )
+        Job.objects.create(
+            title='Python Archivist', description='Description', company_name='Gone',
+            location='Delhi', posted_by=self.employer, is_active=False
+        )
+        
+    def counts(self, facets, name):
+        return {entry['value']: entry['count'] for entry in facets[name]}
+        
+    def test_counts_follow_search_and_filters(self):
+        """Test every facet is counted over the current result set in one query"""
+        jobs = search_jobs(Job.objects.active(), 'python')
+        with self.assertNumQueries(1):
+            facets = facet_counts(jobs)
+        self.assertEqual(self.counts(facets, 'job_type'), {'FT': 2, 'IN': 1})
+        self.assertEqual(self.counts(facets, 'location'), {'Pune': 2, 'Mumbai': 1})
+        self.assertEqual(self.counts(facets, 'company'), {'Snake Works': 2, 'Bean Corp': 1})
+        self.assertEqual(self.counts(facets, 'salary'), {'USD:50000': 2})
+        self.assertEqual(facets['salary'][0]['label'], 'USD 50,000 - 100,000')
+        self.assertEqual(facets['job_type'][0]['label'], 'Full Time')
+        
+        narrowed = filter_jobs(jobs, {'location': 'Pune', 'job_type': 'FT'})
+        self.assertEqual(self.counts(facet_counts(narrowed), 'company'), {'Snake Works': 1})
+        
+    def test_counts_cached_until_jobs_change(self):
+        """Test facet counts are cached and a job save invalidates them"""
+        facet_counts(Job.objects.active())
+        with self.assertNumQueries(0):
+            facet_counts(Job.objects.active())
+        with self.captureOnCommitCallbacks(execute=True):
+            Job.objects.create(
+                title='Nurse', description='Description', company_name='Clinic',
+                location='Delhi', posted_by=self.employer
+            )
+        self.assertEqual(self.counts(facet_counts(Job.objects.active()), 'location')['Delhi'], 1)
+        
+    def test_job_list_and_api(self):
+        """Test job_list renders facet counts and the API returns them on request"""
+        response = self.client.get(reverse('job_list'), {'search': 'python', 'location': 'Mumbai'})
+        self.assertEqual(len(response.context['page_obj']), 1)
+        self.assertContains(response, 'Bean Corp (1)')
+        self.assertContains(response, '<option value="Mumbai" selected>Mumbai (1)</option>', html=True)
+        
+        for params in [{'facets': 'true'}, {'facets': 'true', 'format': 'json'}]:
+            data = self.client.get('/api/jobs/', {**params, 'company': 'Snake Works'}).json()
+            self.assertEqual(len(data['results']), 2)
+            self.assertEqual(self.counts(data['facets'], 'job_type'), {'FT': 1, 'IN': 1})
+        self.assertNotIn('facets', self.client.get('/api/jobs/').json())
+
+
+class SalaryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employer = User.objects.create_user(username='employer', password='pass123')
+        self.jobs = {
+            salary: Job.objects.create(
+                title='Engineer', description='Description', company_name='Company',
+                location='Pune', salary_range=salary, posted_by=self.employer
+            )
+            for salary in ['₹8-12 LPA', '$40k - $60k', '$100k - $130k', 'Competitive']
+        }
+        
+    def test_parse_formats(self):
+        """Test common salary formats parse to annual bounds"""
+        self.assertEqual(parse_salary('₹8-12 LPA'), Salary(800000, 1200000, 'INR', 'Y'))
+        self.assertEqual(parse_salary('€50,000 - €70,000'), Salary(50000, 70000, 'EUR', 'Y'))
+        self.assertEqual(parse_salary('$30/hr'), Salary(62400, 62400, 'USD', 'H'))
+        self.assertEqual(parse_salary('4000-5000 EUR per month'), Salary(48000, 60000, 'EUR', 'M'))
+        self.assertEqual(parse_salary('1.2 Cr'), Salary(12000000, 12000000, 'INR', 'Y'))
+        self.assertEqual(parse_salary('Competitive'), Salary())
+        self.assertEqual(parse_salary('2 years experience'), Salary())
+        
+    def test_parsed_on_every_save(self):
+        """Test saving a job, even a partially loaded one, re-parses its salary"""
+        job = self.jobs['$40k - $60k']
+        self.assertEqual((job.salary_min, job.salary_max, job.salary_currency), (40000, 60000, 'USD'))
+        job = Job.objects.only('salary_range').get(pk=job.pk)
+        job.salary_range = '£45,000'
+        job.save()
+        job.refresh_from_db()
+        self.assertEqual((job.salary_min, job.salary_max, job.salary_currency), (45000, 45000, 'GBP'))
+        
+    def test_range_filter_and_sort(self):
+        """Test salary range filters overlap and sorting skips unparsed salaries"""
+        overlapping = filter_jobs(Job.objects.all(), {'salary_min': '50000', 'salary_max': '900000'})
+        self.assertEqual(set(overlapping), {self.jobs['$40k - $60k'], self.jobs['$100k - $130k']})
+        with self.assertRaises(InvalidFilter):
+            filter_jobs(Job.objects.all(), {'salary_min': 'lots'})
+        
+        response = self.client.get(reverse('job_list'), {'sort': '-salary', 'salary_max': '200000'})
+        self.assertEqual(
+            list(response.context['page_obj']),
+            [self.jobs['$100k - $130k'], self.jobs['$40k - $60k']],
+        )
+        for params in [{}, {'format': 'json'}]:
+            data = self.client.get('/api/jobs/', {**params, 'sort': 'salary', 'page_size': 1}).json()
+            self.assertEqual(data['results'][0]['salary_min'], 40000)
+            data = self.client.get(data['next']).json()
+            self.assertEqual(data['results'][0]['salary_min'], 100000)
+        self.assertEqual(self.client.get('/api/jobs/', {'salary_max': '-1'}).status_code, 400)
+        
+    def test_amounts_compare_within_one_currency(self):
+        """Test salary ranges and sorts only compare jobs paid in the chosen currency"""
+        rupees = filter_jobs(Job.objects.all(), {'salary_min': '50000', 'currency': 'inr'})
+        self.assertEqual(list(rupees), [self.jobs['₹8-12 LPA']])
+        # ₹12 LPA is the largest number, but not the highest dollar salary
+        data = self.client.get('/api/jobs/', {'sort': '-salary'}).json()
+        self.assertEqual([job['salary_min'] for job in data['results']], [100000, 40000])
+        data = self.client.get('/api/jobs/', {'sort': '-salary', 'currency': 'INR'}).json()
+        self.assertEqual([job['salary_min'] for job in data['results']], [800000])
+        # Without a salary range or sort the currency filters nothing
+        self.assertEqual(filter_jobs(Job.objects.all(), {'currency': 'EUR'}).count(), 4)
+        self.assertEqual(self.client.get('/api/jobs/', {'currency': 'XYZ'}).status_code, 400)
+        response = self.client.get(reverse('job_list'), {'sort': 'salary', 'currency': 'INR'})
+        self.assertEqual(list(response.context['page_obj']), [self.jobs['₹8-12 LPA']])
+        self.assertContains(response, '<option value="INR" selected>INR</option>', html=True)
+
+
+class GeoTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employer = User.objects.create_user(username='employer', password='pass123')
+        self.jobs = {
+            location: Job.objects.create(
+                title='Engineer', description='Description', company_name='Company',
+                location=location, posted_by=self.employer
+            )
+            for location in ['Mumbai, Maharashtra', 'Pune', 'Bengaluru', 'Remote']
+        }
+        
+    def test_geocode_offline(self):
+        """Test location strings resolve against the bundled gazetteer"""
+        self.assertEqual(geocode('Hybrid (London)').name, 'London')
+        self.assertEqual(geocode('New York, NY').name, 'New York')
+        self.assertEqual(geocode('São Paulo').name, 'Sao Paulo')
+        self.assertIsNone(geocode('Remote'))
+        self.assertEqual(encode_geohash(57.64911, 10.40744, 11), 'u4pruydqqvj')
+        cells = covering_cells(19.076, 72.8777, 50)
+        self.assertTrue(any(encode_geohash(19.2, 73.2).startswith(cell) for cell in cells))
+        
+    def test_geocoded_on_save(self):
+        """Test jobs store coordinates and a geohash, refreshed when the location changes"""
+        job = self.jobs['Pune']
+        self.assertEqual((job.latitude, job.longitude), (18.5204, 73.8567))
+        self.assertEqual(job.geohash, encode_geohash(18.5204, 73.8567))
+        self.assertIsNone(self.jobs['Remote'].latitude)
+        
+        job = Job.objects.only('location').get(pk=job.pk)
+        job.location = 'Remote'
+        job.save()
+        job.refresh_from_db()
+        self.assertEqual((job.latitude, job.geohash), (None, ''))
+        
+    def test_radius_filter_sorted_by_distance(self):
+        """Test ?near= keeps jobs within the radius, nearest first, across pages"""
+        response = self.client.get(reverse('job_list'), {'near': 'Mumbai', 'radius': '200'})
+        self.assertEqual(
+            list(response.context['page_obj']),
+            [self.jobs['Mumbai, Maharashtra'], self.jobs['Pune']],
+        )
+        self.assertContains(response, 'km away')
+        response = self.client.get(reverse('job_list'), {'near': 'Atlantis'})
+        self.assertEqual(response.context['filter_error'], 'Unknown location.')
+        
+        for params in [{}, {'format': 'json'}]:
+            data = self.client.get('/api/jobs/', {**params, 'near': '19.07,72.87', 'radius': '1000', 'page_size': 2}).json()
+            self.assertEqual(
+                [job['location'] for job in data['results']], ['Mumbai, Maharashtra', 'Pune'],
+            )
+            self.assertLess(data['results'][0]['distance_km'], 2)
+            data = self.client.get(data['next']).json()
+            self.assertEqual([job['location'] for job in data['results']], ['Bengaluru'])
+        self.assertEqual(self.client.get('/api/jobs/', {'near': 'Mumbai', 'radius': 'far'}).status_code, 400)
+        
+    def test_nearest_jobs(self):
+        """Test nearest-N widens its search until enough jobs are found"""
+        jobs = nearest_jobs(Job.objects.active(), 12.97, 77.59, 2)
+        self.assertEqual(jobs, [self.jobs['Bengaluru'], self.jobs['Pune']])
+        
+        data = self.client.get('/api/jobs/nearby/', {'near': 'Delhi', 'limit': 5}).json()
+        self.assertEqual(
+            [job['location'] for job in data['results']], ['Mumbai, Maharashtra', 'Pune', 'Bengaluru'],
+        )
+        self.assertEqual(self.client.get('/api/jobs/nearby/', {'near': 'Atlantis'}).status_code, 400)
+
+
+class LifecycleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.employer = User.objects.create_user(username='employer', password='pass123')
+        self.candidate = User.objects.create_user(username='candidate', password='pass123')
+        UserProfile.objects.create(user=self.candidate, is_candidate=True)
+        past = timezone.now() - datetime.timedelta(hours=1)
+        self.jobs = [
+            Job.objects.create(
+                title=f'Expiring Job {i}', description='Description', company_name='Company',
+                location='Pune', posted_by=self.employer,
+                expires_at=past if i < 3 else None,
+            )
+            for i in range(4)
+        ]
+        
+    def rollup_totals(self):
+        return JobTypeDailyStat.objects.aggregate(
+            jobs=models.Sum('jobs'), active=models.Sum('active_jobs'), applications=models.Sum('applications'),
+        )
+        
+    def test_default_expiry(self):
+        """Test new jobs expire after JOB_EXPIRY_DAYS unless given a date"""
+        job = self.jobs[3]
+        self.assertAlmostEqual(
+            job.expires_at, job.created_at + datetime.timedelta(days=60), delta=datetime.timedelta(seconds=5),
+        )
+        with override_settings(JOB_EXPIRY_DAYS=0):
+            job = Job.objects.create(
+                title='Evergreen Job', description='Description', company_name='Company',
+                location='Pune', posted_by=self.employer,
+            )
+        self.assertIsNone(job.expires_at)
+        form = JobForm(data={
+            'title': 'Backdated Job', 'description': 'Description', 'company_name': 'Company',
+            'location': 'Pune', 'job_type': 'FT', 'expires_at': '2020-01-01T00:00',
+        })
+        self.assertIn('expires_at', form.errors)
+        
+    def test_expire_jobs_in_batches(self):
+        """Test expired jobs are deactivated batch by batch, with rollups kept in step"""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(expire_jobs(batch_size=2), 3)
+        self.assertEqual(list(Job.objects.active()), [self.jobs[3]])
+        self.assertEqual(self.rollup_totals()['active'], 1)
+        self.assertEqual(expire_jobs(), 0)
+        response = self.client.get(reverse('job_list'))
+        self.assertEqual(list(response.context['page_obj']), [self.jobs[3]])
+        
+    def test_archive_moves_jobs_and_applications(self):
+        """Test archiving moves rows out of the hot tables and keeps blob references"""
+        with self.captureOnCommitCallbacks(execute=True):
+            for job in self.jobs[:2]:
+                Application.objects.create(
+                    job=job, applicant=self.candidate, message='Hire me',
+                    resume=SimpleUploadedFile('resume.pdf', b'%PDF archived'),
+                )
+        blob = ResumeBlob.objects.get()
+        self.assertEqual(blob.ref_count, 2)
+        expire_jobs()
+        totals = self.rollup_totals()
+        
+        # Only jobs inactive for long enough move
+        Job.objects.filter(pk=self.jobs[0].pk).update(updated_at=timezone.now() - datetime.timedelta(days=365))
+        out = StringIO()
+        call_command('expire_jobs', stdout=out)
+        self.assertIn('Archived 1 jobs and 1 applications.', out.getvalue())
+        self.assertEqual(archive_jobs(before=timezone.now() + datetime.timedelta(seconds=1), batch_size=1), (2, 1))
+        
+        archived_ids = [job.pk for job in self.jobs[:3]]
+        self.assertFalse(Job.objects.filter(pk__in=archived_ids).exists())
+        self.assertFalse(Application.objects.exists())
+        self.assertFalse(SearchIndexEntry.objects.filter(job_id__in=archived_ids).exists())
+        self.assertEqual(sorted(ArchivedJob.objects.values_list('pk', flat=True)), archived_ids)
+        application = ArchivedApplication.objects.get(job_id=self.jobs[0].pk)
+        self.assertEqual((application.applicant, application.resume.name), (self.candidate, blob.file.name))
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 2)
+        self.assertTrue(blob.file.storage.exists(blob.file.name))
+        
+        # Rollups keep counting archived history, also when rebuilt
+        self.assertEqual(self.rollup_totals(), totals)
+        rollups.rebuild()
+        self.assertEqual(self.rollup_totals(), totals)
+        
+    def test_archive_admin_is_read_only(self):
+        """Test archived rows can be browsed but not edited in the admin"""
+        Job.objects.filter(pk=self.jobs[0].pk).update(is_active=False, updated_at=timezone.now() - datetime.timedelta(days=365))
+        archive_jobs()
+        User.objects.create_superuser(username='admin', password='pass123')
+        self.client.login(username='admin', password='pass123')
+        response = self.client.get(reverse('admin:jobs_archivedjob_changelist'))
+        self.assertContains(response, 'Expiring Job 0')
+        response = self.client.get(reverse('admin:jobs_archivedjob_change', args=[self.jobs[0].pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'name="_save"')
+        self.assertEqual(self.client.get(reverse('admin:jobs_archivedjob_add')).status_code, 403)
 
 
 # Run tests with:
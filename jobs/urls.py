@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from . import views, api_views
@@ -6,17 +7,24 @@ router = DefaultRouter()
 router.register(r'jobs', api_views.JobViewSet, basename='api-job')
 router.register(r'applications', api_views.ApplicationViewSet, basename='api-application')
 
+# Async page views only pay off under an ASGI server; under WSGI each would
+# run through async_to_sync and its extra thread hops
+if settings.ASYNC_VIEWS:
+    home, job_list, job_detail, dashboard = views.ahome, views.ajob_list, views.AsyncJobDetailView, views.adashboard
+else:
+    home, job_list, job_detail, dashboard = views.home, views.job_list, views.JobDetailView, views.dashboard
+
 urlpatterns = [
     # Home
-    path('', views.home, name='home'),
+    path('', home, name='home'),
     
     # Authentication
     path('register/', views.register, name='register'),
     path('login/', views.CustomLoginView.as_view(), name='login'),
     
     # Jobs
-    path('jobs/', views.job_list, name='job_list'),
-    path('jobs/<int:pk>/', views.JobDetailView.as_view(), name='job_detail'),
+    path('jobs/', job_list, name='job_list'),
+    path('jobs/<int:pk>/', job_detail.as_view(), name='job_detail'),
     path('jobs/create/', views.job_create, name='job_create'),
     path('jobs/<int:pk>/update/', views.JobUpdateView.as_view(), name='job_update'),
     path('jobs/<int:pk>/delete/', views.JobDeleteView.as_view(), name='job_delete'),
@@ -27,11 +35,15 @@ urlpatterns = [
     path('my-applications/', views.my_applications, name='my_applications'),
     path('my-jobs/', views.my_jobs, name='my_jobs'),
     path('jobs/<int:job_id>/applications/', views.job_applications, name='job_applications'),
+    path('jobs/<int:job_id>/applications/bulk-status/', views.bulk_update_application_status, name='bulk_update_application_status'),
     path('jobs/<int:job_id>/applications/<int:application_id>/<str:action>/', views.update_application_status, name='update_application_status'),
     
     # Profile & Dashboard
     path('profile/', views.profile, name='profile'),
-    path('dashboard/', views.dashboard, name='dashboard'),
+    path('dashboard/', dashboard, name='dashboard'),
+    
+    # Metrics
+    path('metrics/', views.metrics, name='metrics'),
     
     # API
     path('api/', include(router.urls)),
@@ -1,28 +1,62 @@
-from django.shortcuts import render, redirect, get_object_or_404
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import login
 from django.contrib.auth.views import LoginView
-from django.views.generic import DetailView, UpdateView, DeleteView
+from django.views.generic import View, UpdateView, DeleteView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
 from django.contrib import messages
-from django.core.paginator import Paginator
-from django.db.models import Q, Count
-from django.core.mail import send_mail
-from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
 from .models import Job, Application, UserProfile
+from .serializers import MAX_STATUS_UPDATES
 from .forms import UserRegistrationForm, JobForm, ApplicationForm, ProfileForm
+from .bulk import update_application_statuses
+from .cache import aget_home_stats, get_home_stats
+from .metrics import render_prometheus
+from .conditional import (
+    adetail_validators, alist_validators, anot_modified, detail_validators, list_validators, not_modified,
+    page_validators, set_validators,
+)
+from .dashboard import (
+    aget_candidate_dashboard, aget_employer_dashboard, get_candidate_dashboard, get_employer_dashboard,
+)
+from .facets import (
+    DEFAULT_SALARY_CURRENCY, InvalidFilter, afacet_counts, facet_choices, facet_counts, filter_jobs, sort_jobs,
+)
+from .geo import DEFAULT_RADIUS_KM
+from .notifications import notify_new_application
+from .pagination import KeysetPaginator
+from .resumes import oversized_uploads
+from .salary import CURRENCIES
+from .routers import replica_reads
+from .search import search_jobs
 from django.views.decorators.http import require_POST
 
+# The read-heavy pages come in sync and async versions; jobs/urls.py serves
+# the async ones only when settings.ASYNC_VIEWS is on, as under ASGI. Their
+# templates read the session and lazy relations, so the async views render
+# (and check messages) in a worker thread
+arender = sync_to_async(render)
+
+async def arequest_user(request):
+    # request.auser() and request.user cache separately; share the loaded
+    # user so the template does not query it again
+    request.user = await request.auser()
+    return request.user
+
 # Home View
+@replica_reads
 def home(request):
-    recent_jobs = Job.objects.filter(is_active=True)[:6]
-    context = {
-        'recent_jobs': recent_jobs,
-        'total_jobs': Job.objects.filter(is_active=True).count(),
-        'total_companies': Job.objects.values('company_name').distinct().count(),
-    }
-    return render(request, 'jobs/home.html', context)
+    return render(request, 'jobs/home.html', get_home_stats())
+
+@replica_reads
+async def ahome(request):
+    return await arender(request, 'jobs/home.html', await aget_home_stats())
 
 # Registration View
 def register(request):
@@ -52,49 +86,116 @@ class CustomLoginView(LoginView):
     redirect_authenticated_user = True
 
 # Job List View (Function-Based)
-def job_list(request):
-    jobs = Job.objects.filter(is_active=True)
+def _job_list_queryset(request):
+    jobs = Job.objects.for_listing()
     
     # Search functionality
     search_query = request.GET.get('search', '')
     if search_query:
-        jobs = jobs.filter(
-            Q(title__icontains=search_query) |
-            Q(company_name__icontains=search_query) |
-            Q(location__icontains=search_query)
-        )
-    
-    # Filter by job type
-    job_type = request.GET.get('job_type', '')
-    if job_type:
-        jobs = jobs.filter(job_type=job_type)
-    
-    # Pagination
-    paginator = Paginator(jobs, 9)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+        jobs = search_jobs(jobs, search_query)
     
-    context = {
+    # Filter by the selected facet values, salary range and distance
+    filter_error = None
+    try:
+        jobs = filter_jobs(jobs, request.GET)
+    except InvalidFilter as exc:
+        filter_error = exc.message
+        jobs = jobs.none()
+    return sort_jobs(jobs, request.GET), search_query, filter_error
+
+def _job_list_context(request, page_obj, facets, search_query, filter_error):
+    filters = request.GET.copy()
+    filters.pop('cursor', None)
+    return {
         'page_obj': page_obj,
         'search_query': search_query,
-        'job_type': job_type,
+        'facets': facet_choices(facets, request.GET),
+        'filter_query': filters.urlencode(),
+        'filter_error': filter_error,
+        'salary_min': request.GET.get('salary_min', ''),
+        'salary_max': request.GET.get('salary_max', ''),
+        'currency': request.GET.get('currency', '').upper() or DEFAULT_SALARY_CURRENCY,
+        'currencies': CURRENCIES,
+        'sort': request.GET.get('sort', ''),
+        'near': request.GET.get('near', ''),
+        'radius': request.GET.get('radius', ''),
+        'default_radius': DEFAULT_RADIUS_KM,
     }
-    return render(request, 'jobs/job_list.html', context)
+
+@replica_reads
+def job_list(request):
+    jobs, search_query, filter_error = _job_list_queryset(request)
+    
+    # Conditional GET: one aggregate query decides whether to render at all
+    etag, last_modified = page_validators(
+        request.user, list_validators(jobs, request.GET.urlencode(), request.user.pk)
+    )
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return set_validators(response, etag, last_modified)
+    
+    # Keyset pagination
+    paginator = KeysetPaginator(jobs, 9)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
+    
+    context = _job_list_context(request, page_obj, facet_counts(jobs), search_query, filter_error)
+    return set_validators(render(request, 'jobs/job_list.html', context), etag, last_modified)
+
+@replica_reads
+async def ajob_list(request):
+    jobs, search_query, filter_error = _job_list_queryset(request)
+    
+    user = await arequest_user(request)
+    etag, last_modified = page_validators(
+        user, await alist_validators(jobs, request.GET.urlencode(), user.pk)
+    )
+    response = await anot_modified(request, etag, last_modified)
+    if response is not None:
+        return set_validators(response, etag, last_modified)
+    
+    paginator = KeysetPaginator(jobs, 9)
+    page_obj = await paginator.aget_page(request.GET.get('cursor'))
+    await paginator.acount()
+    
+    context = _job_list_context(request, page_obj, await afacet_counts(jobs), search_query, filter_error)
+    return set_validators(await arender(request, 'jobs/job_list.html', context), etag, last_modified)
 
 # Job Detail View (Class-Based)
-class JobDetailView(DetailView):
-    model = Job
+class JobDetailView(View):
     template_name = 'jobs/job_detail.html'
-    context_object_name = 'job'
     
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        if self.request.user.is_authenticated:
-            context['has_applied'] = Application.objects.filter(
-                job=self.object,
-                applicant=self.request.user
-            ).exists()
-        return context
+    def get_queryset(self):
+        return Job.objects.all()
+    
+    @replica_reads
+    def get(self, request, pk):
+        etag, last_modified = page_validators(
+            request.user, detail_validators(self.get_queryset(), pk, request.user.pk)
+        )
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            job = get_object_or_404(self.get_queryset(), pk=pk)
+            context = {'job': job, 'object': job, 'view': self}
+            if request.user.is_authenticated:
+                context['has_applied'] = Application.objects.filter(job=job, applicant=request.user).exists()
+            response = render(request, self.template_name, context)
+        return set_validators(response, etag, last_modified)
+
+class AsyncJobDetailView(JobDetailView):
+    @replica_reads
+    async def get(self, request, pk):
+        user = await arequest_user(request)
+        etag, last_modified = page_validators(
+            user, await adetail_validators(self.get_queryset(), pk, user.pk)
+        )
+        response = await anot_modified(request, etag, last_modified)
+        if response is None:
+            job = await aget_object_or_404(self.get_queryset(), pk=pk)
+            context = {'job': job, 'object': job, 'view': self}
+            if user.is_authenticated:
+                context['has_applied'] = await Application.objects.filter(job=job, applicant=user).aexists()
+            response = await arender(request, self.template_name, context)
+        return set_validators(response, etag, last_modified)
 
 # Create Job View (Function-Based)
 @login_required
@@ -152,7 +253,7 @@ class JobDeleteView(LoginRequiredMixin, DeleteView):
 # Apply for Job
 @login_required
 def apply_job(request, job_id):
-    job = get_object_or_404(Job, id=job_id, is_active=True)
+    job = get_object_or_404(Job.objects.select_related('posted_by'), id=job_id, is_active=True)
     
     if not hasattr(request.user, 'profile') or not request.user.profile.is_candidate:
         messages.error(request, 'Only candidates can apply for jobs.')
@@ -163,24 +264,16 @@ def apply_job(request, job_id):
         return redirect('job_detail', pk=job_id)
     
     if request.method == 'POST':
-        form = ApplicationForm(request.POST, request.FILES)
+        form = ApplicationForm(request.POST, request.FILES, oversized=oversized_uploads(request))
         if form.is_valid():
             application = form.save(commit=False)
             application.job = job
             application.applicant = request.user
-            application.save()
             
-            # Send email notification
-            try:
-                send_mail(
-                    subject=f'New Application for {job.title}',
-                    message=f'{request.user.username} has applied for {job.title}.',
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[job.posted_by.email],
-                    fail_silently=True,
-                )
-            except:
-                pass
+            # The notification is queued in the same transaction as the insert
+            with transaction.atomic():
+                application.save()
+                notify_new_application(application)
             
             messages.success(request, 'Application submitted successfully!')
             return redirect('application_success', pk=application.pk)
@@ -192,7 +285,7 @@ def apply_job(request, job_id):
 # Application Success
 @login_required
 def application_success(request, pk):
-    application = get_object_or_404(Application, pk=pk, applicant=request.user)
+    application = get_object_or_404(Application.objects.select_related('job'), pk=pk, applicant=request.user)
     return render(request, 'jobs/application_success.html', {'application': application})
 
 # My Jobs (for employers)
@@ -202,9 +295,7 @@ def my_jobs(request):
         messages.error(request, 'This page is only for employers.')
         return redirect('job_list')
     
-    jobs = Job.objects.filter(posted_by=request.user).annotate(
-        app_count=Count('applications')
-    )
+    jobs = Job.objects.filter(posted_by=request.user)
     return render(request, 'jobs/my_jobs.html', {'jobs': jobs})
 
 # My Applications (for candidates)
@@ -214,14 +305,14 @@ def my_applications(request):
         messages.error(request, 'This page is only for candidates.')
         return redirect('job_list')
     
-    applications = Application.objects.filter(applicant=request.user)
+    applications = Application.objects.for_candidate(request.user)
     return render(request, 'jobs/my_applications.html', {'applications': applications})
 
 # View Applications for a Job
 @login_required
 def job_applications(request, job_id):
     job = get_object_or_404(Job, id=job_id, posted_by=request.user)
-    applications = job.applications.all()
+    applications = Application.objects.for_employer_review(job)
     return render(request, 'jobs/job_applications.html', {
         'job': job,
         'applications': applications
@@ -248,6 +339,28 @@ def update_application_status(request, job_id, application_id, action):
     messages.success(request, f"Application marked as {'Accepted' if status_code=='A' else 'Reviewed' if status_code=='R' else 'Declined'}.")
     return redirect('job_applications', job_id=job.id)
 
+# Update many applications of one job at once (Employer only)
+@login_required
+@require_POST
+def bulk_update_application_status(request, job_id):
+    status_code = request.POST.get('status')
+    application_ids = {int(value) for value in request.POST.getlist('application_ids') if value.isdigit()}
+    if status_code not in dict(Application.STATUS_CHOICES) or not application_ids:
+        messages.error(request, 'Select at least one application and a status.')
+        return redirect('job_applications', job_id=job_id)
+    if len(application_ids) > MAX_STATUS_UPDATES:
+        messages.error(request, f'Select at most {MAX_STATUS_UPDATES} applications at a time.')
+        return redirect('job_applications', job_id=job_id)
+
+    try:
+        updated = update_application_statuses(request.user, application_ids, status_code, job_id=job_id)
+    except PermissionDenied:
+        messages.error(request, 'Some of the selected applications are not yours to update.')
+        return redirect('job_applications', job_id=job_id)
+    label = dict(Application.STATUS_CHOICES)[status_code]
+    messages.success(request, f'{updated} application(s) marked as {label}.')
+    return redirect('job_applications', job_id=job_id)
+
 # Profile View
 @login_required
 def profile(request):
@@ -274,36 +387,35 @@ def profile(request):
 
 # Analytics Dashboard
 @login_required
+@replica_reads
 def dashboard(request):
     if hasattr(request.user, 'profile') and request.user.profile.is_employer:
-        # Employer dashboard
-        my_jobs = Job.objects.filter(posted_by=request.user)
-        total_jobs = my_jobs.count()
-        active_jobs = my_jobs.filter(is_active=True).count()
-        total_applications = Application.objects.filter(job__posted_by=request.user).count()
-        
-        # Most applied jobs
-        top_jobs = my_jobs.annotate(
-            app_count=Count('applications')
-        ).order_by('-app_count')[:5]
-        
-        context = {
-            'total_jobs': total_jobs,
-            'active_jobs': active_jobs,
-            'total_applications': total_applications,
-            'top_jobs': top_jobs,
-            'is_employer': True,
-        }
+        context = get_employer_dashboard(request.user)
     else:
-        # Candidate dashboard
-        my_applications = Application.objects.filter(applicant=request.user)
-        context = {
-            'total_applications': my_applications.count(),
-            'pending': my_applications.filter(status='P').count(),
-            'reviewed': my_applications.filter(status='R').count(),
-            'accepted': my_applications.filter(status='A').count(),
-            'recent_applications': my_applications[:5],
-            'is_employer': False,
-        }
+        context = get_candidate_dashboard(request.user)
     
-    return render(request, 'jobs/dashboard.html', context)
\ No newline at end of file
+    return render(request, 'jobs/dashboard.html', context)
+
+@login_required
+@replica_reads
+async def adashboard(request):
+    user = await arequest_user(request)
+    profile = await UserProfile.objects.filter(user=user).afirst()
+    if profile is not None:
+        user.profile = profile
+    if profile is not None and profile.is_employer:
+        context = await aget_employer_dashboard(user)
+    else:
+        context = await aget_candidate_dashboard(user)
+    
+    return await arender(request, 'jobs/dashboard.html', context)
+
+# Prometheus scrape endpoint
+def metrics(request):
+    token = settings.METRICS_TOKEN
+    authorized = request.user.is_staff or (
+        token and constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+    )
+    if not authorized:
+        return HttpResponseForbidden()
+    return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')